@@ -0,0 +1,113 @@
+"""
+Import-time benchmark for the wingwalker package.
+
+Each entry module is imported in a fresh interpreter with `-X importtime`, so earlier imports do not hide the cost.
+The script reports the best time over several runs, and which heavy dependencies each import pulled in.  With
+--max-ms, it exits with an error when any import is slower than the budget, or when a light-weight entry point
+imports pyvista or pymeshlab.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import typer
+from typing_extensions import Annotated
+
+# Entry points that must stay free of the heavy dependencies
+LIGHT_MODULES = (
+    'wingwalker',
+    'wingwalker.io.specs',
+    'wingwalker.io.spec_cache',
+    'wingwalker.generators.metrics',
+    'wingwalker.svg',
+)
+# Entry points that pull in the 3D stack when it is used
+FULL_MODULES = (
+    'wingwalker.generators.wing',
+    'wingwalker.io.exports',
+)
+HEAVY_DEPENDENCIES = ('pyvista', 'pymeshlab', 'shapely', 'vtk', 'vtkmodules')
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+
+def measure_import(module: str)->dict:
+    """
+    Import a module in a fresh interpreter
+    Args:
+        module: dotted module name
+
+    Returns:
+        dict with the cumulative import time of the module (ms) and the heavy dependencies it loaded
+    """
+    probe = (f'import sys, json; import {module}; '
+             f'print(json.dumps([m for m in {HEAVY_DEPENDENCIES!r} if m in sys.modules]))')
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (SRC_DIR, env.get('PYTHONPATH')) if p)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe], capture_output=True, text=True,
+                            env=env, check=True)
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1].strip())
+    return {'ms': cumulative_us / 1000.0, 'heavy': json.loads(result.stdout.strip().splitlines()[-1])}
+
+def run_benchmark(modules: list[str], runs: int)->dict[str, dict]:
+    """
+    Best-of-runs import time for each module
+    Args:
+        modules: dotted module names
+        runs: number of fresh interpreters per module
+
+    Returns:
+        dict of module -> {'ms': best time, 'heavy': heavy dependencies loaded}
+    """
+    results = {}
+    for module in modules:
+        samples = [measure_import(module) for _ in range(max(runs, 1))]
+        results[module] = {'ms': min(s['ms'] for s in samples), 'heavy': samples[0]['heavy']}
+    return results
+
+def main(
+        runs: Annotated[
+            int,
+            typer.Option(
+                help= "Number of fresh interpreters per module; the best time is reported"
+            )
+        ] = 5,
+        max_ms: Annotated[
+            float,
+            typer.Option(
+                help= "Fail when a light-weight entry point takes longer than this (0 disables the check)"
+            )
+        ] = 0.0,
+        output: Annotated[
+            str,
+            typer.Option(
+                help= "Write the results to this JSON file"
+            )
+        ] = '',
+):
+    results = run_benchmark(list(LIGHT_MODULES + FULL_MODULES), runs)
+    failures = []
+    for module, result in results.items():
+        print(f'{module:40s} {result["ms"]:9.1f} ms  {", ".join(result["heavy"]) or "-"}')
+        if module in LIGHT_MODULES:
+            if {'pyvista', 'pymeshlab'} & set(result['heavy']):
+                failures.append(f'{module} imports {result["heavy"]}')
+            if max_ms > 0.0 and result['ms'] > max_ms:
+                failures.append(f'{module} took {result["ms"]:.1f} ms (budget {max_ms} ms)')
+    if output:
+        with open(output, 'w', encoding='utf-8') as fout:
+            json.dump(results, fout, indent=4, sort_keys=True)
+    for failure in failures:
+        print(f'FAILED: {failure}')
+    if failures:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,199 @@
+"""
+Peak-memory benchmark of the generate -> mesh -> export pipeline.
+
+Each iteration count is built in a fresh Python process, under the MemoryProfiler of wingwalker.instrumentation, so
+that the RSS peaks of one case do not carry over into the next.  Every stage reports its tracemalloc peak, its RSS
+peak and the source lines that allocated most while it ran.
+
+The results can be written as JSON (--output), and plotted against the number of iterations as an SVG line chart
+(--plot), one line per stage.  The PLY export is skipped when pyvista is not installed.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from xml.sax.saxutils import escape
+
+import typer
+from typing_extensions import Annotated
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline import available, int_list, make_request, metadata, spec_files
+
+MIB = 1024.0 * 1024.0
+COLOURS = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22',
+           '#17becf')
+
+
+def profile_build(spec_file: str, iterations: int, tolerance: float | None, top: int)->dict[str, dict]:
+    """
+    Generate and export one wing under the memory profiler, in this process
+    Returns:
+        dict of stage -> largest wall time, tracemalloc and RSS peaks, and the top allocations of its largest run
+    """
+    from wingwalker.generators.wing import generate_wing_model
+    from wingwalker.instrumentation import MemoryProfiler, instrument
+    from wingwalker.io.exports import export_ply, export_stl
+
+    (spec_path, spec_format), = spec_files(spec_file)
+    wing_req = make_request(spec_path, spec_format, iterations)
+    profiler = MemoryProfiler(top=top)
+    with tempfile.TemporaryDirectory(prefix='wingwalker-memory-') as out_dir:
+        with instrument(profiler):
+            wing_model = generate_wing_model(wing_req, tolerance=tolerance)
+            export_stl(wing_model, os.path.join(out_dir, 'wing.stl'))
+            if available('pyvista'):
+                export_ply(wing_model, os.path.join(out_dir, 'wing.ply'))
+
+    stages = {}
+    for record in profiler.records:
+        # Stages that run more than once in a build (e.g. the mesh builders) keep their largest run
+        current = stages.get(record.stage)
+        if current is not None and current['traced_peak'] >= record.extra['traced_peak']:
+            continue
+        stages[record.stage] = {'wall': record.wall, 'points': record.points, 'faces': record.faces,
+                                'traced_peak': record.extra['traced_peak'],
+                                'traced_growth': record.extra['traced_growth'],
+                                'rss_peak': record.extra['rss_peak'],
+                                'top_allocations': record.extra.get('top_allocations', [])}
+    return stages
+
+def run_case(spec_file: str, iterations: int, tolerance: float | None, top: int)->dict[str, dict]:
+    """
+    Run profile_build for one iteration count in a fresh process
+    """
+    args = [sys.executable, os.path.abspath(__file__), '--child', '--specs', spec_file, '--iterations',
+            str(iterations), '--top', str(top)]
+    if tolerance is not None:
+        args += ['--tolerance', str(tolerance)]
+    result = subprocess.run(args, capture_output=True, text=True, cwd=ROOT_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(f'Memory profile of {iterations} iterations failed:\n{result.stderr}')
+    return json.loads(result.stdout)
+
+def plot_svg(results: dict[int, dict[str, dict]], metric: str, filename: str, width: int = 800, height: int = 480):
+    """
+    Write a line chart of a memory metric against the number of iterations, one line per stage
+    Args:
+        results: iterations -> stage -> measurements
+        metric: measurement plotted ('traced_peak' or 'rss_peak'), in MiB
+        filename: path and file name of the SVG
+        width: chart width, in pixels
+        height: chart height, in pixels
+    """
+    left, right, top, bottom = 70, 180, 20, 50
+    iterations = sorted(results)
+    stages = sorted({stage for case in results.values() for stage in case})
+    values = [measured[metric] for case in results.values() for measured in case.values()
+              if measured.get(metric) is not None]
+    y_max = max(max(values, default=0) / MIB, 1e-6) * 1.05
+    x_min, x_max = iterations[0], max(iterations[-1], iterations[0] + 1)
+
+    def x_pos(value: float)->float:
+        return left + (value - x_min) / (x_max - x_min) * (width - left - right)
+
+    def y_pos(value: float)->float:
+        return height - bottom - value / y_max * (height - top - bottom)
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="sans-serif" '
+             f'font-size="11">',
+             f'<rect width="{width}" height="{height}" fill="white"/>',
+             f'<line x1="{left}" y1="{height - bottom}" x2="{width - right}" y2="{height - bottom}" stroke="black"/>',
+             f'<line x1="{left}" y1="{top}" x2="{left}" y2="{height - bottom}" stroke="black"/>',
+             f'<text x="{(left + width - right) / 2}" y="{height - 10}" text-anchor="middle">iterations</text>',
+             f'<text x="15" y="{(top + height - bottom) / 2}" text-anchor="middle" '
+             f'transform="rotate(-90 15 {(top + height - bottom) / 2})">{escape(metric)} (MiB)</text>']
+    for tick in range(5):
+        value = y_max * tick / 4
+        parts.append(f'<text x="{left - 5}" y="{y_pos(value) + 4:.1f}" text-anchor="end">{value:.1f}</text>')
+    for value in iterations:
+        parts.append(f'<text x="{x_pos(value):.1f}" y="{height - bottom + 15}" text-anchor="middle">{value}</text>')
+    for index, stage in enumerate(stages):
+        colour = COLOURS[index % len(COLOURS)]
+        points = [(x_pos(value), y_pos(results[value][stage][metric] / MIB)) for value in iterations
+                  if stage in results[value] and results[value][stage].get(metric) is not None]
+        if not points:
+            continue
+        path = ' '.join(f'{x:.1f},{y:.1f}' for x, y in points)
+        parts.append(f'<polyline points="{path}" fill="none" stroke="{colour}" stroke-width="2"/>')
+        parts.extend(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="3" fill="{colour}"/>' for x, y in points)
+        legend_y = top + 15 * index + 10
+        parts.append(f'<line x1="{width - right + 10}" y1="{legend_y}" x2="{width - right + 30}" y2="{legend_y}" '
+                     f'stroke="{colour}" stroke-width="2"/>')
+        parts.append(f'<text x="{width - right + 35}" y="{legend_y + 4}">{escape(stage)}</text>')
+    parts.append('</svg>')
+    with open(filename, 'w', encoding='utf-8') as fout:
+        fout.write('\n'.join(parts))
+
+def main(
+        specs: Annotated[
+            str,
+            typer.Option(
+                help= "Airfoil file, relative to the repository root"
+            )
+        ] = 'data/lednicer_supercritical_nasa-sc2-1010.dat',
+        iterations: Annotated[
+            str,
+            typer.Option(
+                help= "Comma-separated wing iteration counts"
+            )
+        ] = '50,100,200,400,800',
+        tolerance: Annotated[
+            float,
+            typer.Option(
+                help= "Adaptive section tolerance (see plan_stations); 0 places a section at every iteration"
+            )
+        ] = 0.0,
+        top: Annotated[
+            int,
+            typer.Option(
+                help= "Number of top allocation sites recorded per stage"
+            )
+        ] = 10,
+        output: Annotated[
+            str,
+            typer.Option(
+                help= "Write the results to this JSON file"
+            )
+        ] = '',
+        plot: Annotated[
+            str,
+            typer.Option(
+                help= "Write an SVG chart of the tracemalloc peaks against iterations to this file"
+            )
+        ] = '',
+        child: Annotated[
+            bool,
+            typer.Option(
+                hidden=True,
+                help= "Profile a single iteration count in this process and print the JSON result"
+            )
+        ] = False,
+):
+    wing_tolerance = tolerance if tolerance > 0.0 else None
+    if child:
+        print(json.dumps(profile_build(specs, int_list(iterations)[0], wing_tolerance, top)))
+        return
+    if len(spec_files(specs)) != 1:
+        raise typer.BadParameter(f'{specs} must match exactly one spec file')
+
+    results = {}
+    for iteration_count in int_list(iterations):
+        results[iteration_count] = run_case(specs, iteration_count, wing_tolerance, top)
+        for stage, values in results[iteration_count].items():
+            rss_peak = values['rss_peak'] / MIB if values['rss_peak'] is not None else float('nan')
+            print(f'{iteration_count:6d} {stage:24s} traced peak {values["traced_peak"] / MIB:9.2f} MiB  '
+                  f'RSS peak {rss_peak:9.2f} MiB')
+    if output:
+        with open(output, 'w', encoding='utf-8') as fout:
+            json.dump({'meta': metadata(), 'results': results}, fout, indent=4, sort_keys=True)
+    if plot and results:
+        plot_svg(results, 'traced_peak', plot)
+
+
+if __name__ == "__main__":
+    typer.run(main)
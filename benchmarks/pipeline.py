@@ -0,0 +1,327 @@
+"""
+End-to-end benchmark of the parse -> generate -> mesh -> export pipeline.
+
+Every stage is timed on the bundled airfoil files (data/*.dat), swept over the number of wing iterations and the
+number of airfoil points (the spec is resampled along its outline; 0 keeps the file's own points).  Each case is run
+`--repeat` times, with enough calls per run to last at least `--min-time` seconds, and the per-call minimum, median
+and mean are reported.
+
+Results can be written as JSON (--output), and compared against an earlier run (--baseline): cases whose median is
+more than --threshold slower than the baseline are reported as regressions, and the script exits with an error.
+Stages that need an optional dependency that is not installed (pymeshlab, pyvista, shapely) are skipped.
+"""
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import typer
+from typing_extensions import Annotated
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.io.specs import parse_specfile
+from wingwalker.models.airfoil_specs import AirfoilSpecs
+from wingwalker.models.enums import Planform, SpecFormat, WingType
+
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+# Stage -> (sweeps over points, sweeps over iterations, optional module it needs)
+STAGES = {
+    'parse_specfile': (False, False, None),
+    'centroid': (True, False, 'shapely'),
+    'generate_section': (True, False, None),
+    'generate_wing': (True, True, None),
+    'generate_closed_mesh': (True, True, 'pymeshlab'),
+    'export_stl': (True, True, None),
+    'export_ply': (True, True, 'pyvista'),
+    'svg_trace': (True, False, None),
+    'svg_poly': (True, False, None),
+}
+
+
+def spec_files(pattern: str)->list[tuple[str, SpecFormat]]:
+    """
+    Airfoil files to benchmark, with their format guessed from the file name
+    Args:
+        pattern: glob pattern, relative to the repository root
+
+    Returns:
+        Sorted (path, SpecFormat) pairs
+    """
+    files = []
+    for path in sorted(glob.glob(os.path.join(ROOT_DIR, pattern))):
+        spec_format = SpecFormat.LEDNICER if 'lednicer' in os.path.basename(path) else SpecFormat.SELIG
+        files.append((path, spec_format))
+    return files
+
+def resample_specs(af_specs: AirfoilSpecs, points: int)->AirfoilSpecs:
+    """
+    Resample an airfoil outline to a number of points, evenly spaced along its length
+    Args:
+        af_specs: parsed specs
+        points: number of points; 0 keeps the original points
+
+    Returns:
+        AirfoilSpecs with the resampled outline
+    """
+    if points <= 0:
+        return af_specs
+    coords = af_specs.coords
+    arc = np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(coords, axis=0), axis=1))))
+    stations = np.linspace(0.0, arc[-1], points)
+    return AirfoilSpecs(af_specs.src, af_specs.designation, np.interp(stations, arc, coords[:, 0]),
+                        np.interp(stations, arc, coords[:, 1]))
+
+def make_request(spec_file: str, spec_format: SpecFormat, iterations: int)->WingRequest:
+    """
+    Standard elliptical wing request used by the 3D stages
+    """
+    wing_req = WingRequest()
+    wing_req.name = 'benchmark'
+    wing_req.planform = Planform.ELLIPSE
+    wing_req.wing_type = WingType.WING | WingType.LEFT
+    wing_req.span = 256.0
+    wing_req.base_chord = 96.0
+    wing_req.end_chord = 0.0
+    wing_req.twist = -0.0349066
+    wing_req.spec_file = spec_file
+    wing_req.spec_format = spec_format
+    wing_req.iterations = iterations
+    return wing_req
+
+def generate_model(wing_req: WingRequest, af_specs: AirfoilSpecs):
+    """
+    Wing model for a request, from already-parsed specs
+    """
+    from wingwalker.generators.wing import generate_wing, get_lambdas
+    c_func, t_func, z_func, area_func = get_lambdas(wing_req)
+    return generate_wing(wing_req, af_specs, c_func, t_func, z_func, area_func)
+
+def stage_call(stage: str, spec_file: str, spec_format: SpecFormat, af_specs: AirfoilSpecs, iterations: int,
+               out_dir: str):
+    """
+    Set up one benchmark case, outside the timed region
+    Returns:
+        Function running the stage once
+    """
+    if stage == 'parse_specfile':
+        return lambda: parse_specfile(spec_file, spec_format)
+    if stage == 'centroid':
+        return lambda: af_specs.centroid(96.0)
+    if stage == 'generate_section':
+        from wingwalker.generators.wing import generate_section
+        return lambda: generate_section(96.0, -0.0349066, 10.0, False, af_specs)
+    if stage in ('svg_trace', 'svg_poly'):
+        from wingwalker.svg import SvgWriter
+        writer = SvgWriter(af_specs.x * 128.0, af_specs.y * 128.0, 128.0, 'mm')
+        base_name = os.path.join(out_dir, stage)
+        if stage == 'svg_trace':
+            return lambda: writer.generate_trace(base_name, mirror=True, filled=True)
+        return lambda: writer.generate_poly(base_name, mirror=True)
+
+    wing_req = make_request(spec_file, spec_format, iterations)
+    if stage == 'generate_wing':
+        return lambda: generate_model(wing_req, af_specs)
+    model = generate_model(wing_req, af_specs)
+    if stage == 'generate_closed_mesh':
+        from wingwalker.processing.mesh import generate_closed_mesh
+        return lambda: generate_closed_mesh(model)
+    if stage == 'export_stl':
+        from wingwalker.io.exports import export_stl
+        return lambda: export_stl(model, os.path.join(out_dir, 'benchmark.stl'))
+    if stage == 'export_ply':
+        from wingwalker.io.exports import export_ply
+        return lambda: export_ply(model, os.path.join(out_dir, 'benchmark.ply'))
+    raise ValueError(f'Unknown stage {stage}')
+
+def measure(func, repeat: int, min_time: float)->dict:
+    """
+    Time a function
+    Args:
+        func: function to time
+        repeat: number of timed runs
+        min_time: minimum length of each run, in seconds; sets the number of calls per run
+
+    Returns:
+        dict of per-call min, median and mean seconds, with the number of runs and calls per run
+    """
+    start = time.perf_counter()
+    func()
+    once = max(time.perf_counter() - start, 1e-9)
+    number = max(1, int(min_time / once))
+    samples = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {'min': min(samples), 'median': statistics.median(samples), 'mean': statistics.fmean(samples),
+            'repeat': len(samples), 'number': number}
+
+def available(module: str | None)->bool:
+    if module is None:
+        return True
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+def run_benchmark(stages: list[str], specs: list[tuple[str, SpecFormat]], iterations: list[int],
+                  points: list[int], repeat: int, min_time: float)->dict[str, dict]:
+    """
+    Run every case of the selected stages
+    Returns:
+        dict of case id ('stage|spec file|points|iterations') -> timing and case parameters
+    """
+    results = {}
+    out_dir = tempfile.mkdtemp(prefix='wingwalker-bench-')
+    try:
+        for stage in stages:
+            by_points, by_iterations, needs = STAGES[stage]
+            if not available(needs):
+                print(f'{stage}: skipped, {needs} is not installed')
+                continue
+            for spec_file, spec_format in specs:
+                parsed = parse_specfile(spec_file, spec_format)
+                for point_count in (points if by_points else [0]):
+                    af_specs = resample_specs(parsed, point_count)
+                    for iteration_count in (iterations if by_iterations else [0]):
+                        case_id = f'{stage}|{os.path.basename(spec_file)}|{point_count}|{iteration_count}'
+                        func = stage_call(stage, spec_file, spec_format, af_specs, iteration_count, out_dir)
+                        timing = measure(func, repeat, min_time)
+                        results[case_id] = dict(timing, stage=stage, spec=os.path.basename(spec_file),
+                                                points=len(af_specs.coords), iterations=iteration_count)
+                        print(f'{case_id:70s} {timing["median"] * 1000.0:10.3f} ms')
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return results
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float)->list[str]:
+    """
+    Compare the medians of a run against a baseline run
+    Args:
+        results: case id -> timing, from run_benchmark
+        baseline: case id -> timing, from an earlier run
+        threshold: allowed slow-down, as a fraction (0.1 = 10%)
+
+    Returns:
+        Descriptions of the cases that regressed
+    """
+    regressions = []
+    for case_id, result in results.items():
+        base = baseline.get(case_id)
+        if base is None:
+            continue
+        ratio = result['median'] / base['median'] if base['median'] > 0.0 else 1.0
+        marker = ''
+        if ratio > 1.0 + threshold:
+            marker = '  REGRESSION'
+            regressions.append(f'{case_id}: {base["median"] * 1000.0:.3f} ms -> {result["median"] * 1000.0:.3f} ms '
+                               f'({ratio:.2f}x)')
+        print(f'{case_id:70s} {ratio:6.2f}x{marker}')
+    return regressions
+
+def metadata()->dict:
+    try:
+        from importlib.metadata import version
+        ww_version = version('wingwalker')
+    except Exception:
+        ww_version = 'unknown'
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+            'machine': platform.machine(), 'wingwalker': ww_version,
+            'timestamp': datetime.now(timezone.utc).isoformat()}
+
+def int_list(text: str)->list[int]:
+    return [int(value) for value in text.split(',') if value.strip()]
+
+def main(
+        stages: Annotated[
+            str,
+            typer.Option(
+                help= "Comma-separated stages to run (default: all)"
+            )
+        ] = ','.join(STAGES),
+        specs: Annotated[
+            str,
+            typer.Option(
+                help= "Glob pattern of the airfoil files, relative to the repository root"
+            )
+        ] = 'data/*.dat',
+        iterations: Annotated[
+            str,
+            typer.Option(
+                help= "Comma-separated wing iteration counts"
+            )
+        ] = '20,100,300',
+        points: Annotated[
+            str,
+            typer.Option(
+                help= "Comma-separated airfoil point counts; 0 keeps the points of the file"
+            )
+        ] = '0,400',
+        repeat: Annotated[
+            int,
+            typer.Option(
+                help= "Number of timed runs per case"
+            )
+        ] = 5,
+        min_time: Annotated[
+            float,
+            typer.Option(
+                help= "Minimum length of each timed run, in seconds"
+            )
+        ] = 0.05,
+        output: Annotated[
+            str,
+            typer.Option(
+                help= "Write the results to this JSON file"
+            )
+        ] = '',
+        baseline: Annotated[
+            str,
+            typer.Option(
+                help= "Compare against the results in this JSON file"
+            )
+        ] = '',
+        threshold: Annotated[
+            float,
+            typer.Option(
+                help= "Allowed slow-down against the baseline, as a fraction"
+            )
+        ] = 0.10,
+):
+    selected = [stage.strip() for stage in stages.split(',') if stage.strip()]
+    for stage in selected:
+        if stage not in STAGES:
+            raise typer.BadParameter(f'Unknown stage {stage}; choose from {", ".join(STAGES)}')
+    spec_list = spec_files(specs)
+    if not spec_list:
+        raise typer.BadParameter(f'No spec files match {specs}')
+
+    results = run_benchmark(selected, spec_list, int_list(iterations), int_list(points), repeat, min_time)
+    if output:
+        with open(output, 'w', encoding='utf-8') as fout:
+            json.dump({'meta': metadata(), 'results': results}, fout, indent=4, sort_keys=True)
+    if baseline:
+        with open(baseline, 'r', encoding='utf-8') as fin:
+            baseline_results = json.load(fin)['results']
+        print()
+        regressions = compare(results, baseline_results, threshold)
+        for regression in regressions:
+            print(f'REGRESSION: {regression}')
+        if regressions:
+            raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
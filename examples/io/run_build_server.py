@@ -0,0 +1,100 @@
+"""
+Run a local build service (see wingwalker.io.build_server), keeping the heavy imports and parsed specs warm between
+builds.
+
+Request an STL with, e.g.:
+
+    curl -X POST --data @../printables/elliptical_left_wing_256mm.json -o wing.stl \
+        'http://127.0.0.1:8765/build?format=stl'
+"""
+import glob
+import os
+
+import typer
+from typing_extensions import Annotated
+
+from wingwalker.io.build_cache import BuildCache
+from wingwalker.io.build_server import BuildService, DEFAULT_PORT, make_server
+from wingwalker.models.enums import SpecFormat
+
+
+def main(
+        host: Annotated[
+            str,
+            typer.Option(
+                help="Address to listen on"
+            ),
+        ] = "127.0.0.1",
+        port: Annotated[
+            int,
+            typer.Option(
+                help="Port to listen on"
+            ),
+        ] = DEFAULT_PORT,
+        unix_socket: Annotated[
+            str,
+            typer.Option(
+                help="Listen on this Unix socket instead of a TCP port"
+            ),
+        ] = "",
+        workers: Annotated[
+            int,
+            typer.Option(
+                help="Number of builds run at the same time"
+            ),
+        ] = 2,
+        queue: Annotated[
+            int,
+            typer.Option(
+                help="Number of requests allowed to wait for a worker"
+            ),
+        ] = 8,
+        out_dir: Annotated[
+            str,
+            typer.Option(
+                help="Directory for artifacts requested with an output file name"
+            ),
+        ] = "served",
+        spec_dir: Annotated[
+            str,
+            typer.Option(
+                help="Directory for relative spec file paths; its .dat files are parsed at startup"
+            ),
+        ] = "../../data",
+        cache: Annotated[
+            bool,
+            typer.Option(
+                help="Reuse models, meshes and exports through the build cache"
+            ),
+        ] = True,
+        verbose: Annotated[
+            bool,
+            typer.Option(
+                help="Log every request"
+            ),
+        ] = False,
+    )->None:
+    """
+    Example function to run the build service until interrupted
+    """
+    service = BuildService(workers, queue, out_dir, spec_dir, build_cache=BuildCache() if cache else None)
+    spec_files = []
+    for spec_file in glob.glob(os.path.join(spec_dir, '*.dat')):
+        spec_format = SpecFormat.LEDNICER if 'lednicer' in os.path.basename(spec_file) else SpecFormat.SELIG
+        spec_files.append((os.path.abspath(spec_file), spec_format))
+    loaded = service.preload(spec_files)
+    print(f'Preloaded {", ".join(loaded)} and {len(spec_files)} spec files')
+
+    server = make_server(service, host, port, unix_socket or None, verbose)
+    print(f'Serving on {unix_socket or f"http://{host}:{port}"}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,50 @@
+"""
+Build every part of an aircraft from a manifest (see wingwalker.generators.aircraft), e.g. the included
+`aircraft.json`: both wings, both elevator halves and the rudder, exported in one run.
+"""
+import typer
+from typing_extensions import Annotated
+
+from wingwalker.generators.aircraft import build_aircraft
+from wingwalker.io.build_cache import BuildCache
+
+
+def main(
+        manifest: Annotated[
+            str,
+            typer.Option(
+                help="Path to the aircraft manifest"
+            ),
+        ] = "aircraft.json",
+        max_workers: Annotated[
+            int,
+            typer.Option(
+                help="Number of build threads; 1 builds one task at a time"
+            ),
+        ] = 4,
+        cache: Annotated[
+            bool,
+            typer.Option(
+                help="Reuse the models and meshes of unchanged parts from the build cache"
+            ),
+        ] = True,
+        report: Annotated[
+            str,
+            typer.Option(
+                help="Optional path for a JSON build report"
+            ),
+        ] = "",
+    )->None:
+    """
+    Example function to build an aircraft manifest
+    """
+    build_report = build_aircraft(manifest, max_workers, build_cache=BuildCache() if cache else None)
+    print(build_report)
+    if report:
+        build_report.write_json(report)
+    if not build_report.ok:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
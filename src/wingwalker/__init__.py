@@ -5,27 +5,50 @@ stabilizers, and control surfaces)
 __version__ = '0.9.0'
 __author__ = 'David Days'
 __email__ = 'david.c.days@gmail.com'
+
+The names below are loaded on first use (module-level __getattr__), so `import wingwalker` stays cheap; heavy
+dependencies (pyvista, pymeshlab, shapely) are only imported by the code paths that need them.
 """
+import importlib
+
+# Public name -> (module, attribute); an attribute of None is the module itself
+_LAZY_ATTRS = {
+    'parse_selig': ('wingwalker.selig', 'parse_selig'),
+    'SeligParser': ('wingwalker.selig', 'Parser'),
+    'parse_lednicer': ('wingwalker.lednicer', 'parse_lednicer'),
+    'LednicerParser': ('wingwalker.lednicer', 'Parser'),
+    'parse_specs': ('wingwalker.utils', 'parse_specs'),
+    'substitute_placeholders': ('wingwalker.svg', 'substitute_placeholders'),
+    'from_svg_template': ('wingwalker.svg', 'from_svg_template'),
+    'trace_airfoil_path': ('wingwalker.svg', 'trace_airfoil_path'),
+    'draw_airfoil_poly': ('wingwalker.svg', 'draw_airfoil_poly'),
+    'templates': ('wingwalker.output_templates', None),
+    # Submodules that used to be loaded by importing the package
+    'selig': ('wingwalker.selig', None),
+    'lednicer': ('wingwalker.lednicer', None),
+    'utils': ('wingwalker.utils', None),
+    'svg': ('wingwalker.svg', None),
+    'output_templates': ('wingwalker.output_templates', None),
+}
+
+__all__ = sorted(_LAZY_ATTRS) + ['__version__']
+
+
+def __getattr__(name: str):
+    if name == '__version__':
+        # read version from installed package
+        from importlib.metadata import version
+        value = version("wingwalker")
+    elif name in _LAZY_ATTRS:
+        module_name, attr = _LAZY_ATTRS[name]
+        module = importlib.import_module(module_name)
+        value = module if attr is None else getattr(module, attr)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    # Cache on the module, so __getattr__ is only called once per name
+    globals()[name] = value
+    return value
+
 
-from wingwalker.selig import (
-    parse_selig,
-    Parser as SeligParser
-)
-from wingwalker.lednicer import (
-    parse_lednicer,
-    Parser as LednicerParser
-)
-from wingwalker.utils import (
-    parse_specs
-)
-from wingwalker.svg import (
-    substitute_placeholders,
-    from_svg_template,
-    trace_airfoil_path,
-    draw_airfoil_poly
-)
-import wingwalker.output_templates as templates
-
-# read version from installed package
-from importlib.metadata import version
-__version__ = version("wingwalker")
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
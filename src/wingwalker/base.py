@@ -3,12 +3,14 @@ Base classes for wingwalker
 """
 from abc import ABC, abstractmethod
 
+import numpy as np
 
-class Reader(ABC):
-    xs, ys = [], []
-    chord_len = 0
-    airfoil_desig = 'airfoil'
 
+class Reader(ABC):
+    """
+    Base class for the spec file parsers.  A reader holds no state beyond its filename; every read() call returns
+    its own coordinate lists, so one reader (or many) can be used from several threads at once.
+    """
     def __init__(self, filename):
         self.filename = filename
 
@@ -23,3 +25,17 @@ class Reader(ABC):
             The coordinates in [x],[y] arrays and the airfoil designation read from the data (or 'airfoil' by default)
         """
         pass
+
+
+    def read_array(self, c_len: float = 1.0) -> (np.ndarray, np.ndarray, str):
+        """
+        Method for reading wingwalker data into float arrays.  Parsers with a vectorized path override this;
+        the default converts the results of read()
+        Args:
+            self (Reader): This instance
+            c_len (float): Length of chord (unitless)
+        Returns:
+            The coordinates as x and y float64 arrays, and the airfoil designation read from the data
+        """
+        xs, ys, airfoil_desig = self.read(c_len)
+        return np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64), airfoil_desig
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import string
 
@@ -86,12 +87,75 @@ class WingRequest(object):
         )
         return self_array == other_array
 
+    def __hash__(self)->int:
+        return hash(self.canonical_key())
+
+    def canonical_dict(self)->dict:
+        """
+        The fields compared by __eq__, in a normalized form: enums as their values, and numbers as float (int for
+        iterations), so equal requests always give the same dict, whether built in code or loaded from JSON.
+        Returns:
+            dict of field name -> normalized value
+        """
+        return {
+            'name': self.name,
+            'wing_type': int(self.wing_type),
+            'planform': Planform(self.planform).value,
+            'spec_file': self.spec_file,
+            'spec_format': SpecFormat(self.spec_format).value,
+            'base_chord': float(self.base_chord),
+            'end_chord': float(self.end_chord),
+            'span': float(self.span),
+            'twist': float(self.twist),
+            'iterations': int(self.iterations),
+            'area': float(self.area)
+        }
+
+    def canonical_key(self, **overrides)->str:
+        """
+        Stable hash of the request, for use as a cache key.  Notes are not part of the key.
+        Args:
+            **overrides: canonical_dict entries to replace or add before hashing (e.g. spec_file=<content hash>,
+                so the key follows the spec content rather than its path)
+
+        Returns:
+            Hex digest of the canonical JSON form of the request
+        """
+        key_dict = self.canonical_dict()
+        key_dict.update(overrides)
+        key_json = json.dumps(key_dict, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(key_json.encode('utf-8')).hexdigest()
+
     def to_json(self):
         out_dict = dict(self.__dict__)
         w_type: str = ''
         out_dict['wing_type'] = self.wing_type.__str__()
         return json.dumps(out_dict, default=lambda o: o.__dict__, sort_keys=True, indent=4)
 
+    @classmethod
+    def from_dict(cls, req_dict: dict)->'WingRequest':
+        """
+        Create a request from a dict of its JSON fields, e.g. an inline request in a manifest or a request posted to
+        the build server.  Missing fields keep their defaults; enum fields are converted from their values, and
+        wing_type from either member names ('WING,LEFT') or its integer value.
+        Args:
+            req_dict: field name -> value
+
+        Returns:
+            WingRequest holding the given fields
+        """
+        req: WingRequest = cls()
+        for name, value in req_dict.items():
+            match name:
+                case 'wing_type':
+                    value = _parse_wing_type(value)
+                case 'planform':
+                    value = Planform(value)
+                case 'spec_format':
+                    value = SpecFormat(value)
+            setattr(req, name, value)
+        return req
+
     @classmethod
     def from_json(cls, json_str):
         req_dict: dict = json.loads(json_str)
@@ -104,4 +168,25 @@ class WingRequest(object):
         req_dict['wing_type'] = wtype_val
         req: WingRequest = WingRequest()
         req.__dict__ = req_dict
-        return req
\ No newline at end of file
+        return req
+
+
+def _parse_wing_type(value)->WingType:
+    if isinstance(value, WingType):
+        return value
+    if isinstance(value, int) or (isinstance(value, str) and value.strip().isdigit()):
+        # Numeric form, e.g. from hand-written JSON
+        return WingType(int(value))
+    # Member names, as written by to_json through WingType.__str__ ('WING,LEFT', or 'Undefined' for no flags);
+    # 'WING|LEFT' and 'WingType.WING' forms are accepted too
+    wing_type: WingType = WingType.UNDEFINED
+    for member in str(value).replace('|', ',').split(','):
+        member = member.strip()
+        if member.startswith('WingType.'):
+            member = member[len('WingType.'):]
+        member = member.upper()
+        if member:
+            if member not in WingType.__members__:
+                raise ValueError(f'Unknown wing type {member}')
+            wing_type |= WingType.__members__[member]
+    return wing_type
@@ -0,0 +1,474 @@
+"""
+Manifest-driven builds of a whole aircraft.
+
+An aircraft manifest lists the parts (wings, elevator, rudder, ...) as WingRequests, either inline or as request
+JSON files, and the formats to export them in.  The build expands into a graph of tasks:
+
+    parse:<spec file>  ->  generate:<part>  ->  mesh:<part>  ->  export:<part>.stl
+                                            ->  export:<part>.ply
+
+Each distinct spec file is parsed once, whatever the number of parts using it.  Parts marked "mirror" also build
+the opposite side, by reflecting the generated model and mesh (see generators.wing.mirror_wing).  Independent
+tasks run concurrently on a thread pool; the models stay in memory between tasks, and the numpy-heavy stages
+release the GIL.  A failing task skips the tasks that depend on it, and the rest of the aircraft carries on.
+
+Manifest format (JSON):
+    {
+        "name": "trainer",
+        "out_dir": "build",
+        "formats": ["stl"],
+        "tolerance": null,
+        "max_sections": null,
+        "parts": [
+            {"request": "left_wing.json", "mirror": true},
+            {"request": {"name": "elevator", "wing_type": "STABILIZER,HORIZONTAL,LEFT", ...}, "formats": ["ply"]}
+        ]
+    }
+
+Paths in the manifest are relative to the manifest file; spec file paths in a request are relative to the file
+holding the request.
+"""
+import json
+import os
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.generators.wing import generate_wing_model, mirror_request, mirror_wing
+from wingwalker.io import spec_cache
+from wingwalker.io.build_cache import BuildCache
+from wingwalker.models.enums import SpecFormat
+
+EXPORT_FORMATS = ('stl', 'ply')
+
+
+class AircraftPart:
+    """
+    One part of an aircraft: a request, the formats to export it in, and (for derived mirror parts) the part it
+    is reflected from
+    """
+    __slots__ = ('label', 'request', 'formats', 'mirror_of')
+
+    def __init__(self, label: str, request: WingRequest, formats: tuple[str, ...], mirror_of: str | None = None):
+        self.label = label
+        self.request = request
+        self.formats = formats
+        self.mirror_of = mirror_of
+
+    def __str__(self)->str:
+        source = f', mirror of {self.mirror_of}' if self.mirror_of is not None else ''
+        return f'{self.label}: {self.request}{source}'
+
+
+class AircraftManifest:
+    """
+    Parts and build options of an aircraft
+    """
+    def __init__(self, name: str, parts: list[AircraftPart], out_dir: str = '.', tolerance: float | None = None,
+                 max_sections: int | None = None):
+        """
+        Instantiates a new AircraftManifest
+        Args:
+            name: name of the aircraft
+            parts: parts to build, including the derived mirror parts
+            out_dir: directory for the exported files
+            tolerance: geometric tolerance for adaptive section placement (see plan_stations)
+            max_sections: upper limit on the number of sections when placing them adaptively
+        """
+        self.name = name
+        self.parts = parts
+        self.out_dir = out_dir
+        self.tolerance = tolerance
+        self.max_sections = max_sections
+
+    @classmethod
+    def load(cls, filename: str)->'AircraftManifest':
+        """
+        Read a manifest file
+        Args:
+            filename: path to the manifest JSON
+
+        Returns:
+            AircraftManifest, with every path resolved against the manifest's directory
+        """
+        with open(filename, 'r', encoding='utf-8') as fin:
+            data = json.load(fin)
+        return cls.from_dict(data, os.path.dirname(os.path.abspath(filename)))
+
+    @classmethod
+    def from_dict(cls, data: dict, base_dir: str = '.')->'AircraftManifest':
+        """
+        Build a manifest from its JSON form
+        Args:
+            data: manifest dict (see the module documentation)
+            base_dir: directory relative paths are resolved against
+
+        Returns:
+            AircraftManifest
+        """
+        default_formats = _formats(data.get('formats', ['stl']))
+        parts: list[AircraftPart] = []
+        labels: set[str] = set()
+        for index, part_data in enumerate(data['parts']):
+            request_src = part_data['request']
+            if isinstance(request_src, str):
+                request_file = _resolve(base_dir, request_src)
+                with open(request_file, 'r', encoding='utf-8') as fin:
+                    wing_req = _request_from_dict(json.load(fin), os.path.dirname(request_file))
+            else:
+                wing_req = _request_from_dict(request_src, base_dir)
+            formats = _formats(part_data['formats']) if 'formats' in part_data else default_formats
+            part = AircraftPart(_label(wing_req, index, labels), wing_req, formats)
+            parts.append(part)
+            if part_data.get('mirror', False):
+                mirror_req = mirror_request(wing_req)
+                parts.append(AircraftPart(_label(mirror_req, index, labels), mirror_req, formats, part.label))
+        return cls(data.get('name', 'aircraft'), parts, _resolve(base_dir, data.get('out_dir', '.')),
+                   data.get('tolerance'), data.get('max_sections'))
+
+    def __str__(self)->str:
+        return f'Aircraft {self.name}: {len(self.parts)} parts'
+
+
+def _resolve(base_dir: str, path: str)->str:
+    return path if os.path.isabs(path) else os.path.normpath(os.path.join(base_dir, path))
+
+def _formats(formats)->tuple[str, ...]:
+    formats = tuple(fmt.lower() for fmt in formats)
+    for fmt in formats:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f'Unknown export format {fmt}')
+    return formats
+
+def _request_from_dict(data: dict, base_dir: str)->WingRequest:
+    """
+    WingRequest from its JSON form, with the spec file resolved against base_dir
+    """
+    wing_req = WingRequest.from_dict(data)
+    wing_req.spec_file = _resolve(base_dir, wing_req.spec_file)
+    return wing_req
+
+def _label(wing_req: WingRequest, index: int, labels: set[str])->str:
+    """
+    Unique, file-name friendly label for a part
+    """
+    base = ''.join(c if c.isalnum() or c in '-_' else '_' for c in wing_req.name) or f'part{index}'
+    label = f'{base}_{"right" if wing_req.mirrored else "left"}'
+    candidate = label
+    count = 1
+    while candidate in labels:
+        count += 1
+        candidate = f'{label}_{count}'
+    labels.add(candidate)
+    return candidate
+
+
+class BuildTask:
+    """
+    One node of a build graph.  func gets the outputs of the finished tasks (by name) and returns this task's output.
+    """
+    __slots__ = ('name', 'kind', 'part', 'deps', 'func')
+
+    def __init__(self, name: str, kind: str, part: str | None, deps: tuple[str, ...], func):
+        self.name = name
+        self.kind = kind
+        self.part = part
+        self.deps = deps
+        self.func = func
+
+
+class TaskResult:
+    """
+    Outcome of one build task; status is 'ok', 'failed' or 'skipped'
+    """
+    __slots__ = ('name', 'kind', 'part', 'status', 'output', 'error', 'elapsed')
+
+    def __init__(self, task: BuildTask, status: str, output=None, error: str | None = None, elapsed: float = 0.0):
+        self.name = task.name
+        self.kind = task.kind
+        self.part = task.part
+        self.status = status
+        self.output = output
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self)->bool:
+        return self.status == 'ok'
+
+    def __str__(self)->str:
+        return f'{self.name}: {self.status}, {self.elapsed:.3f}s'
+
+
+def plan_build(manifest: AircraftManifest, specs: spec_cache.SpecCache | None = None,
+               build_cache: BuildCache | None = None)->dict[str, BuildTask]:
+    """
+    Expand a manifest into its task graph
+    Args:
+        manifest: aircraft to build
+        specs: spec cache used to parse the spec files; defaults to spec_cache.default_cache()
+        build_cache: optional build cache; models and meshes are taken from it when they are stored there
+
+    Returns:
+        dict of task name -> BuildTask, in an order where every task comes after its dependencies
+    """
+    # Imported here so planning a build does not load the mesh and export code
+    from wingwalker.io.exports import export_ply
+    from wingwalker.io.stl import write_binary_stl
+    from wingwalker.processing.mesh import generate_loft_mesh, mirror_mesh
+
+    tolerance, max_sections = manifest.tolerance, manifest.max_sections
+    tasks: dict[str, BuildTask] = {}
+
+    def add(name: str, kind: str, part: str | None, deps: tuple[str, ...], func):
+        tasks[name] = BuildTask(name, kind, part, deps, func)
+
+    def parse_func(src: str, spec_format: SpecFormat):
+        return lambda outputs: spec_cache.load_specs(src, spec_format, specs)
+
+    def generate_func(part: AircraftPart, parse_name: str):
+        if part.mirror_of is not None:
+            source = f'generate:{part.mirror_of}'
+            return lambda outputs: mirror_wing(outputs[source], part.request)
+        if build_cache is not None:
+            return lambda outputs: build_cache.model(part.request, tolerance, max_sections)
+        return lambda outputs: generate_wing_model(part.request, tolerance, max_sections, outputs[parse_name])
+
+    def mesh_func(part: AircraftPart):
+        if part.mirror_of is not None:
+            source = f'mesh:{part.mirror_of}'
+            return lambda outputs: mirror_mesh(*outputs[source])
+        if build_cache is not None:
+            return lambda outputs: build_cache.mesh(part.request, tolerance, max_sections)
+        return lambda outputs: generate_loft_mesh(outputs[f'generate:{part.label}'])
+
+    def export_func(part: AircraftPart, fmt: str):
+        filename = os.path.join(manifest.out_dir, f'{part.label}.{fmt}')
+        model_name = f'generate:{part.label}'
+        if fmt == 'stl':
+            mesh_name = f'mesh:{part.label}'
+            def write_stl(outputs):
+                vertices, faces = outputs[mesh_name]
+                write_binary_stl(filename, vertices, faces, header=outputs[model_name].identifier)
+                return filename
+            return write_stl
+        def write_ply(outputs):
+            export_ply(outputs[model_name], filename)
+            return filename
+        return write_ply
+
+    for part in manifest.parts:
+        wing_req = part.request
+        spec_format = SpecFormat(wing_req.spec_format)
+        parse_name = f'parse:{os.path.abspath(wing_req.spec_file)}:{spec_format.value}'
+        if parse_name not in tasks:
+            add(parse_name, 'parse', None, (), parse_func(wing_req.spec_file, spec_format))
+        generate_deps = (f'generate:{part.mirror_of}',) if part.mirror_of is not None else (parse_name,)
+        add(f'generate:{part.label}', 'generate', part.label, generate_deps, generate_func(part, parse_name))
+        if 'stl' in part.formats:
+            mesh_deps = (f'generate:{part.label}',)
+            if part.mirror_of is not None:
+                mesh_deps += (f'mesh:{part.mirror_of}',)
+            add(f'mesh:{part.label}', 'mesh', part.label, mesh_deps, mesh_func(part))
+        for fmt in part.formats:
+            export_deps = (f'generate:{part.label}',) + ((f'mesh:{part.label}',) if fmt == 'stl' else ())
+            add(f'export:{part.label}.{fmt}', 'export', part.label, export_deps, export_func(part, fmt))
+    return tasks
+
+def _run_task(task: BuildTask, outputs: dict)->TaskResult:
+    start = time.perf_counter()
+    try:
+        output = task.func(outputs)
+        return TaskResult(task, 'ok', output, elapsed=time.perf_counter() - start)
+    except Exception:
+        return TaskResult(task, 'failed', error=traceback.format_exc(), elapsed=time.perf_counter() - start)
+
+def run_tasks(tasks: dict[str, BuildTask], max_workers: int | None = None)->dict[str, TaskResult]:
+    """
+    Run a task graph, starting every task as soon as its dependencies are done
+    Args:
+        tasks: task name -> BuildTask
+        max_workers: size of the thread pool; defaults to the ThreadPoolExecutor default.  0 or 1 runs the tasks one
+            at a time, in dependency order, in this thread.
+
+    Returns:
+        dict of task name -> TaskResult, in completion order
+    """
+    waiting: dict[str, set[str]] = {}
+    dependents: dict[str, list[str]] = defaultdict(list)
+    for name, task in tasks.items():
+        for dep in task.deps:
+            if dep not in tasks:
+                raise ValueError(f'Task {name} depends on unknown task {dep}')
+            dependents[dep].append(name)
+        waiting[name] = set(task.deps)
+    _check_acyclic(tasks, dependents)
+
+    results: dict[str, TaskResult] = {}
+    outputs: dict = {}
+    ready = [name for name, deps in waiting.items() if not deps]
+
+    def finish(result: TaskResult):
+        results[result.name] = result
+        if not result.ok:
+            skip(result.name)
+            return
+        outputs[result.name] = result.output
+        for dependent in dependents[result.name]:
+            waiting[dependent].discard(result.name)
+            if not waiting[dependent] and dependent not in results:
+                ready.append(dependent)
+
+    def skip(failed: str):
+        stack = list(dependents[failed])
+        while stack:
+            name = stack.pop()
+            if name in results:
+                continue
+            results[name] = TaskResult(tasks[name], 'skipped', error=f'{failed} did not complete')
+            stack.extend(dependents[name])
+
+    if max_workers is not None and max_workers <= 1:
+        while ready:
+            finish(_run_task(tasks[ready.pop(0)], outputs))
+        return results
+
+    pending: dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while ready or pending:
+            while ready:
+                name = ready.pop(0)
+                pending[executor.submit(_run_task, tasks[name], outputs)] = name
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                finish(future.result())
+    return results
+
+def _check_acyclic(tasks: dict[str, BuildTask], dependents: dict[str, list[str]]):
+    remaining = {name: len(task.deps) for name, task in tasks.items()}
+    stack = [name for name, count in remaining.items() if count == 0]
+    visited = 0
+    while stack:
+        name = stack.pop()
+        visited += 1
+        for dependent in dependents[name]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                stack.append(dependent)
+    if visited != len(tasks):
+        raise ValueError('Build graph has a dependency cycle')
+
+
+class BuildReport:
+    """
+    Consolidated outcome of an aircraft build
+    """
+    def __init__(self, manifest: AircraftManifest, results: dict[str, TaskResult], elapsed: float):
+        """
+        Instantiates a new BuildReport
+        Args:
+            manifest: aircraft that was built
+            results: task name -> TaskResult
+            elapsed: wall time of the whole build, in seconds
+        """
+        self.manifest = manifest
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def ok(self)->bool:
+        return all(result.ok for result in self.results.values())
+
+    @property
+    def failed(self)->list[TaskResult]:
+        """
+        Tasks that failed (not the ones skipped because of them)
+        """
+        return [result for result in self.results.values() if result.status == 'failed']
+
+    def exports(self, label: str)->dict[str, str]:
+        """
+        Exported files of a part
+        Args:
+            label: part label
+
+        Returns:
+            dict of format -> file name, for the exports that completed
+        """
+        return {name.rsplit('.', 1)[1]: result.output for name, result in self.results.items()
+                if result.kind == 'export' and result.part == label and result.ok}
+
+    def model(self, label: str):
+        """
+        Generated WingModel of a part, or None if generation did not complete
+        """
+        result = self.results.get(f'generate:{label}')
+        return result.output if result is not None and result.ok else None
+
+    def to_dict(self)->dict:
+        """
+        JSON-ready form of the report: a summary of every part, and the status and timing of every task
+        """
+        parts = []
+        for part in self.manifest.parts:
+            model = self.model(part.label)
+            parts.append({
+                'label': part.label,
+                'request': str(part.request),
+                'mirror_of': part.mirror_of,
+                'sections': model.section_count if model is not None else None,
+                'span': model.span if model is not None else None,
+                'area': model.area if model is not None else None,
+                'exports': self.exports(part.label),
+            })
+        tasks = [{'name': r.name, 'kind': r.kind, 'part': r.part, 'status': r.status, 'elapsed': r.elapsed,
+                  'error': r.error} for r in self.results.values()]
+        return {'name': self.manifest.name, 'ok': self.ok, 'elapsed': self.elapsed, 'parts': parts, 'tasks': tasks}
+
+    def write_json(self, filename: str):
+        """
+        Write the report as JSON
+        Args:
+            filename: path and file name of the report
+        """
+        with open(filename, 'w', encoding='utf-8') as fout:
+            json.dump(self.to_dict(), fout, indent=4)
+
+    def __str__(self)->str:
+        counts = defaultdict(int)
+        for result in self.results.values():
+            counts[result.status] += 1
+        lines = [f'Aircraft {self.manifest.name}: {len(self.manifest.parts)} parts, {len(self.results)} tasks '
+                 f'({counts["ok"]} ok, {counts["failed"]} failed, {counts["skipped"]} skipped), {self.elapsed:.3f}s']
+        for part in self.manifest.parts:
+            files = ', '.join(self.exports(part.label).values()) or 'no exports'
+            lines.append(f'  {part.label}: {files}')
+        for result in self.failed:
+            lines.append(f'  {result.name} failed:\n{result.error}')
+        return '\n'.join(lines)
+
+
+def build_aircraft(manifest: AircraftManifest | str, max_workers: int | None = None,
+                   specs: spec_cache.SpecCache | None = None, build_cache: BuildCache | None = None)->BuildReport:
+    """
+    Build every part of an aircraft
+    Args:
+        manifest: AircraftManifest, or the path to a manifest file
+        max_workers: size of the thread pool; 0 or 1 runs the tasks one at a time
+        specs: spec cache used to parse the spec files; defaults to spec_cache.default_cache()
+        build_cache: optional build cache, to reuse models and meshes of unchanged parts between builds
+
+    Returns:
+        BuildReport of the build
+    """
+    if isinstance(manifest, str):
+        manifest = AircraftManifest.load(manifest)
+    start = time.perf_counter()
+    tasks = plan_build(manifest, specs, build_cache)
+    if any(part.formats for part in manifest.parts):
+        os.makedirs(manifest.out_dir, exist_ok=True)
+    results = run_tasks(tasks, max_workers)
+    return BuildReport(manifest, results, time.perf_counter() - start)
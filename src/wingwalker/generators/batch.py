@@ -0,0 +1,194 @@
+"""
+Batch and parameter-sweep generation of wing models.
+
+Each distinct spec file in a batch is parsed once, in the parent process.  Generation (and optional export) of
+each request runs on a process pool, and results are yielded in completion order.  A failing request produces a
+BatchResult holding the error; the rest of the batch carries on.
+"""
+import copy
+import itertools
+import os
+import time
+import traceback
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.generators.stations import plan_stations
+from wingwalker.generators.wing import generate_wing, get_functor
+from wingwalker.io import spec_cache
+from wingwalker.models.airfoil_specs import AirfoilSpecs
+from wingwalker.models.enums import SpecFormat
+from wingwalker.models.wing_model import WingModel
+
+EXPORT_FORMATS = ('stl', 'ply')
+
+
+class BatchResult:
+    """
+    Outcome of one request in a batch
+    """
+    __slots__ = ('index', 'request', 'model', 'exports', 'error', 'elapsed')
+
+    def __init__(self, index: int, request: WingRequest, model: WingModel | None = None,
+                 exports: dict[str, str] | None = None, error: str | None = None, elapsed: float = 0.0):
+        self.index = index
+        self.request = request
+        self.model = model
+        self.exports = exports if exports is not None else {}
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self)->bool:
+        return self.error is None
+
+    def __str__(self)->str:
+        status = 'ok' if self.ok else 'failed'
+        return f'Batch job {self.index}: {self.request}, {status}, {self.elapsed:.3f}s'
+
+
+def sweep_requests(base: WingRequest, **axes: Iterable)->list[WingRequest]:
+    """
+    Expand a base request into the full grid of variants over the given attributes
+    Args:
+        base: request holding the values shared by every variant
+        **axes: WingRequest attribute name -> values to sweep, e.g. span=[200, 256], twist=[0.0, -0.035]
+
+    Returns:
+        One request per combination of values, in row-major order of the given axes
+    """
+    for name in axes:
+        if not hasattr(base, name):
+            raise AttributeError(f'WingRequest has no attribute {name}')
+    names = list(axes.keys())
+    variants = []
+    for values in itertools.product(*(list(axes[name]) for name in names)):
+        req = copy.deepcopy(base)
+        for name, value in zip(names, values):
+            setattr(req, name, value)
+        variants.append(req)
+    return variants
+
+def _spec_key(wing_req: WingRequest)->tuple[str, SpecFormat]:
+    return os.path.abspath(wing_req.spec_file), SpecFormat(wing_req.spec_format)
+
+def _run_job(index: int, wing_req: WingRequest, af_specs: AirfoilSpecs, tolerance: float | None,
+             export_formats: tuple[str, ...], out_dir: str | None, keep_model: bool)->BatchResult:
+    """
+    Generate (and export) one wing model.  Runs in a worker process, so it must stay a module-level function.
+    """
+    start = time.perf_counter()
+    try:
+        functor = get_functor(wing_req)
+        t_values = None
+        if tolerance is not None:
+            t_values = plan_stations(wing_req, functor, tolerance, af_specs)
+        wing_model = generate_wing(wing_req, af_specs, functor.chord_func(), functor.twist_func(),
+                                   functor.z_func(), functor.area_func(), t_values)
+        exports = {}
+        if export_formats:
+            # Imported here so the workers only pay for the exporters when they are used
+            from wingwalker.io.exports import export_ply, export_stl
+            exporters = {'stl': export_stl, 'ply': export_ply}
+            for fmt in export_formats:
+                filename = os.path.join(out_dir, f'{index:05d}_{wing_model.identifier}.{fmt}')
+                exporters[fmt](wing_model, filename)
+                exports[fmt] = filename
+        return BatchResult(index, wing_req, wing_model if keep_model else None, exports,
+                           elapsed=time.perf_counter() - start)
+    except Exception:
+        return BatchResult(index, wing_req, error=traceback.format_exc(), elapsed=time.perf_counter() - start)
+
+def generate_batch(requests: Iterable[WingRequest], max_workers: int | None = None,
+                   export_formats: Iterable[str] = (), out_dir: str | None = None,
+                   tolerance: float | None = None, keep_models: bool = True,
+                   cache: spec_cache.SpecCache | None = None)->Iterator[BatchResult]:
+    """
+    Generate wing models for many requests, spreading the work over a process pool.
+
+    The requests are checked and their spec files parsed when this is called; the jobs run as the returned
+    iterator is consumed.  Results are yielded as jobs complete, so they are not in request order; BatchResult.index gives the position
+    of the request.  Errors (including spec files that fail to parse) are captured on the result instead of
+    stopping the batch.
+    Args:
+        requests: WingRequests to build
+        max_workers: size of the process pool; defaults to the CPU count.  0 or 1 runs every job in this process.
+        export_formats: any of 'stl', 'ply'; each model is exported to out_dir in these formats
+        out_dir: directory for the exported files; required when export_formats is given
+        tolerance: geometric tolerance for adaptive section placement (see plan_stations); None uses every iteration
+        keep_models: send the generated WingModels back with the results.  Turn off for export-only batches, to
+            avoid copying every model back from the workers.
+        cache: spec cache used to parse the spec files; defaults to spec_cache.default_cache()
+
+    Returns:
+        Iterator of BatchResult, in completion order
+    """
+    export_formats = tuple(fmt.lower() for fmt in export_formats)
+    for fmt in export_formats:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f'Unknown export format {fmt}')
+    if export_formats:
+        if out_dir is None:
+            raise ValueError('out_dir is required for exports')
+        os.makedirs(out_dir, exist_ok=True)
+
+    # Parse every distinct spec file once, up front
+    jobs = []
+    specs: dict[tuple[str, SpecFormat], AirfoilSpecs | str] = {}
+    for index, wing_req in enumerate(requests):
+        try:
+            key = _spec_key(wing_req)
+            if key not in specs:
+                try:
+                    specs[key] = spec_cache.load_specs(wing_req.spec_file, key[1], cache)
+                except Exception:
+                    specs[key] = traceback.format_exc()
+            jobs.append((index, wing_req, specs[key]))
+        except Exception:
+            jobs.append((index, wing_req, traceback.format_exc()))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    job_options = (tolerance, export_formats, out_dir, keep_models)
+    return _iter_results(jobs, job_options, max_workers)
+
+def _iter_results(jobs: list, job_options: tuple, max_workers: int)->Iterator[BatchResult]:
+    """
+    Run the prepared jobs, yielding results as they complete
+    """
+    def job_args(job):
+        return job + job_options
+
+    if max_workers <= 1:
+        for job in jobs:
+            if isinstance(job[2], str):
+                yield BatchResult(job[0], job[1], error=job[2])
+            else:
+                yield _run_job(*job_args(job))
+        return
+
+    pending: dict[Future, tuple[int, WingRequest]] = {}
+    # Keep a bounded number of jobs in flight, so large sweeps do not queue every request (and its specs) at once
+    window = max_workers * 2
+    job_iter = iter(jobs)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            while len(pending) < window:
+                job = next(job_iter, None)
+                if job is None:
+                    break
+                if isinstance(job[2], str):
+                    yield BatchResult(job[0], job[1], error=job[2])
+                    continue
+                pending[executor.submit(_run_job, *job_args(job))] = (job[0], job[1])
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, wing_req = pending.pop(future)
+                try:
+                    yield future.result()
+                except Exception:
+                    # The worker died, or its result could not be sent back
+                    yield BatchResult(index, wing_req, error=traceback.format_exc())
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 from wingwalker.build_params.wing_request import WingRequest
 from wingwalker.generators.iterators import ParamFunctor
 
@@ -19,9 +21,9 @@ class EllipticalFunctor(ParamFunctor):
         """
         Returns chord function for elliptical planform
         Returns:
-            lambda for chord(t) = t * math.cos(pi / (2.0 * (iterations - 1)))
+            lambda for chord(t) = t * np.cos(pi / (2.0 * (iterations - 1)))
         """
-        return lambda t: 2.0 * self.a_len * math.cos(t*self.alpha_chunk)
+        return lambda t: 2.0 * self.a_len * np.cos(t*self.alpha_chunk)
 
     def twist_func(self):
         """
@@ -35,9 +37,9 @@ class EllipticalFunctor(ParamFunctor):
         """
         Returns z function for elliptical planform
         Returns:
-            lambda for z(t) = t * math.sin(pi / (2.0 * (iterations - 1)))
+            lambda for z(t) = t * np.sin(pi / (2.0 * (iterations - 1)))
         """
-        return lambda t: self.b_len * math.sin(t*self.alpha_chunk)
+        return lambda t: self.b_len * np.sin(t*self.alpha_chunk)
 
     def area_func(self):
         return lambda: math.pi*self.a_len*self.b_len
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 from wingwalker.build_params.wing_request import WingRequest
 
 
@@ -58,6 +60,97 @@ class ParamFunctor(ABC):
         """
         return lambda: self.base_chord * self.length
 
+    def t_from_stations(self, stations)->np.ndarray:
+        """
+        Convert normalized span stations (0.0 at the base, 1.0 at the end of the wing) to values of (t)
+        Args:
+            stations: array (or scalar) of normalized span stations
+
+        Returns:
+            float array of t values, on the same [0, iterations - 1] scale as TIterator
+        """
+        return np.asarray(stations, dtype=float) * (self.iterations - 1)
+
+    def chord_array(self, t_values)->np.ndarray:
+        """
+        chord(t) for an array of t values.  Scalar-only chord functions are vectorized by evaluate_param.
+        Args:
+            t_values: array (or scalar) of t values
+
+        Returns:
+            float array of chord lengths, the same shape as t_values
+        """
+        return evaluate_param(self.chord_func(), t_values)
+
+    def twist_array(self, t_values)->np.ndarray:
+        """
+        twist(t) for an array of t values.  Scalar-only twist functions are vectorized by evaluate_param.
+        Args:
+            t_values: array (or scalar) of t values
+
+        Returns:
+            float array of twists, the same shape as t_values
+        """
+        return evaluate_param(self.twist_func(), t_values)
+
+    def z_array(self, t_values)->np.ndarray:
+        """
+        z(t) for an array of t values.  Scalar-only z functions are vectorized by evaluate_param.
+        Args:
+            t_values: array (or scalar) of t values
+
+        Returns:
+            float array of z positions, the same shape as t_values
+        """
+        return evaluate_param(self.z_func(), t_values)
+
+    def evaluate(self, t_values)->tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluate chord(t), twist(t) and z(t) for an array of t values
+        Args:
+            t_values: array (or scalar) of t values
+
+        Returns:
+            Tuple of (in order): chords, twists, z positions
+        """
+        return self.chord_array(t_values), self.twist_array(t_values), self.z_array(t_values)
+
+    def evaluate_stations(self, stations)->tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluate chord, twist and z at normalized span stations (0.0 at the base, 1.0 at the end of the wing)
+        Args:
+            stations: array (or scalar) of normalized span stations
+
+        Returns:
+            Tuple of (in order): chords, twists, z positions
+        """
+        return self.evaluate(self.t_from_stations(stations))
+
+
+def evaluate_param(func, t_values)->np.ndarray:
+    """
+    Evaluate a parametrized function (chord(t), twist(t), z(t)) for every value of t at once.
+
+    The function is first called with the whole array of t values.  Functions that only accept scalar
+    values (e.g. built on math.cos, or using if/else on t) fall back to one call per t.
+    Args:
+        func: lambda function of t
+        t_values: array (or scalar) of t values
+
+    Returns:
+        float array of the same shape as t_values, holding func(t) for each t
+    """
+    t_values = np.asarray(t_values, dtype=float)
+    try:
+        values = np.asarray(func(t_values), dtype=float)
+        # Constant functions (e.g. chord(t) = base_chord) return a single value for the whole array
+        return np.array(np.broadcast_to(values, t_values.shape), dtype=float)
+    except (TypeError, ValueError):
+        flat_t = t_values.ravel()
+        values = np.fromiter((func(t) for t in flat_t), dtype=float, count=flat_t.size)
+        return values.reshape(t_values.shape)
+
+
 class TIterator:
     """
     Iterator for values of (t) as inputs for the lambda functions
@@ -75,3 +168,11 @@ class TIterator:
         current_t = self.t
         self.t += 1
         return current_t
+
+    def to_array(self)->np.ndarray:
+        """
+        All values of (t), as a float array, for batched evaluation of the lambda functions
+        Returns:
+            numpy array [0, 1, ..., iterations - 1]
+        """
+        return np.arange(self.iterations, dtype=float)
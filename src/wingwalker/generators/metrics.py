@@ -0,0 +1,122 @@
+"""
+Design metrics straight from the planform and the airfoil's unit-chord properties, without generating any geometry.
+
+Every planform has a closed form for the span integrals of chord and chord squared, so metrics for thousands of
+requests are a handful of array operations.  Inputs are columns (one entry per design) and broadcast against each
+other.
+"""
+from collections.abc import Sequence
+
+import numpy as np
+
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.models.airfoil_specs import AirfoilSpecs
+from wingwalker.models.enums import Planform
+
+METRIC_NAMES = ('area', 'mac', 'aspect_ratio', 'planform_area', 'wetted_area', 'volume', 'root_thickness',
+                'tip_thickness')
+
+
+def _planform_column(planform)->np.ndarray:
+    if isinstance(planform, (str, Planform)):
+        return np.array(Planform(planform).value)
+    return np.array([Planform(p).value for p in planform])
+
+def planform_metrics(planform, base_chord, end_chord, span, unit_area=0.0, unit_perimeter=0.0,
+                     unit_thickness=0.0)->dict[str, np.ndarray]:
+    """
+    Evaluate the design metrics for columns of wing parameters.
+
+    area, mac and aspect_ratio match the values reported by WingModel (from the planform's area_func).  The
+    remaining metrics are for a single wing: planform_area is the integral of chord over the span, wetted_area is
+    the unit perimeter times planform_area (root and tip faces excluded), volume is the unit section area times the
+    integral of chord squared, and the thicknesses are the unit thickness scaled by the root and tip chords.
+    Args:
+        planform: Planform (or its value) per design, or one for every design
+        base_chord: chord length at the base
+        end_chord: chord length at the end (only used by geometric planforms)
+        span: length of the wing
+        unit_area: AirfoilSpecs.unit_area of each design's airfoil
+        unit_perimeter: AirfoilSpecs.unit_perimeter of each design's airfoil
+        unit_thickness: AirfoilSpecs.unit_thickness of each design's airfoil
+
+    Returns:
+        dict of metric name (see METRIC_NAMES) -> float array, one entry per design
+    """
+    planform = _planform_column(planform)
+    base_chord, end_chord, span, unit_area, unit_perimeter, unit_thickness = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (base_chord, end_chord, span, unit_area, unit_perimeter,
+                                                unit_thickness)))
+    planform = np.broadcast_to(planform, base_chord.shape)
+
+    rectangular = planform == Planform.RECTANGULAR.value
+    ellipse = planform == Planform.ELLIPSE.value
+    geometric = planform == Planform.GEOMETRIC.value
+    unknown = ~(rectangular | ellipse | geometric)
+    if np.any(unknown):
+        raise ValueError(f'Unknown planform {planform[unknown].flat[0]}')
+
+    # Chord at the tip, integral of chord and of chord squared over the span, per planform
+    tip_chord = np.select([rectangular, ellipse], [base_chord, 0.0], end_chord)
+    chord_integral = np.select(
+        [rectangular, ellipse],
+        [base_chord * span, np.pi * base_chord * span / 4.0],
+        (base_chord + end_chord) * span / 2.0)
+    chord_sq_integral = np.select(
+        [rectangular, ellipse],
+        [base_chord * base_chord * span, 2.0 * base_chord * base_chord * span / 3.0],
+        (base_chord * base_chord + base_chord * end_chord + end_chord * end_chord) * span / 3.0)
+    # Same as the functors' area_func: the elliptical planform reports the area of the full ellipse
+    area = np.where(ellipse, np.pi * base_chord * span / 2.0, chord_integral)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mac = np.where(span != 0.0, area / span, 0.0)
+        aspect_ratio = np.where(area != 0.0, 2.0 * span * span / area, 0.0)
+
+    return {
+        'area': area,
+        'mac': mac,
+        'aspect_ratio': aspect_ratio,
+        'planform_area': chord_integral,
+        'wetted_area': unit_perimeter * chord_integral,
+        'volume': unit_area * chord_sq_integral,
+        'root_thickness': unit_thickness * base_chord,
+        'tip_thickness': unit_thickness * tip_chord,
+    }
+
+def request_metrics(requests: Sequence[WingRequest],
+                    af_specs: AirfoilSpecs | Sequence[AirfoilSpecs] | None = None)->dict[str, np.ndarray]:
+    """
+    Design metrics for a list of wing requests
+    Args:
+        requests: WingRequests to evaluate
+        af_specs: airfoil specs shared by every request, or one per request; None leaves the airfoil-dependent
+            metrics at zero
+
+    Returns:
+        dict of metric name -> float array, in the order of the requests
+    """
+    if af_specs is None:
+        unit_props = (0.0, 0.0, 0.0)
+    else:
+        specs_list = [af_specs] if isinstance(af_specs, AirfoilSpecs) else af_specs
+        unit_props = np.array([(s.unit_area, s.unit_perimeter, s.unit_thickness) for s in specs_list]).T
+    return planform_metrics(
+        [r.planform for r in requests],
+        [r.base_chord for r in requests],
+        [r.end_chord for r in requests],
+        [r.span for r in requests],
+        *unit_props
+    )
+
+def wing_metrics(wing_req: WingRequest, af_specs: AirfoilSpecs | None = None)->dict[str, float]:
+    """
+    Design metrics for a single wing request
+    Args:
+        wing_req: requirements for the wing
+        af_specs: airfoil specifications; optional
+
+    Returns:
+        dict of metric name -> value
+    """
+    return {name: float(value[0]) for name, value in request_metrics([wing_req], af_specs).items()}
@@ -0,0 +1,133 @@
+"""
+Rib templates for every section of a wing, nested onto fixed-size sheets (e.g. for a laser cutter).
+
+Each section's outline is turned back by its twist, so ribs are cut flat on their chord line, and the outlines are
+packed by their bounding boxes (see processing.nesting).  One SVG is written per sheet, with one path per rib.
+"""
+import os
+
+import numpy as np
+
+from wingwalker.models.wing_model import WingModel
+from wingwalker.processing.nesting import PackingResult, pack_rectangles
+from wingwalker.svg import SvgStream, iter_path_data
+
+
+class RibLayout:
+    """
+    Rib outlines of a wing model and their placement on sheets
+    """
+    def __init__(self, outlines: np.ndarray, sections: np.ndarray, packing: PackingResult):
+        """
+        Instantiates a new RibLayout
+        Args:
+            outlines: float array of shape (ribs, points, 2), each outline with its bounding box corner at [0,0]
+            sections: section index (in the wing model) of each rib
+            packing: placement of the outlines' bounding boxes
+        """
+        self.outlines = outlines
+        self.sections = sections
+        self.packing = packing
+
+    @property
+    def sheet_count(self)->int:
+        return self.packing.sheet_count
+
+    @property
+    def utilization(self)->float:
+        """
+        Fraction of the area of all used sheets covered by ribs
+        """
+        return self.packing.utilization
+
+    def placed_outline(self, rib: int)->np.ndarray:
+        """
+        Outline of a rib, rotated and moved to its place on its sheet
+        Args:
+            rib: rib index (position in outlines)
+
+        Returns:
+            float array of shape (points, 2) in sheet coordinates
+        """
+        placement = self.packing.placements[rib]
+        outline = self.outlines[rib]
+        if placement.rotated:
+            # Quarter turn, then back to a [0,0] bounding box corner
+            outline = np.column_stack((outline[:, 1].max() - outline[:, 1], outline[:, 0]))
+        return outline + (placement.x, placement.y)
+
+    def __str__(self)->str:
+        return f'Rib layout: {len(self.sections)} ribs, {self.packing}'
+
+
+def rib_outlines(model: WingModel)->np.ndarray:
+    """
+    2D outlines of every section of the model, untwisted, with each bounding box corner at [0,0]
+    Args:
+        model: wing model
+
+    Returns:
+        float array of shape (sections, points, 2)
+    """
+    cos_t = np.cos(model.twists).reshape(-1, 1)
+    sin_t = np.sin(model.twists).reshape(-1, 1)
+    xs = model.coords[..., 0]
+    ys = model.coords[..., 1]
+    outlines = np.empty(model.coords.shape[:2] + (2,), dtype=float)
+    # Rotate by -twist to lay the chord back along the x axis
+    outlines[..., 0] = cos_t * xs + sin_t * ys
+    outlines[..., 1] = cos_t * ys - sin_t * xs
+    outlines -= outlines.min(axis=1, keepdims=True)
+    return outlines
+
+def nest_ribs(model: WingModel, sheet_width: float, sheet_height: float, spacing: float = 2.0,
+              rotate: bool = True, min_chord: float = 1.0)->RibLayout:
+    """
+    Pack the rib outlines of every section of a wing model onto sheets
+    Args:
+        model: wing model
+        sheet_width: width of each sheet, in model units
+        sheet_height: height of each sheet, in model units
+        spacing: gap between ribs, and between ribs and the sheet edges
+        rotate: allow ribs to be turned by 90 degrees
+        min_chord: sections with a shorter chord (e.g. the tip of an elliptical wing) are left out
+
+    Returns:
+        RibLayout holding the outlines and their placement
+    """
+    sections = np.flatnonzero(np.abs(model.chords) >= min_chord)
+    outlines = rib_outlines(model)[sections]
+    sizes = outlines.max(axis=1)
+    areas = model.af_specs.area(1.0) * model.chords[sections] ** 2
+    packing = pack_rectangles(sizes, sheet_width, sheet_height, spacing, rotate, areas)
+    return RibLayout(outlines, sections, packing)
+
+def write_rib_sheets(layout: RibLayout, base_name: str, units: str = 'mm', precision: int | None = 3,
+                     l_width: float = 0.1)->list[str]:
+    """
+    Write one SVG per sheet of a rib layout
+    Args:
+        layout: nested ribs (see nest_ribs)
+        base_name: path and base name of the files; the sheet number is appended
+        units: units of the SVG images
+        precision: number of decimal places in the paths
+        l_width: width of the cut lines
+
+    Returns:
+        List of the SVG file names, one per sheet
+    """
+    out_dir = os.path.dirname(base_name)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    by_sheet: list[list[int]] = [[] for _ in range(layout.sheet_count)]
+    for rib, placement in enumerate(layout.packing.placements):
+        by_sheet[placement.sheet].append(rib)
+    file_names = []
+    for sheet, ribs in enumerate(by_sheet):
+        file_name = f'{base_name}_sheet{sheet + 1:03d}.svg'
+        with SvgStream(file_name, layout.packing.sheet_width, layout.packing.sheet_height, units) as svg_out:
+            for rib in ribs:
+                svg_out.path(iter_path_data(layout.placed_outline(rib), precision, close_loop=True),
+                             f'rib_{int(layout.sections[rib]):04d}', l_width)
+        file_names.append(file_name)
+    return file_names
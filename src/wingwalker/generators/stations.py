@@ -0,0 +1,104 @@
+"""
+Adaptive placement of airfoil sections along the wing span.
+
+TIterator spaces sections evenly in (t).  The station planner instead places them where chord, twist or z change
+fastest, so that the lofted surface between neighbouring sections stays within a geometric tolerance of the
+planform.
+"""
+import heapq
+
+import numpy as np
+
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.generators.iterators import ParamFunctor
+from wingwalker.models.airfoil_specs import AirfoilSpecs
+
+
+def profile_radius(af_specs: AirfoilSpecs | None)->float:
+    """
+    Largest distance from the unit-chord centroid to a point of the airfoil trace.  Chord and twist errors
+    move the section points by at most this much per unit of chord.
+    Args:
+        af_specs: airfoil specifications; None for a conservative bound of one chord length
+
+    Returns:
+        Radius of the unit-chord profile about its centroid
+    """
+    if af_specs is None or len(af_specs.x) == 0:
+        return 1.0
+    cx, cy = af_specs.unit_centroid
+    return float(np.hypot(af_specs.x - cx, af_specs.y - cy).max())
+
+def _segment_error(chords: np.ndarray, twists: np.ndarray, zs: np.ndarray, radius: float, i0: int, i1: int):
+    """
+    Deviation between the densely sampled planform and the straight loft from sample i0 to sample i1
+    Returns:
+        Tuple of (largest error, sample index where it occurs)
+    """
+    if i1 - i0 < 2:
+        return 0.0, i0
+    span = zs[i1] - zs[i0]
+    inner = slice(i0 + 1, i1)
+    if span != 0.0:
+        # The loft is linear in z between the two sections, so compare at the same z position
+        u = (zs[inner] - zs[i0]) / span
+    else:
+        u = np.arange(1, i1 - i0) / (i1 - i0)
+    chord_err = np.abs(chords[inner] - (chords[i0] + u * (chords[i1] - chords[i0])))
+    twist_err = np.abs(twists[inner] - (twists[i0] + u * (twists[i1] - twists[i0])))
+    error = radius * (chord_err + np.abs(chords[inner]) * twist_err)
+    worst = int(np.argmax(error))
+    # Points lofted straight between two twisted sections cut inside the arc they sweep
+    sagitta = radius * max(abs(chords[i0]), abs(chords[i1])) * (1.0 - np.cos(0.5 * (twists[i1] - twists[i0])))
+    if sagitta > error[worst]:
+        return float(sagitta), (i0 + i1) // 2
+    return float(error[worst]), i0 + 1 + worst
+
+def plan_stations(build_params: WingRequest, functor: ParamFunctor, tolerance: float,
+                  af_specs: AirfoilSpecs | None = None, max_sections: int | None = None,
+                  samples: int | None = None)->np.ndarray:
+    """
+    Choose the values of (t) at which to place sections, so the loft between neighbouring sections stays
+    within tolerance of the planform.
+
+    The planform is sampled densely, then split (largest error first) until every span between sections is
+    within tolerance.  The error of a span is the largest movement of an airfoil point, from the chord and twist
+    of the sampled planform to the straight-line loft at the same z, or the sagitta of the twist between the end
+    sections of the span, whichever is larger.  A rectangular wing without twist needs only its root and tip
+    sections.
+    Args:
+        build_params: requirements for the wing; iterations sets the range of t
+        functor: ParamFunctor for the planform
+        tolerance: largest allowed deviation, in the same units as the chord and span
+        af_specs: airfoil specifications, used for the size of the profile; optional
+        max_sections: upper limit on the number of sections; optional
+        samples: number of planform samples; defaults to 64 per iteration interval (at least 1025)
+
+    Returns:
+        Sorted float array of t values, always including the base (0) and the end (iterations - 1)
+    """
+    if tolerance <= 0.0:
+        raise ValueError('tolerance must be greater than zero')
+    last_t = float(build_params.iterations - 1)
+    if samples is None:
+        samples = max(64 * (build_params.iterations - 1) + 1, 1025)
+    t_samples = np.linspace(0.0, last_t, samples)
+    chords, twists, zs = functor.evaluate(t_samples)
+    radius = profile_radius(af_specs)
+
+    selected = {0, samples - 1}
+    limit = max_sections if max_sections is not None else samples
+    error, split = _segment_error(chords, twists, zs, radius, 0, samples - 1)
+    # Max-heap on error (heapq is a min-heap, so errors are negated)
+    pending = [(-error, 0, samples - 1, split)]
+    while pending and len(selected) < limit:
+        neg_error, i0, i1, split = heapq.heappop(pending)
+        if -neg_error <= tolerance:
+            break
+        selected.add(split)
+        for a, b in ((i0, split), (split, i1)):
+            seg_error, seg_split = _segment_error(chords, twists, zs, radius, a, b)
+            if seg_error > tolerance:
+                heapq.heappush(pending, (-seg_error, a, b, seg_split))
+
+    return t_samples[sorted(selected)]
@@ -1,46 +1,63 @@
+import copy
+from typing import TYPE_CHECKING
+
 import numpy as np
-from pyvista import PolyData
-from shapely.geometry import Point
-import pyvista as pv
 
 from wingwalker.build_params.wing_request import WingRequest
 from wingwalker.generators.elliptical import EllipticalFunctor
 from wingwalker.generators.geometric import GeometricFunctor
-from wingwalker.generators.iterators import TIterator
+from wingwalker.generators.iterators import ParamFunctor, TIterator, evaluate_param
 from wingwalker.generators.rectangular import RectangularFunctor
+from wingwalker.generators.stations import plan_stations
+from wingwalker.instrumentation import stage
 from wingwalker.models.airfoil_section import AirfoilSection
 from wingwalker.models.airfoil_specs import AirfoilSpecs
-from wingwalker.models.enums import Planform
-from wingwalker.io import specs
+from wingwalker.models.enums import Planform, WingType
+from wingwalker.io import spec_cache
 from wingwalker.models.wing_model import WingModel
 
+if TYPE_CHECKING:
+    import pyvista as pv
+    from shapely.geometry import Point
 
-def get_lambdas(build_params: WingRequest):
+
+def get_functor(build_params: WingRequest)->ParamFunctor:
     """
-    Function to return the correct set of chord(t), twist(t), and z(t) lambdas for the
+    Function to return the parametrized functor (chord, twist, z and area functions) for the planform of the
     given request
     Args:
         build_params: Specifications for the wing to be built
 
     Returns:
-        Tuple of (in order): chord(t), twist(t), z(t)
+        ParamFunctor for the request's planform
     """
     match build_params.planform:
         case Planform.RECTANGULAR:
-            rect = RectangularFunctor(build_params)
-            return rect.chord_func(), rect.twist_func(), rect.z_func(), rect.area_func()
+            return RectangularFunctor(build_params)
         case Planform.ELLIPSE:
-            ell = EllipticalFunctor(build_params)
-            return ell.chord_func(), ell.twist_func(), ell.z_func(), ell.area_func()
+            return EllipticalFunctor(build_params)
         case Planform.GEOMETRIC:
-            geo = GeometricFunctor(build_params)
-            return geo.chord_func(), geo.twist_func(), geo.z_func(), geo.area_func()
+            return GeometricFunctor(build_params)
         case _:
             raise ValueError(f'Unknown planform {build_params.planform.name}')
 
+def get_lambdas(build_params: WingRequest):
+    """
+    Function to return the correct set of chord(t), twist(t), and z(t) lambdas for the
+    given request
+    Args:
+        build_params: Specifications for the wing to be built
+
+    Returns:
+        Tuple of (in order): chord(t), twist(t), z(t)
+    """
+    functor = get_functor(build_params)
+    return functor.chord_func(), functor.twist_func(), functor.z_func(), functor.area_func()
+
 def get_airfoil_specs(build_params: WingRequest)->AirfoilSpecs:
     """
-    Reads in specifications from the given source
+    Reads in specifications from the given source.  Parsed specs are shared through the spec cache, so a spec
+    file is only parsed again when its content changes.
     Args:
         build_params: Wing specifications
 
@@ -49,11 +66,12 @@ def get_airfoil_specs(build_params: WingRequest)->AirfoilSpecs:
     """
     src_file = build_params.spec_file
     src_format = build_params.spec_format
-    spec_data = specs.parse_specfile(src_file, src_format)
-    print(spec_data.__repr__())
+    with stage('get_airfoil_specs', spec_file=src_file) as record:
+        spec_data = spec_cache.load_specs(src_file, src_format)
+        record.points = len(spec_data.coords)
     return spec_data
 
-def transform_matrix_z(theta_rad: float, centroid: Point)-> np.ndarray[tuple[float, float]]:
+def transform_matrix_z(theta_rad: float, centroid: 'Point')-> np.ndarray[tuple[float, float]]:
     """
     Create the rotations/translation matrix about the z-axis.  The resulting matrix will
     rotate the points about the z axis by the given angle (in radians), and translate from the centroid back
@@ -75,6 +93,44 @@ def transform_matrix_z(theta_rad: float, centroid: Point)-> np.ndarray[tuple[flo
 
     return np.array(transform_matrix, dtype=float)
 
+def generate_sections_array(chords: np.ndarray, twists: np.ndarray, z_indices: np.ndarray, mirror: bool,
+                            af_specs: AirfoilSpecs)->np.ndarray:
+    """
+    Generate the coordinates for a batch of airfoil sections in one pass.
+
+    Applies the same scale/rotate/translate steps as transform_matrix_z, broadcast over every section and every
+    point of the airfoil trace at once.
+    Args:
+        chords: 1D array of section chord lengths
+        twists: 1D array of section twists (radians) relative to the base
+        z_indices: 1D array of section distances from the base
+        mirror: mirrored (left)
+        af_specs: airfoil specifications
+
+    Returns:
+        Contiguous float array of shape (sections, points, 3) holding the transformed coordinates
+    """
+    chords = np.asarray(chords, dtype=float).reshape(-1, 1)
+    twists = np.asarray(twists, dtype=float).reshape(-1, 1)
+    z_indices = np.asarray(z_indices, dtype=float).reshape(-1, 1)
+    mirror_val = -1.0 if mirror else 1.0
+    unit_x = af_specs.x.reshape(1, -1)
+    unit_y = af_specs.y.reshape(1, -1) * mirror_val
+    # The centroid scales linearly with the chord, so only the unit-chord centroid is needed
+    unit_cx, unit_cy = af_specs.unit_centroid
+    unit_cy *= mirror_val
+
+    xs = chords * unit_x
+    ys = chords * unit_y
+    cos_t = np.cos(twists)
+    sin_t = np.sin(twists)
+
+    coords = np.empty((chords.shape[0], unit_x.shape[1], 3), dtype=float)
+    coords[..., 0] = cos_t * xs - sin_t * ys - chords * unit_cx
+    coords[..., 1] = sin_t * xs + cos_t * ys - chords * unit_cy
+    coords[..., 2] = z_indices
+    return coords
+
 def generate_section(chord: float, twist: float, z: float, mirror: bool, af_specs: AirfoilSpecs)->AirfoilSection:
     """
     Generated an airfoil section from the given specs and parameters
@@ -88,17 +144,55 @@ def generate_section(chord: float, twist: float, z: float, mirror: bool, af_spec
     Returns:
         AirfoilSection meeting the requirements
     """
-    centroid = af_specs.centroid(chord, z, mirror)
-    tform = transform_matrix_z(twist, centroid)
-    coords: list[Point] = []
-    for p in af_specs.trace(chord, z, mirror):
-        vect = np.array([ p.x, p.y, p.z, 1.0], dtype=float)
-        vect_prime = tform @ vect
-        coords.append(Point(vect_prime[0], vect_prime[1], vect_prime[2]))
+    coords = generate_sections_array(
+        np.array([chord]), np.array([twist]), np.array([z]), mirror, af_specs
+    )[0]
 
     return AirfoilSection(coords=coords, chord=chord, z_index=z, twist=twist, spec_name=af_specs.designation)
 
-def generate_wing(wing_params: WingRequest, af_specs: AirfoilSpecs, c_func, twist_func, z_func, area_func)->WingModel:
+def evaluate_wing_params(wing_params: WingRequest, c_func, twist_func, z_func,
+                         t_values: np.ndarray | None = None)->tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Evaluate the chord, twist and z functions for every value of t along the wing span
+    Args:
+        wing_params: requirements for the wing
+        c_func: function(t) for chord length at param t
+        twist_func: function(t) for twist at param t
+        z_func: function(t) for z at param t
+        t_values: values of t for the sections (e.g. from plan_stations); defaults to every TIterator step
+
+    Returns:
+        Tuple of (in order): chords, twists, z indices, as 1D float arrays with one entry per section
+    """
+    if t_values is None:
+        t_values = TIterator(wing_params).to_array()
+    else:
+        t_values = np.asarray(t_values, dtype=float)
+    chords = evaluate_param(c_func, t_values)
+    twists = evaluate_param(twist_func, t_values)
+    z_indices = evaluate_param(z_func, t_values)
+    return chords, twists, z_indices
+
+def generate_wing_array(wing_params: WingRequest, af_specs: AirfoilSpecs, c_func, twist_func, z_func,
+                        t_values: np.ndarray | None = None)->np.ndarray:
+    """
+    Batched generation of the wing coordinates, without building any section objects
+    Args:
+        wing_params: requirements for the wing
+        af_specs: airfoil specifications
+        c_func: function(t) for chord length at param t
+        twist_func: function(t) for twist at param t
+        z_func: function(t) for z at param t
+        t_values: values of t for the sections; defaults to every TIterator step
+
+    Returns:
+        Contiguous float array of shape (sections, points, 3)
+    """
+    chords, twists, z_indices = evaluate_wing_params(wing_params, c_func, twist_func, z_func, t_values)
+    return generate_sections_array(chords, twists, z_indices, wing_params.mirrored, af_specs)
+
+def generate_wing(wing_params: WingRequest, af_specs: AirfoilSpecs, c_func, twist_func, z_func, area_func,
+                  t_values: np.ndarray | None = None)->WingModel:
     """
     Produces a wing from the given specs, parametrized functions, and requirements.
     Args:
@@ -108,85 +202,161 @@ def generate_wing(wing_params: WingRequest, af_specs: AirfoilSpecs, c_func, twis
         twist_func: function(t) for twist at param t
         z_func: function(t) for z at param t
         area_func: function to calculate area of the wing
+        t_values: values of t for the sections (e.g. from plan_stations); defaults to every TIterator step
 
     Returns:
         WingModel instance containing the 3D sections and basic parameters for the wing
     """
-    # Set up iteration outward along the length of the wing span
-    t_iter = TIterator(wing_params)
-    sections: list[AirfoilSection] = []
-    # Iterate for t from the base to the end of the wing, collecting up the transformed coordinates
-    for t in t_iter:
-        c = c_func(t)
-        twist = twist_func(t)
-        z = z_func(t)
-        sect = generate_section(c, twist, z, wing_params.mirrored, af_specs)
-        sections.append(sect)
-
-    # Compile everything into a WingModel instance
-    wing_model = WingModel(wing_params, af_specs, sections)
-    wing_model.base_chord = wing_params.base_chord
-    wing_model.end_chord = wing_params.end_chord
-    wing_model.span = wing_params.span
-    wing_model.area = area_func()
-
-    print('Wing generation complete')
-    print(wing_model.__repr__())
+    with stage('generate_wing') as record:
+        # Evaluate chord, twist and z for every t from the base to the end of the wing span
+        chords, twists, z_indices = evaluate_wing_params(wing_params, c_func, twist_func, z_func, t_values)
+        # Transform every section at once
+        coords = generate_sections_array(chords, twists, z_indices, wing_params.mirrored, af_specs)
+
+        # Compile everything into a WingModel instance
+        wing_model = WingModel.from_array(wing_params, af_specs, coords, chords, z_indices, twists)
+        wing_model.base_chord = wing_params.base_chord
+        wing_model.end_chord = wing_params.end_chord
+        wing_model.span = wing_params.span
+        wing_model.area = area_func()
+
+        record.points = coords.shape[0] * coords.shape[1]
+        record.extra['sections'] = wing_model.section_count
     return wing_model
 
 
-def generate_wing_model(wing_req)->WingModel:
+def generate_wing_model(wing_req, tolerance: float | None = None, max_sections: int | None = None,
+                        af_specs: AirfoilSpecs | None = None)->WingModel:
     """
     Generate a wing model from the given request
     Args:
         wing_req:
             WingRequest object representing the required specs
+        tolerance:
+            Geometric tolerance for adaptive section placement (see plan_stations); None places a section at
+            every iteration
+        max_sections:
+            Upper limit on the number of sections when placing them adaptively
+        af_specs:
+            Airfoil specs already loaded for the request's spec file; loaded through the spec cache when None
     Returns:
         a standard wing model
     """
-    # load specs
-    af_specs = get_airfoil_specs(wing_req)
-    # Get lambdas
-    c_func, t_func, z_func, area_func = get_lambdas(wing_req)
-    # Generate the actual wing model
-    wing_model = generate_wing(wing_req, af_specs, c_func, t_func, z_func, area_func)
+    with stage('generate_wing_model', wing=wing_req.name) as record:
+        # load specs
+        if af_specs is None:
+            af_specs = get_airfoil_specs(wing_req)
+        # Get lambdas
+        functor = get_functor(wing_req)
+        c_func, t_func, z_func, area_func = (functor.chord_func(), functor.twist_func(), functor.z_func(),
+                                             functor.area_func())
+        t_values = None
+        if tolerance is not None:
+            with stage('plan_stations', tolerance=tolerance) as plan_record:
+                t_values = plan_stations(wing_req, functor, tolerance, af_specs, max_sections)
+                plan_record.extra['sections'] = len(t_values)
+        # Generate the actual wing model
+        wing_model = generate_wing(wing_req, af_specs, c_func, t_func, z_func, area_func, t_values)
+        record.points = wing_model.coords.shape[0] * wing_model.coords.shape[1]
     return wing_model
 
 
-def generate_point_cloud_array(model: WingModel)->np.ndarray:
+def mirror_request(wing_req: WingRequest)->WingRequest:
+    """
+    Copy of a request for the opposite side of the aircraft (LEFT <-> RIGHT).  A request without a side gets RIGHT,
+    which is the side that generate_wing mirrors.
+    Args:
+        wing_req: requirements for the wing
+
+    Returns:
+        New WingRequest, identical apart from the side
+    """
+    mirror_req = copy.deepcopy(wing_req)
+    if wing_req.mirrored:
+        mirror_req.wing_type = (wing_req.wing_type & ~WingType.RIGHT) | WingType.LEFT
+    else:
+        mirror_req.wing_type = (wing_req.wing_type & ~WingType.LEFT) | WingType.RIGHT
+    return mirror_req
+
+def mirror_wing(wing_model: WingModel, mirror_req: WingRequest | None = None)->WingModel:
+    """
+    Derive the wing for the opposite side by reflection, without generating it again.
+
+    Mirroring the airfoil trace (and its centroid) about the chord line and flipping the sign of the twist is the
+    same as reflecting every generated point in the x-z plane, so the opposite wing is the model's coordinates with
+    y negated, and its twists negated.  Chords and z positions are unchanged.
+    Args:
+        wing_model: generated wing
+        mirror_req: request for the opposite wing; defaults to mirror_request(wing_model.wing_params)
+
+    Returns:
+        WingModel for the opposite side, with its own coordinate array
+    """
+    if mirror_req is None:
+        mirror_req = mirror_request(wing_model.wing_params)
+    coords = wing_model.coords.copy()
+    coords[..., 1] *= -1.0
+    mirror_model = WingModel.from_array(mirror_req, wing_model.af_specs, coords, wing_model.chords.copy(),
+                                        wing_model.z_indices.copy(), -wing_model.twists)
+    mirror_model.base_chord = wing_model.base_chord
+    mirror_model.end_chord = wing_model.end_chord
+    mirror_model.span = wing_model.span
+    mirror_model.area = wing_model.area
+    mirror_model.notes = wing_model.notes
+    return mirror_model
+
+def generate_wing_pair(wing_req: WingRequest, tolerance: float | None = None,
+                       max_sections: int | None = None)->tuple[WingModel, WingModel]:
     """
-    Generate a numpy array holding the vertices from the given wing model data
+    Generate the requested wing and the matching wing for the opposite side.  Only the requested wing is built;
+    the other is derived by reflection (see mirror_wing).
+    Args:
+        wing_req:
+            WingRequest object representing the required specs
+        tolerance:
+            Geometric tolerance for adaptive section placement (see plan_stations); None places a section at
+            every iteration
+        max_sections:
+            Upper limit on the number of sections when placing them adaptively
+    Returns:
+        Tuple of (requested wing, opposite wing)
+    """
+    wing_model = generate_wing_model(wing_req, tolerance, max_sections)
+    return wing_model, mirror_wing(wing_model)
+
+
+def generate_point_cloud_array(model: WingModel, copy_points: bool = False)->np.ndarray:
+    """
+    Generate a numpy array holding the vertices from the given wing model data.
+
+    No point data is copied: the result is a (sections * points, 3) reshaped view of the model's contiguous
+    coordinate array, so writes to it change the model.  Pass copy_points=True for an independent array.
     Args:
         model: Wing model to be converted to a mesh
+        copy_points: return an independent copy instead of a view
 
     Returns:
-        Numpy array holding the vertices from the given wing model
-    """
-    # Compile point values
-    x_coords = []
-    y_coords = []
-    z_coords = []
-    for s in model:
-        for p in s:
-            x_coords.append(p.x)
-            y_coords.append(p.y)
-            z_coords.append(p.z)
-    # Create numpy mesh array
-    xarr = np.array(x_coords)
-    yarr = np.array(y_coords)
-    zarr = np.array(z_coords)
-    wing_points = np.c_[xarr.reshape(-1), yarr.reshape(-1), zarr.reshape(-1)]
-    return wing_points
-
-def generate_point_cloud_polydata(model: WingModel)->PolyData:
-    """
-    Generate a 3D mesh from the given wing model data
+        Numpy array of shape (sections * points, 3) holding the vertices from the given wing model
+    """
+    wing_points = model.coords.reshape(-1, 3)
+    return wing_points.copy() if copy_points else wing_points
+
+def generate_point_cloud_polydata(model: WingModel, deep: bool = False)->'pv.PolyData':
+    """
+    Generate a 3D mesh from the given wing model data.
+
+    By default the PolyData points wrap the model's coordinate buffer (see generate_point_cloud_array) without
+    copying it; PyVista only allocates the vertex cells for the points.  Pass deep=True for PolyData that owns
+    its own copy of the points.
     Args:
         model: Wing model to be converted to a mesh
+        deep: copy the points into the PolyData instead of sharing the model's buffer
 
     Returns:
         PyVista PolyData instance containing the 3D mesh
     """
+    import pyvista as pv
+
     wing_points = generate_point_cloud_array(model)
-    wing_cloud = pv.PolyData(wing_points)
+    wing_cloud = pv.PolyData(wing_points, deep=deep)
     return wing_cloud
@@ -0,0 +1,427 @@
+"""
+Stage timing and metrics for the generation pipeline.
+
+The pipeline stages (spec loading, wing generation, meshing, exports) run inside `stage()` blocks, which record the
+wall and CPU time of the stage, and the point, face and repair-cycle counts the stage reports.  Records go to the
+installed sinks; with none installed (the default) nothing is reported.  CPU time is that of the thread running
+the stage, so stages running side by side on a thread pool are measured separately.
+
+    with instrument(JsonTraceSink('trace.json'), LogSink()):
+        model = generate_wing_model(wing_req)
+        export_stl(model, 'wing.stl')
+
+Sinks:
+    LogSink          one structured log record per stage, on the 'wingwalker.stages' logger
+    JsonTraceSink    Trace Event Format JSON (chrome://tracing, Perfetto); written on close
+    RecordingSink    keeps the StageRecords in memory
+    MemoryProfiler   adds peak RSS and tracemalloc peaks and top allocations to every record (opt-in; slow)
+    any callable     called with each finished StageRecord
+
+Probe sinks (MemoryProfiler) are started after, and finished before, the other sinks, so that their measurements
+cover only the stage and are in the record by the time the other sinks see it.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+
+class StageRecord:
+    """
+    Measurements of one run of a pipeline stage.  The stage fills in points, faces, cycles and extra as it goes.
+    """
+    __slots__ = ('stage', 'parent', 'start', 'wall', 'cpu', 'points', 'faces', 'cycles', 'extra', 'error',
+                 'thread_id', '_t0', '_c0')
+
+    def __init__(self, stage: str, parent: str | None = None, **extra):
+        self.stage = stage
+        self.parent = parent
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.points: int | None = None
+        self.faces: int | None = None
+        self.cycles: int | None = None
+        self.extra = extra
+        self.error: str | None = None
+        self.thread_id = threading.get_ident()
+        self._start()
+
+    def _start(self):
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self._c0 = time.thread_time()
+
+    def _finish(self):
+        self.wall = time.perf_counter() - self._t0
+        self.cpu = time.thread_time() - self._c0
+
+    def to_dict(self)->dict:
+        """
+        JSON-ready form of the record; counts that the stage did not report are left out
+        """
+        values = {'stage': self.stage, 'start': self.start, 'wall': self.wall, 'cpu': self.cpu}
+        for name in ('parent', 'points', 'faces', 'cycles', 'error'):
+            value = getattr(self, name)
+            if value is not None:
+                values[name] = value
+        values.update(self.extra)
+        return values
+
+    def __str__(self)->str:
+        counts = ''.join(f', {name}={getattr(self, name)}' for name in ('points', 'faces', 'cycles')
+                         if getattr(self, name) is not None)
+        return f'{self.stage}: wall={self.wall:.6f}s, cpu={self.cpu:.6f}s{counts}'
+
+
+class StageSink:
+    """
+    Receiver of stage records.  Sinks are called from whichever thread runs the stage.
+    """
+    # Probes measure the stage itself: they are started last and finished first
+    probe: bool = False
+
+    def stage_started(self, record: StageRecord):
+        """
+        Called when a stage starts, before any of its work
+        """
+
+    def stage_finished(self, record: StageRecord):
+        """
+        Called when a stage ends (including by an exception, with record.error set)
+        """
+
+    def close(self):
+        """
+        Called when the sink is removed by instrument()
+        """
+
+
+class CallbackSink(StageSink):
+    """
+    Sink calling a function with each finished record
+    """
+    def __init__(self, callback: Callable[[StageRecord], None]):
+        self.callback = callback
+
+    def stage_finished(self, record: StageRecord):
+        self.callback(record)
+
+
+class RecordingSink(StageSink):
+    """
+    Sink keeping every finished record in memory
+    """
+    def __init__(self):
+        self.records: list[StageRecord] = []
+        self._lock = threading.Lock()
+
+    def stage_finished(self, record: StageRecord):
+        with self._lock:
+            self.records.append(record)
+
+    def by_stage(self, stage: str)->list[StageRecord]:
+        """
+        Records of one stage, in the order they finished
+        """
+        with self._lock:
+            return [record for record in self.records if record.stage == stage]
+
+
+class LogSink(StageSink):
+    """
+    Sink writing one log record per stage.  The message holds key=value pairs; the full record is attached to the
+    log record as its `stage` attribute, for structured (e.g. JSON) log formatters.
+    """
+    def __init__(self, logger: logging.Logger | None = None, level: int = logging.INFO):
+        self.logger = logger if logger is not None else logging.getLogger('wingwalker.stages')
+        self.level = level
+
+    def stage_finished(self, record: StageRecord):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        values = record.to_dict()
+        values.pop('start')
+        message = ' '.join(f'{name}={value:.6f}' if isinstance(value, float) else f'{name}={value}'
+                           for name, value in values.items())
+        self.logger.log(self.level, message, extra={'stage': values})
+
+
+class JsonTraceSink(RecordingSink):
+    """
+    Sink collecting records as Trace Event Format 'complete' events, written as JSON when closed
+    """
+    def __init__(self, filename: str | None = None):
+        """
+        Instantiates a new JsonTraceSink
+        Args:
+            filename: file written by close(); None only collects the events (see trace())
+        """
+        super().__init__()
+        self.filename = filename
+
+    def trace(self)->dict:
+        """
+        The trace, as a Trace Event Format dict
+        """
+        pid = os.getpid()
+        with self._lock:
+            records = list(self.records)
+        events = []
+        for record in records:
+            args = record.to_dict()
+            for name in ('stage', 'start', 'wall'):
+                args.pop(name)
+            events.append({'name': record.stage, 'cat': 'wingwalker', 'ph': 'X', 'ts': record.start * 1e6,
+                           'dur': record.wall * 1e6, 'pid': pid, 'tid': record.thread_id, 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, filename: str):
+        """
+        Write the trace collected so far
+        Args:
+            filename: path and file name of the JSON trace
+        """
+        with open(filename, 'w', encoding='utf-8') as fout:
+            json.dump(self.trace(), fout)
+
+    def close(self):
+        if self.filename is not None:
+            self.write(self.filename)
+
+
+def _rss()->tuple[int | None, int | None]:
+    """
+    Current and peak resident set size of the process, in bytes (None where the platform does not report it)
+    """
+    try:
+        with open('/proc/self/status', 'r', encoding='ascii') as fin:
+            values = {}
+            for line in fin:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    name, size = line.split(':', 1)
+                    values[name] = int(size.split()[0]) * 1024
+        return values.get('VmRSS'), values.get('VmHWM')
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return None, peak if sys.platform == 'darwin' else peak * 1024
+
+def _reset_rss_peak()->bool:
+    """
+    Reset the peak RSS of the process to its current RSS (Linux only)
+    Returns:
+        True if the peak was reset
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as fout:
+            fout.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class _MemoryEntry:
+    __slots__ = ('traced_start', 'traced_peak', 'rss_start', 'rss_peak', 'snapshot')
+
+    def __init__(self, traced_start: int, rss_start: int | None, snapshot: tracemalloc.Snapshot | None):
+        self.traced_start = traced_start
+        self.traced_peak = traced_start
+        self.rss_start = rss_start
+        self.rss_peak = rss_start
+        self.snapshot = snapshot
+
+
+class MemoryProfiler(RecordingSink):
+    """
+    Probe sink adding memory measurements to the extra values of every stage record:
+
+        traced_peak      peak bytes allocated through Python (tracemalloc) during the stage, including numpy arrays
+        traced_growth    bytes still allocated at the end of the stage, less those allocated at its start
+        rss_start/_end   resident set size at the start and end of the stage
+        rss_peak         peak resident set size during the stage; on platforms where the peak cannot be reset
+                         (anything but Linux) this is the peak of the process so far
+        top_allocations  the `top` source lines whose allocations grew most during the stage, as 'file:line +size'
+                         (net of what the stage freed again, so temporaries only show in traced_peak)
+
+    The peaks of a stage include those of its child stages.  tracemalloc and the RSS peak are process-wide, so
+    profile one build at a time: stages running side by side on other threads are counted in each other's peaks.
+    Tracing slows Python allocations down considerably, and the top-allocation snapshots more so (top=0 skips
+    them); this is a diagnostic mode, not one to leave on.
+    """
+    probe = True
+
+    def __init__(self, top: int = 10, frames: int = 1):
+        """
+        Instantiates a new MemoryProfiler, starting tracemalloc if it is not already tracing
+        Args:
+            top: number of top allocation sites recorded per stage; 0 records none
+            frames: number of stack frames tracemalloc keeps per allocation
+        """
+        super().__init__()
+        self.top = top
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(frames)
+        self._stack: list[_MemoryEntry] = []
+        self._entries: dict[int, _MemoryEntry] = {}
+        self._memory_lock = threading.Lock()
+
+    def _snapshot(self)->tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def _fold_peaks(self):
+        # Carry the peaks seen so far into the running stages before the counters are reset
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        rss_peak = _rss()[1]
+        for entry in self._stack:
+            entry.traced_peak = max(entry.traced_peak, traced_peak)
+            if rss_peak is not None:
+                entry.rss_peak = max(entry.rss_peak or 0, rss_peak)
+
+    def stage_started(self, record: StageRecord):
+        with self._memory_lock:
+            self._fold_peaks()
+            snapshot = self._snapshot() if self.top > 0 else None
+            tracemalloc.reset_peak()
+            _reset_rss_peak()
+            entry = _MemoryEntry(tracemalloc.get_traced_memory()[0], _rss()[0], snapshot)
+            self._stack.append(entry)
+            self._entries[id(record)] = entry
+
+    def stage_finished(self, record: StageRecord):
+        with self._memory_lock:
+            entry = self._entries.pop(id(record), None)
+            if entry is None:
+                return
+            self._fold_peaks()
+            traced = tracemalloc.get_traced_memory()[0]
+            rss = _rss()[0]
+            self._stack.remove(entry)
+            record.extra['traced_peak'] = entry.traced_peak
+            record.extra['traced_growth'] = traced - entry.traced_start
+            record.extra['rss_start'] = entry.rss_start
+            record.extra['rss_end'] = rss
+            record.extra['rss_peak'] = entry.rss_peak
+            if entry.snapshot is not None:
+                diffs = self._snapshot().compare_to(entry.snapshot, 'lineno')
+                record.extra['top_allocations'] = [
+                    f'{diff.traceback[0].filename}:{diff.traceback[0].lineno} {diff.size_diff:+d}'
+                    for diff in diffs if diff.size_diff > 0
+                ][:self.top]
+        super().stage_finished(record)
+
+    def peaks(self, stage: str)->list[int]:
+        """
+        Traced (tracemalloc) peak bytes of every run of a stage, in the order they finished
+        """
+        return [record.extra['traced_peak'] for record in self.by_stage(stage)]
+
+    def close(self):
+        if self._started and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started = False
+
+
+_sinks: tuple[StageSink, ...] = ()
+_sinks_lock = threading.Lock()
+_local = threading.local()
+
+
+def add_sink(sink: StageSink | Callable[[StageRecord], None])->StageSink:
+    """
+    Install a sink for every thread
+    Args:
+        sink: StageSink, or a function taking finished StageRecords
+
+    Returns:
+        The installed sink (a CallbackSink when given a function), for remove_sink
+    """
+    global _sinks
+    if not isinstance(sink, StageSink):
+        sink = CallbackSink(sink)
+    with _sinks_lock:
+        # Keep the probes at the end, nearest the stage's own work
+        ordinary = tuple(s for s in _sinks if not s.probe)
+        probes = tuple(s for s in _sinks if s.probe)
+        if sink.probe:
+            probes = probes + (sink,)
+        else:
+            ordinary = ordinary + (sink,)
+        _sinks = ordinary + probes
+    return sink
+
+def remove_sink(sink: StageSink):
+    """
+    Uninstall a sink installed with add_sink
+    """
+    global _sinks
+    with _sinks_lock:
+        _sinks = tuple(s for s in _sinks if s is not sink)
+
+@contextmanager
+def instrument(*sinks: StageSink | Callable[[StageRecord], None])->Iterator[tuple[StageSink, ...]]:
+    """
+    Install sinks for the length of a with block, closing them at the end
+    Args:
+        *sinks: StageSinks, or functions taking finished StageRecords
+
+    Returns:
+        Context manager giving the installed sinks
+    """
+    installed = tuple(add_sink(sink) for sink in sinks)
+    try:
+        yield installed
+    finally:
+        for sink in installed:
+            remove_sink(sink)
+            sink.close()
+
+@contextmanager
+def stage(name: str, /, **extra)->Iterator[StageRecord]:
+    """
+    Measure a pipeline stage.  The block can set points, faces and cycles on the record it is given, and add
+    values to record.extra.
+    Args:
+        name: stage name
+        **extra: values recorded with the stage (e.g. the output file)
+
+    Returns:
+        Context manager giving the StageRecord
+    """
+    sinks = _sinks
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    record = StageRecord(name, stack[-1] if stack else None, **extra)
+    if not sinks:
+        # Nothing is listening: skip the bookkeeping
+        yield record
+        return
+    for sink in sinks:
+        sink.stage_started(record)
+    # Restart the clock, so the time taken by the sinks (e.g. memory snapshots) is not counted in the stage
+    record._start()
+    stack.append(name)
+    try:
+        yield record
+    except BaseException as ex:
+        record.error = f'{type(ex).__name__}: {ex}'
+        raise
+    finally:
+        stack.pop()
+        record._finish()
+        for sink in reversed(sinks):
+            sink.stage_finished(record)
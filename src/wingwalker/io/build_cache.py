@@ -0,0 +1,285 @@
+"""
+Content-addressed cache of build artifacts: generated wing models, loft meshes and exported files.
+
+Each build is keyed by the request's canonical hash (see WingRequest.canonical_key), with the spec file path
+replaced by the hash of the spec content, plus the generation options and the library version.  A build whose
+request, airfoil and options are unchanged reuses the stored artifacts; anything else gets a new key, so
+re-running a whole aircraft after editing one surface only rebuilds that surface.
+
+Each key has its own directory holding whichever artifacts have been asked for so far.  Directory modification
+times record use; when the cache grows past its size limit, the least recently used directories are removed.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.io import spec_cache
+from wingwalker.io.model_store import MODEL_EXTENSION, load_model, save_model
+from wingwalker.models.enums import SpecFormat
+from wingwalker.models.wing_model import WingModel
+
+BUILD_CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 1 << 30
+ARTIFACT_FORMATS = ('stl', 'ply')
+
+_MODEL_FILE = f'model{MODEL_EXTENSION}'
+_MESH_FILE = 'mesh.npz'
+
+
+def default_cache_dir()->str:
+    """
+    Directory for the build cache: builds under spec_cache.cache_root()
+    Returns:
+        Path of the cache directory
+    """
+    return os.path.join(spec_cache.cache_root(), 'builds')
+
+def library_version()->str:
+    """
+    Installed wingwalker version, part of every build key; 'unknown' when running from a source tree
+    """
+    try:
+        return version('wingwalker')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+class BuildCache:
+    """
+    On-disk cache of wing models, loft meshes and exported STL/PLY files.  Safe to share between threads; entries
+    are written to temporary files and renamed into place, so processes can share a cache directory.
+    """
+    def __init__(self, cache_dir: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 specs: spec_cache.SpecCache | None = None):
+        """
+        Instantiates a new BuildCache
+        Args:
+            cache_dir: directory for the cache; defaults to default_cache_dir()
+            max_bytes: size limit of the cache directory; least recently used entries are removed past it
+            specs: spec cache used to load airfoil specs; defaults to spec_cache.default_cache()
+        """
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.specs = specs
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, wing_req: WingRequest, tolerance: float | None = None, max_sections: int | None = None)->str:
+        """
+        Cache key of a build
+        Args:
+            wing_req: request to build
+            tolerance: geometric tolerance for adaptive section placement (see plan_stations)
+            max_sections: upper limit on the number of sections when placing them adaptively
+
+        Returns:
+            Hex digest identifying the request, the spec content, the options and the library version
+        """
+        spec_format = SpecFormat(wing_req.spec_format)
+        with open(wing_req.spec_file, 'rb') as fin:
+            spec_digest = spec_cache.content_hash(fin.read(), spec_format)
+        return wing_req.canonical_key(spec_file=spec_digest, tolerance=tolerance, max_sections=max_sections,
+                                      library=library_version(), cache_version=BUILD_CACHE_VERSION)
+
+    def entry_dir(self, key: str)->str:
+        return os.path.join(self.cache_dir, key)
+
+    def model(self, wing_req: WingRequest, tolerance: float | None = None,
+              max_sections: int | None = None)->WingModel:
+        """
+        Wing model for a request, from the cache or by generating (and storing) it.  Cached models are memory mapped
+        copy-on-write, so changes to their arrays stay in memory.
+        Args:
+            wing_req: request to build
+            tolerance: geometric tolerance for adaptive section placement (see plan_stations)
+            max_sections: upper limit on the number of sections when placing them adaptively
+
+        Returns:
+            WingModel for the request
+        """
+        key = self.key(wing_req, tolerance, max_sections)
+        return self._model(key, wing_req, tolerance, max_sections)
+
+    def mesh(self, wing_req: WingRequest, tolerance: float | None = None,
+             max_sections: int | None = None)->tuple[np.ndarray, np.ndarray]:
+        """
+        Closed loft mesh for a request (see processing.mesh.generate_loft_mesh), from the cache or by building it
+        Args:
+            wing_req: request to build
+            tolerance: geometric tolerance for adaptive section placement (see plan_stations)
+            max_sections: upper limit on the number of sections when placing them adaptively
+
+        Returns:
+            Tuple of (vertices, faces)
+        """
+        key = self.key(wing_req, tolerance, max_sections)
+        return self._mesh(key, wing_req, tolerance, max_sections)
+
+    def export(self, wing_req: WingRequest, fmt: str, filename: str, tolerance: float | None = None,
+               max_sections: int | None = None)->str:
+        """
+        Export a request as STL or PLY, copying the cached file when there is one
+        Args:
+            wing_req: request to build
+            fmt: 'stl' or 'ply'
+            filename: path and file name of the export; the format extension is added if missing
+            tolerance: geometric tolerance for adaptive section placement (see plan_stations)
+            max_sections: upper limit on the number of sections when placing them adaptively
+
+        Returns:
+            The file name written
+        """
+        fmt = fmt.lower()
+        if fmt not in ARTIFACT_FORMATS:
+            raise ValueError(f'Unknown export format {fmt}')
+        if not filename.endswith(f'.{fmt}'):
+            filename += f'.{fmt}'
+        key = self.key(wing_req, tolerance, max_sections)
+        artifact = os.path.join(self.entry_dir(key), f'wing.{fmt}')
+        if not self._hit(key, artifact):
+            # Imported here so model-only use of the cache does not load the exporters
+            from wingwalker.io.exports import export_ply
+            from wingwalker.io.stl import write_binary_stl
+            wing_model = self._model(key, wing_req, tolerance, max_sections)
+            if fmt == 'stl':
+                vertices, faces = self._mesh(key, wing_req, tolerance, max_sections, wing_model)
+                self._store(key, artifact, lambda tmp: write_binary_stl(tmp, vertices, faces,
+                                                                        header=wing_model.identifier))
+            else:
+                self._store(key, artifact, lambda tmp: export_ply(wing_model, tmp))
+        out_dir = os.path.dirname(filename)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        shutil.copyfile(artifact, filename)
+        return filename
+
+    def _model(self, key: str, wing_req: WingRequest, tolerance: float | None,
+               max_sections: int | None)->WingModel:
+        artifact = os.path.join(self.entry_dir(key), _MODEL_FILE)
+        if self._hit(key, artifact):
+            wing_model = load_model(artifact, mmap_mode='c')
+            # The stored request is equal, but the caller's copy may carry other notes
+            wing_model.wing_params = wing_req
+            return wing_model
+        wing_model = self._generate(wing_req, tolerance, max_sections)
+        self._store(key, artifact, lambda tmp: save_model(wing_model, tmp))
+        return wing_model
+
+    def _mesh(self, key: str, wing_req: WingRequest, tolerance: float | None, max_sections: int | None,
+              wing_model: WingModel | None = None)->tuple[np.ndarray, np.ndarray]:
+        from wingwalker.processing.mesh import generate_loft_mesh
+        artifact = os.path.join(self.entry_dir(key), _MESH_FILE)
+        if self._hit(key, artifact):
+            with np.load(artifact, allow_pickle=False) as stored:
+                return stored['vertices'], stored['faces']
+        if wing_model is None:
+            wing_model = self._model(key, wing_req, tolerance, max_sections)
+        vertices, faces = generate_loft_mesh(wing_model)
+        self._store(key, artifact, lambda tmp: np.savez(tmp, vertices=vertices, faces=faces))
+        return vertices, faces
+
+    def _generate(self, wing_req: WingRequest, tolerance: float | None, max_sections: int | None)->WingModel:
+        from wingwalker.generators.wing import generate_wing_model
+        af_specs = spec_cache.load_specs(wing_req.spec_file, wing_req.spec_format, self.specs)
+        return generate_wing_model(wing_req, tolerance, max_sections, af_specs)
+
+    def _hit(self, key: str, artifact: str)->bool:
+        """
+        Check for a stored artifact, counting the hit or miss and marking the entry as used
+        """
+        found = os.path.isfile(artifact)
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if found:
+            try:
+                os.utime(self.entry_dir(key))
+            except OSError:
+                pass
+        return found
+
+    def _store(self, key: str, artifact: str, write):
+        """
+        Write an artifact through a temporary file, then trim the cache to its size limit
+        Args:
+            key: cache key of the entry
+            artifact: final path of the artifact
+            write: function writing the artifact to the temporary path it is given
+        """
+        entry = self.entry_dir(key)
+        os.makedirs(entry, exist_ok=True)
+        suffix = os.path.splitext(artifact)[1]
+        fd, tmp_path = tempfile.mkstemp(dir=entry, suffix=suffix)
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, artifact)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict(keep=key)
+
+    def size(self)->int:
+        """
+        Total size of the cache directory, in bytes
+        """
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self)->list[tuple[float, str, int]]:
+        """
+        (last use, key, size) of every entry
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for dir_entry in os.scandir(self.cache_dir):
+            if not dir_entry.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(dir_entry.path) if f.is_file())
+                entries.append((dir_entry.stat().st_mtime, dir_entry.name, size))
+            except OSError:
+                # Removed by another process while scanning
+                continue
+        return entries
+
+    def evict(self, keep: str | None = None)->int:
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        Args:
+            keep: key of an entry that is never removed (e.g. the one just written)
+
+        Returns:
+            Number of bytes removed
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for _, key, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+            total -= size
+            removed += size
+        return removed
+
+    def clear(self):
+        """
+        Remove every entry
+        """
+        for _, key, _ in self._entries():
+            shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+
+    def __str__(self)->str:
+        return f'Build cache {self.cache_dir}: {self.hits} hits, {self.misses} misses'
@@ -0,0 +1,390 @@
+"""
+Long-running local build service.
+
+A fresh Python process pays for the pyvista, pymeshlab and shapely imports and re-parses its spec files on every
+build.  The build service keeps one process warm instead: the heavy modules are imported once, parsed specs stay in
+the spec cache (and, optionally, models and meshes in a build cache), and requests are served over HTTP on a local
+port or a Unix socket.
+
+Endpoints:
+    GET  /health                      service status and queue length, as JSON
+    POST /build?format=stl|ply|svg    body: WingRequest JSON.  Returns the artifact, or, with &out=<file name>,
+                                      writes it under the service's output directory and returns a JSON summary
+
+SVG artifacts are the root airfoil trace at the request's base chord.  Builds run on a bounded worker pool; at most
+max_queue requests wait for a worker, and requests past that are turned away with 503 (Service Unavailable).
+"""
+import importlib
+import json
+import os
+import shutil
+import socketserver
+import tempfile
+import threading
+import time
+import traceback
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.io import spec_cache
+from wingwalker.io.build_cache import BuildCache
+from wingwalker.models.enums import SpecFormat
+
+ARTIFACT_TYPES = {
+    'stl': 'model/stl',
+    'ply': 'application/octet-stream',
+    'svg': 'image/svg+xml',
+}
+# Imported by preload(), so the first request does not pay for them
+PRELOAD_MODULES = (
+    'pyvista',
+    'pymeshlab',
+    'shapely.geometry',
+    'wingwalker.generators.wing',
+    'wingwalker.processing.mesh',
+    'wingwalker.io.exports',
+    'wingwalker.svg',
+)
+DEFAULT_PORT = 8765
+
+
+class ServiceBusy(Exception):
+    """
+    Raised when every worker is busy and the request queue is full
+    """
+
+
+class BuildArtifact:
+    """
+    Result of one build: the file written, or the artifact's bytes
+    """
+    __slots__ = ('fmt', 'filename', 'data', 'elapsed')
+
+    def __init__(self, fmt: str, filename: str | None = None, data: bytes | None = None, elapsed: float = 0.0):
+        self.fmt = fmt
+        self.filename = filename
+        self.data = data
+        self.elapsed = elapsed
+
+    @property
+    def content_type(self)->str:
+        return ARTIFACT_TYPES[self.fmt]
+
+    def __str__(self)->str:
+        target = self.filename if self.filename is not None else f'{len(self.data)} bytes'
+        return f'{self.fmt} artifact: {target}, {self.elapsed:.3f}s'
+
+
+class BuildService:
+    """
+    Warm build worker pool.  Thread-safe; the HTTP front end (make_server) calls it from one thread per connection.
+    """
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, out_dir: str | None = None, spec_dir: str = '.',
+                 specs: spec_cache.SpecCache | None = None, build_cache: BuildCache | None = None,
+                 tolerance: float | None = None, units: str = 'mm'):
+        """
+        Instantiates a new BuildService
+        Args:
+            max_workers: number of builds run at the same time
+            max_queue: number of requests allowed to wait for a worker
+            out_dir: directory that requests with an output file name are written to; None only returns artifacts
+            spec_dir: directory that relative spec file paths in requests are resolved against
+            specs: spec cache; defaults to spec_cache.default_cache()
+            build_cache: optional build cache, reusing models, meshes and exports between requests
+            tolerance: geometric tolerance for adaptive section placement (see plan_stations)
+            units: units of SVG artifacts
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.out_dir = os.path.abspath(out_dir) if out_dir is not None else None
+        self.spec_dir = spec_dir
+        self.specs = specs if specs is not None else spec_cache.default_cache()
+        self.build_cache = build_cache
+        self.tolerance = tolerance
+        self.units = units
+        self.completed = 0
+        self.failed = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wingwalker-build')
+        self._in_flight = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        self._tmp_dir = tempfile.mkdtemp(prefix='wingwalker-build-')
+
+    def preload(self, spec_files: Iterable[tuple[str, SpecFormat]] = ())->list[str]:
+        """
+        Import the heavy modules and parse spec files ahead of the first request
+        Args:
+            spec_files: (path, SpecFormat) pairs to load into the spec cache
+
+        Returns:
+            Names of the modules imported; optional modules that are not installed are left out
+        """
+        loaded = []
+        for module_name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(module_name)
+                loaded.append(module_name)
+            except ImportError:
+                pass
+        spec_cache.load_many(((self._spec_path(src), fmt) for src, fmt in spec_files), cache=self.specs)
+        return loaded
+
+    def _spec_path(self, src: str)->str:
+        return src if os.path.isabs(src) else os.path.join(self.spec_dir, src)
+
+    def parse_request(self, req_dict: dict)->WingRequest:
+        """
+        WingRequest from its JSON form, with the spec file resolved against spec_dir
+        Args:
+            req_dict: request fields
+
+        Returns:
+            WingRequest
+        """
+        if not isinstance(req_dict, dict):
+            raise ValueError('The request body must be a WingRequest JSON object')
+        wing_req = WingRequest.from_dict(req_dict)
+        wing_req.spec_file = self._spec_path(wing_req.spec_file)
+        return wing_req
+
+    def output_path(self, out_name: str)->str:
+        """
+        Path under out_dir for a requested output file name; names that would leave out_dir are rejected
+        Args:
+            out_name: file name, relative to out_dir
+
+        Returns:
+            Absolute path of the output file
+        """
+        if self.out_dir is None:
+            raise ValueError('This service has no output directory; request the artifact instead')
+        path = os.path.abspath(os.path.join(self.out_dir, out_name))
+        if os.path.commonpath((path, self.out_dir)) != self.out_dir:
+            raise ValueError(f'Output file {out_name} is outside the output directory')
+        return path
+
+    def submit(self, wing_req: WingRequest, fmt: str = 'stl', out_name: str | None = None)->Future:
+        """
+        Queue a build
+        Args:
+            wing_req: request to build
+            fmt: 'stl', 'ply' or 'svg'
+            out_name: file name under out_dir to write; None returns the artifact's bytes
+
+        Returns:
+            Future of a BuildArtifact
+        """
+        fmt = fmt.lower()
+        if fmt not in ARTIFACT_TYPES:
+            raise ValueError(f'Unknown artifact format {fmt}')
+        filename = None
+        if out_name is not None:
+            filename = self.output_path(out_name)
+            if not filename.endswith(f'.{fmt}'):
+                filename += f'.{fmt}'
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                raise ServiceBusy(f'{self.max_workers} builds running and {self.max_queue} waiting')
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(self._run, wing_req, fmt, filename)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda f: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def build(self, wing_req: WingRequest, fmt: str = 'stl', out_name: str | None = None)->BuildArtifact:
+        """
+        Queue a build and wait for it
+        """
+        return self.submit(wing_req, fmt, out_name).result()
+
+    def _run(self, wing_req: WingRequest, fmt: str, filename: str | None)->BuildArtifact:
+        start = time.perf_counter()
+        with self._lock:
+            self._active += 1
+        try:
+            if filename is None:
+                fd, target = tempfile.mkstemp(dir=self._tmp_dir, suffix=f'.{fmt}')
+                os.close(fd)
+            else:
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+                target = filename
+            try:
+                self._write_artifact(wing_req, fmt, target)
+                if filename is None:
+                    with open(target, 'rb') as fin:
+                        artifact = BuildArtifact(fmt, data=fin.read())
+                else:
+                    artifact = BuildArtifact(fmt, filename=filename)
+            finally:
+                if filename is None and os.path.exists(target):
+                    os.remove(target)
+            artifact.elapsed = time.perf_counter() - start
+            with self._lock:
+                self.completed += 1
+            return artifact
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _write_artifact(self, wing_req: WingRequest, fmt: str, target: str):
+        af_specs = spec_cache.load_specs(wing_req.spec_file, wing_req.spec_format, self.specs)
+        if fmt == 'svg':
+            from wingwalker.svg import SvgStream, SvgWriter, iter_path_data
+            writer = SvgWriter(af_specs.x * wing_req.base_chord, af_specs.y * wing_req.base_chord,
+                               wing_req.base_chord, self.units)
+            with SvgStream(target, writer.dimension, writer.dimension, self.units) as svg_out:
+                svg_out.path(iter_path_data(writer.offset_coords(wing_req.mirrored), writer.precision,
+                                            close_loop=True), 'airfoil_trace', 0.5)
+            return
+        if self.build_cache is not None:
+            self.build_cache.export(wing_req, fmt, target, self.tolerance)
+            return
+        from wingwalker.generators.wing import generate_wing_model
+        from wingwalker.io.exports import export_ply, export_stl
+        wing_model = generate_wing_model(wing_req, self.tolerance, af_specs=af_specs)
+        if fmt == 'stl':
+            export_stl(wing_model, target)
+        else:
+            export_ply(wing_model, target)
+
+    def status(self)->dict:
+        """
+        Service status: worker and queue sizes, running and waiting builds, and build counts
+        """
+        with self._lock:
+            active = self._active
+            in_flight = self._in_flight
+            completed = self.completed
+            failed = self.failed
+        return {
+            'status': 'ok',
+            'workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'running': active,
+            'queued': max(in_flight - active, 0),
+            'completed': completed,
+            'failed': failed,
+            'specs_cached': len(self.specs),
+            'build_cache': str(self.build_cache) if self.build_cache is not None else None,
+        }
+
+    def close(self):
+        """
+        Wait for the running builds, then stop the worker pool
+        """
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+class _BuildHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front end of a BuildService (self.server.service)
+    """
+    server_version = 'wingwalker-build/1'
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self)->str:
+        # Unix socket clients have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        if getattr(self.server, 'verbose', False):
+            super().log_message(format, *args)
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str, headers: dict[str, str] | None = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: HTTPStatus, data: dict, headers: dict[str, str] | None = None):
+        self._send(status, json.dumps(data).encode('utf-8'), 'application/json', headers)
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/health':
+            self._send_json(HTTPStatus.OK, self.server.service.status())
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if url.path != '/build':
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f'Unknown path {url.path}'})
+            return
+        service: BuildService = self.server.service
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            wing_req = service.parse_request(json.loads(body))
+            future = service.submit(wing_req, query.get('format', 'stl'), query.get('out'))
+        except ServiceBusy as ex:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {'error': str(ex)}, {'Retry-After': '1'})
+            return
+        except (ValueError, KeyError, TypeError) as ex:
+            self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(ex)})
+            return
+        try:
+            artifact: BuildArtifact = future.result()
+        except (FileNotFoundError, ValueError, NotImplementedError) as ex:
+            self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(ex)})
+            return
+        except Exception:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': traceback.format_exc()})
+            return
+        if artifact.filename is not None:
+            self._send_json(HTTPStatus.OK, {'file': artifact.filename, 'format': artifact.fmt,
+                                            'elapsed': artifact.elapsed})
+        else:
+            name = f'{wing_req.identifier}.{artifact.fmt}'.replace('"', '_')
+            self._send(HTTPStatus.OK, artifact.data, artifact.content_type,
+                       {'Content-Disposition': f'attachment; filename="{name}"',
+                        'X-Build-Seconds': f'{artifact.elapsed:.6f}'})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service: BuildService, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                unix_socket: str | None = None, verbose: bool = False)->socketserver.BaseServer:
+    """
+    HTTP server for a build service, on a local TCP port or a Unix socket
+    Args:
+        service: build service handling the requests
+        host: address to listen on (TCP)
+        port: port to listen on (TCP); 0 picks a free port
+        unix_socket: path of a Unix socket to listen on instead of TCP; an existing socket file is replaced
+        verbose: log every request to stderr
+
+    Returns:
+        The server; call serve_forever() to run it, and shutdown() from another thread to stop it
+    """
+    if unix_socket is not None:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = _UnixHTTPServer(unix_socket, _BuildHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), _BuildHandler)
+        server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
@@ -1,14 +1,17 @@
 import os
-import pymeshlab
 
 from wingwalker.generators.wing import generate_point_cloud_polydata, generate_point_cloud_array
+from wingwalker.instrumentation import stage
+from wingwalker.io.stl import write_binary_stl
 from wingwalker.models.wing_model import WingModel
-from wingwalker.processing.mesh import generate_closed_mesh
+from wingwalker.processing.mesh import iter_loft_mesh, generate_loft_mesh, mirror_mesh
 
 
 def export_stl(wing_model: WingModel, stl_filename: str) -> None:
     """
-    Given a wing model, go through the process to generate and export a closed mesh as an STL
+    Given a wing model, go through the process to generate and export a closed mesh as an STL.
+
+    The loft mesh faces are streamed straight into the binary STL writer, chunk by chunk.
     Args:
         wing_model: Model data to be exported
         stl_filename: file name to save the stl_file
@@ -16,17 +19,41 @@ def export_stl(wing_model: WingModel, stl_filename: str) -> None:
     Returns:
         None
     """
-    print(f'Exporting wing model to {stl_filename}')
-    print(wing_model.__repr__())
+    if not stl_filename.endswith('.stl'):
+        stl_filename += '.stl'
+
+    with stage('export_stl', filename=stl_filename) as record:
+        vertices, face_chunks = iter_loft_mesh(wing_model)
+        record.faces = write_binary_stl(stl_filename, vertices, face_chunks, header=wing_model.identifier)
+        record.points = len(vertices)
+        record.extra['bytes'] = os.path.getsize(stl_filename)
+
+
+def export_stl_pair(wing_model: WingModel, mirror_model: WingModel, stl_filename: str, mirror_filename: str) -> None:
+    """
+    Export a wing and its mirror image (see generators.wing.mirror_wing) as two STL files.  The loft mesh is built
+    once, for wing_model; the mirrored mesh is its reflection, with the face winding reversed.
+    Args:
+        wing_model: Model data to be exported
+        mirror_model: Mirror image of wing_model, for the opposite side
+        stl_filename: file name to save the wing_model STL file
+        mirror_filename: file name to save the mirror_model STL file
 
+    Returns:
+        None
+    """
     if not stl_filename.endswith('.stl'):
         stl_filename += '.stl'
+    if not mirror_filename.endswith('.stl'):
+        mirror_filename += '.stl'
 
-    mesh_set: pymeshlab.MeshSet = generate_closed_mesh(model=wing_model)
-    mesh_set.save_current_mesh(file_name=stl_filename)
-    stats = os.stat(stl_filename)
-    print(f'Wing model processed and saved to {stl_filename}')
-    print(stats)
+    with stage('export_stl_pair', filename=stl_filename, mirror_filename=mirror_filename) as record:
+        vertices, faces = generate_loft_mesh(wing_model)
+        write_binary_stl(stl_filename, vertices, faces, header=wing_model.identifier)
+        mirror_vertices, mirror_faces = mirror_mesh(vertices, faces)
+        write_binary_stl(mirror_filename, mirror_vertices, mirror_faces, header=mirror_model.identifier)
+        record.points = 2 * len(vertices)
+        record.faces = 2 * len(faces)
 
 
 def export_ply(wing_model: WingModel, ply_filename: str) -> None:
@@ -39,16 +66,11 @@ def export_ply(wing_model: WingModel, ply_filename: str) -> None:
     Returns:
         None
     """
-    print(f'Exporting wing model to {ply_filename}')
-    print(wing_model.__repr__())
-
     if not ply_filename.endswith('.ply'):
         ply_filename += '.ply'
 
-    point_cloud = generate_point_cloud_polydata(wing_model)
-    point_cloud.save(filename=ply_filename, binary=True)
-
-    stats = os.stat(ply_filename)
-    print(f'Wing model saved to {ply_filename}')
-    print(stats)
-    print()
\ No newline at end of file
+    with stage('export_ply', filename=ply_filename) as record:
+        point_cloud = generate_point_cloud_polydata(wing_model)
+        point_cloud.save(filename=ply_filename, binary=True)
+        record.points = point_cloud.n_points
+        record.extra['bytes'] = os.path.getsize(ply_filename)
@@ -0,0 +1,143 @@
+"""
+Compact binary format for generated wing models.
+
+A model file holds a small JSON header (the serialized WingRequest, the airfoil designation and source, and the
+model's dimensions), followed by the raw little-endian float64 arrays: the airfoil's unit-chord coordinates, the
+(sections, points, 3) section coordinates, and the chord, z and twist of each section.  Arrays start on 64 byte
+boundaries, so they can be memory mapped: loading a huge model only reads the header, and the operating system
+pages in the sections that are actually touched.
+
+Layout:
+    magic (8 bytes) | header length (uint64, little-endian) | JSON header | padding | arrays...
+"""
+import json
+
+import numpy as np
+
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.models.airfoil_specs import AirfoilSpecs
+from wingwalker.models.enums import Planform, SpecFormat
+from wingwalker.models.wing_model import WingModel
+
+MODEL_MAGIC = b'WWMODEL\x00'
+MODEL_FORMAT_VERSION = 1
+MODEL_EXTENSION = '.wwm'
+ARRAY_ALIGNMENT = 64
+ARRAY_DTYPE = np.dtype('<f8')
+
+_ARRAY_NAMES = ('spec_coords', 'coords', 'chords', 'z_indices', 'twists')
+
+
+def _aligned(offset: int)->int:
+    return -(-offset // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+
+def save_model(model: WingModel, filename: str)->str:
+    """
+    Write a wing model to disk
+    Args:
+        model: wing model to save
+        filename: path and file name; MODEL_EXTENSION is added if missing
+
+    Returns:
+        The file name written
+    """
+    if not filename.endswith(MODEL_EXTENSION):
+        filename += MODEL_EXTENSION
+    arrays = {
+        'spec_coords': model.af_specs.coords,
+        'coords': model.coords,
+        'chords': model.chords,
+        'z_indices': model.z_indices,
+        'twists': model.twists,
+    }
+    header = {
+        'version': MODEL_FORMAT_VERSION,
+        'request': model.wing_params.to_json(),
+        'spec_src': model.af_specs.src,
+        'designation': model.af_specs.designation,
+        'base_chord': model.base_chord,
+        'end_chord': model.end_chord,
+        'span': model.span,
+        'area': model.area,
+        'notes': model.notes,
+        'arrays': {},
+    }
+    # Array offsets depend on the header length, which depends on the offsets; a fixed width for the offsets
+    # keeps the header length the same on both passes
+    for name, array in arrays.items():
+        header['arrays'][name] = {'shape': list(array.shape), 'offset': 0}
+    header_len = 0
+    for _ in range(2):
+        offset = _aligned(len(MODEL_MAGIC) + 8 + header_len)
+        for name, array in arrays.items():
+            header['arrays'][name]['offset'] = f'{offset:020d}'
+            offset = _aligned(offset + array.size * ARRAY_DTYPE.itemsize)
+        header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+        header_len = len(header_bytes)
+
+    with open(filename, 'wb') as fout:
+        fout.write(MODEL_MAGIC)
+        fout.write(np.uint64(header_len).astype('<u8').tobytes())
+        fout.write(header_bytes)
+        for name, array in arrays.items():
+            fout.seek(int(header['arrays'][name]['offset']))
+            np.ascontiguousarray(array, dtype=ARRAY_DTYPE).tofile(fout)
+    return filename
+
+def read_header(filename: str)->dict:
+    """
+    Read the JSON header of a model file
+    Args:
+        filename: path to the model file
+
+    Returns:
+        dict holding the header values
+    """
+    with open(filename, 'rb') as fin:
+        if fin.read(len(MODEL_MAGIC)) != MODEL_MAGIC:
+            raise ValueError(f'{filename} is not a wingwalker model file')
+        header_len = int(np.frombuffer(fin.read(8), dtype='<u8')[0])
+        header = json.loads(fin.read(header_len).decode('utf-8'))
+    if header.get('version') != MODEL_FORMAT_VERSION:
+        raise ValueError(f'Unsupported model file version {header.get("version")} in {filename}')
+    return header
+
+def load_model(filename: str, mmap_mode: str | None = 'r')->WingModel:
+    """
+    Load a wing model from disk
+    Args:
+        filename: path to the model file
+        mmap_mode: numpy memmap mode for the arrays: 'r' (read-only, default), 'c' (copy-on-write) or 'r+'
+            (writes go to the file); None reads every array into memory
+
+    Returns:
+        WingModel whose arrays are backed by the file (unless mmap_mode is None)
+    """
+    header = read_header(filename)
+    arrays = {}
+    for name in _ARRAY_NAMES:
+        info = header['arrays'][name]
+        shape = tuple(info['shape'])
+        offset = int(info['offset'])
+        if mmap_mode is None or int(np.prod(shape)) == 0:
+            count = int(np.prod(shape))
+            with open(filename, 'rb') as fin:
+                fin.seek(offset)
+                arrays[name] = np.fromfile(fin, dtype=ARRAY_DTYPE, count=count).reshape(shape)
+        else:
+            arrays[name] = np.memmap(filename, dtype=ARRAY_DTYPE, mode=mmap_mode, offset=offset, shape=shape)
+
+    wing_req = WingRequest.from_json(header['request'])
+    wing_req.planform = Planform(wing_req.planform)
+    wing_req.spec_format = SpecFormat(wing_req.spec_format)
+    spec_coords = np.asarray(arrays['spec_coords'])
+    af_specs = AirfoilSpecs(header['spec_src'], header['designation'], spec_coords[:, 0], spec_coords[:, 1])
+
+    model = WingModel.from_array(wing_req, af_specs, arrays['coords'], arrays['chords'], arrays['z_indices'],
+                                 arrays['twists'])
+    model.base_chord = header['base_chord']
+    model.end_chord = header['end_chord']
+    model.span = header['span']
+    model.area = header['area']
+    model.notes = header['notes']
+    return model
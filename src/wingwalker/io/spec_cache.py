@@ -0,0 +1,258 @@
+"""
+Content-addressed cache for parsed airfoil specs.
+
+Parsed coordinates can be stored on disk, keyed by a hash of the spec file content and its format, so every build
+that uses the same airfoil shares one parse.  An in-process LRU layer sits on top; entries are checked against the
+source file's mtime and size, and re-hashed when those change.  Concurrent loads of the same file share a single
+parse.
+
+The shared default cache (used by get_airfoil_specs) is in memory only, unless $WINGWALKER_CACHE_DIR is set: then
+parsed specs are also stored in its specs subdirectory.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+
+import wingwalker.utils as utils
+from wingwalker.models.airfoil_specs import AirfoilSpecs
+from wingwalker.models.enums import SpecFormat
+
+CACHE_VERSION = 1
+CACHE_DIR_ENV = 'WINGWALKER_CACHE_DIR'
+
+
+def cache_root()->str:
+    """
+    Root directory for the on-disk caches: $WINGWALKER_CACHE_DIR if set, otherwise wingwalker under
+    $XDG_CACHE_HOME (or ~/.cache)
+    Returns:
+        Path of the cache root directory
+    """
+    env_dir = os.environ.get(CACHE_DIR_ENV)
+    if env_dir:
+        return env_dir
+    base_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base_dir, 'wingwalker')
+
+def default_cache_dir()->str:
+    """
+    Directory for the on-disk spec cache: specs under cache_root()
+    Returns:
+        Path of the cache directory
+    """
+    return os.path.join(cache_root(), 'specs')
+
+def content_hash(data: bytes, spec_format: SpecFormat)->str:
+    """
+    Content address of a spec file
+    Args:
+        data: raw bytes of the spec file
+        spec_format: format the file is parsed with
+
+    Returns:
+        Hex digest identifying the content, format and cache layout
+    """
+    digest = hashlib.sha256()
+    digest.update(f'wingwalker-spec-v{CACHE_VERSION}:{spec_format.value}:'.encode('utf-8'))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class _CacheEntry:
+    """
+    In-process cache entry; the stat values are used to notice changes to the source file
+    """
+    __slots__ = ('mtime_ns', 'size', 'digest', 'specs')
+
+    def __init__(self, mtime_ns: int, size: int, digest: str, specs: AirfoilSpecs):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.specs = specs
+
+
+class SpecCache:
+    """
+    Two level cache of parsed airfoil specs: an in-process LRU keyed by source path, over an on-disk store keyed
+    by content hash.  Safe to share between threads.
+    """
+    def __init__(self, cache_dir: str | None = None, max_entries: int = 128):
+        """
+        Instantiates a new SpecCache
+        Args:
+            cache_dir: directory for the on-disk store; None keeps the cache in memory only
+            max_entries: number of parsed specs held in memory
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, SpecFormat], _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[str, SpecFormat], Future] = {}
+
+    def __len__(self)->int:
+        return len(self._entries)
+
+    def clear(self):
+        """
+        Drop the in-process entries.  The on-disk store is left in place.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def load(self, src: str, spec_format: SpecFormat)->AirfoilSpecs:
+        """
+        Get the parsed specs for a file, from memory, from disk, or by parsing it
+        Args:
+            src: path to the spec file
+            spec_format: SpecFormat.SELIG or SpecFormat.LEDNICER
+
+        Returns:
+            AirfoilSpecs for the file
+        """
+        spec_format = SpecFormat(spec_format)
+        if spec_format == SpecFormat.UNDEFINED:
+            raise NotImplementedError("input file format must be defined as SELIG or LEDNICER")
+        key = (os.path.abspath(src), spec_format)
+        stats = os.stat(src)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == stats.st_mtime_ns and entry.size == stats.st_size:
+                self._entries.move_to_end(key)
+                return entry.specs
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = Future()
+                self._pending[key] = pending
+        if not owner:
+            # Another thread is already loading this file
+            return pending.result()
+
+        try:
+            specs = self._load_entry(key, src, spec_format, stats, entry)
+            pending.set_result(specs)
+            return specs
+        except BaseException as ex:
+            pending.set_exception(ex)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _load_entry(self, key: tuple[str, SpecFormat], src: str, spec_format: SpecFormat, stats: os.stat_result,
+                    entry: _CacheEntry | None)->AirfoilSpecs:
+        """
+        Read, hash and (if needed) parse the spec file, and store the result in the in-process cache
+        """
+        with open(src, 'rb') as fin:
+            data = fin.read()
+        digest = content_hash(data, spec_format)
+        if entry is not None and entry.digest == digest:
+            # Touched, but not changed
+            specs = entry.specs
+        else:
+            specs = self._read_store(src, digest)
+            if specs is None:
+                x_arr, y_arr, spec_name = utils.parse_specs_array(BytesIO(data), 1.0, spec_format.value)
+                specs = AirfoilSpecs(src, spec_name, x_arr, y_arr)
+                self._write_store(digest, specs)
+
+        with self._lock:
+            self._entries[key] = _CacheEntry(stats.st_mtime_ns, stats.st_size, digest, specs)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return specs
+
+    def _store_path(self, digest: str)->str:
+        return os.path.join(self.cache_dir, f'{digest}.npz')
+
+    def _read_store(self, src: str, digest: str)->AirfoilSpecs | None:
+        if self.cache_dir is None:
+            return None
+        try:
+            with np.load(self._store_path(digest), allow_pickle=False) as stored:
+                coords = stored['coords']
+                designation = str(stored['designation'])
+        except (OSError, KeyError, ValueError):
+            return None
+        return AirfoilSpecs(src, designation, coords[:, 0], coords[:, 1])
+
+    def _write_store(self, digest: str, specs: AirfoilSpecs):
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first, so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as fout:
+                    np.savez(fout, coords=specs.coords, designation=np.array(specs.designation))
+                os.replace(tmp_path, self._store_path(digest))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except OSError:
+            # The on-disk store is an optimization; a read-only or missing cache directory is not an error
+            pass
+
+
+_default_cache: SpecCache | None = None
+_default_lock = threading.Lock()
+
+def default_cache()->SpecCache:
+    """
+    Shared spec cache for the process.  It is kept in memory only, unless $WINGWALKER_CACHE_DIR is set, in which
+    case it is also stored under default_cache_dir()
+    Returns:
+        The default SpecCache instance
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SpecCache(default_cache_dir() if os.environ.get(CACHE_DIR_ENV) else None)
+        return _default_cache
+
+def load_specs(src: str, spec_format: SpecFormat, cache: SpecCache | None = None)->AirfoilSpecs:
+    """
+    Load airfoil specs through a spec cache
+    Args:
+        src: path to the spec file
+        spec_format: SpecFormat.SELIG or SpecFormat.LEDNICER
+        cache: cache to use; defaults to default_cache()
+
+    Returns:
+        AirfoilSpecs for the file
+    """
+    return (cache if cache is not None else default_cache()).load(src, spec_format)
+
+def load_many(sources: Iterable[tuple[str, SpecFormat]], max_workers: int | None = None,
+              cache: SpecCache | None = None)->list[AirfoilSpecs]:
+    """
+    Load many spec files in parallel on a thread pool, through a spec cache.  Each distinct file is loaded once.
+    Args:
+        sources: (path, SpecFormat) pairs; repeats are allowed
+        max_workers: size of the thread pool; defaults to the ThreadPoolExecutor default
+        cache: cache to use; defaults to default_cache()
+
+    Returns:
+        AirfoilSpecs for each source, in order.  The first load error is raised.
+    """
+    cache = cache if cache is not None else default_cache()
+    sources = [(src, SpecFormat(spec_format)) for src, spec_format in sources]
+    keys = [(os.path.abspath(src), spec_format) for src, spec_format in sources]
+    distinct = {}
+    for key, source in zip(keys, sources):
+        distinct.setdefault(key, source)
+    if not distinct:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {key: executor.submit(cache.load, *source) for key, source in distinct.items()}
+        return [futures[key].result() for key in keys]
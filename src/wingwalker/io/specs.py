@@ -1,20 +1,59 @@
+"""
+Re-entrant loading of airfoil spec files.  No parser state is kept at module level, so spec files can be parsed
+from several threads at once.
+"""
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
 from wingwalker.base import Reader
 from wingwalker.lednicer import Parser as LednicerParser, parse_lednicer
 from wingwalker.models.airfoil_specs import AirfoilSpecs
 from wingwalker.selig import Parser as SeligParser, parse_selig
 from wingwalker.models.enums import SpecFormat
 
-reader: Reader
 
-def parse_specfile(src: str, spec_format: SpecFormat)-> AirfoilSpecs:
-    global reader
-    match spec_format:
+def get_reader(src: str, spec_format: SpecFormat)->Reader:
+    """
+    New parser for a spec file
+    Args:
+        src: path to the spec file
+        spec_format: SpecFormat.SELIG or SpecFormat.LEDNICER
+
+    Returns:
+        Reader for the file, owned by the caller
+    """
+    match SpecFormat(spec_format):
         case SpecFormat.SELIG:
-            reader = SeligParser(src)
+            return SeligParser(src)
         case SpecFormat.LEDNICER:
-            reader = LednicerParser(src)
-        case SpecFormat.UNDEFINED:
+            return LednicerParser(src)
+        case _:
             raise NotImplementedError("input file format must be defined as SELIG or LEDNICER")
 
-    xarr, yarr, spec_name = reader.read()
+def parse_specfile(src: str, spec_format: SpecFormat)-> AirfoilSpecs:
+    """
+    Parse a spec file into AirfoilSpecs.  Safe to call from several threads at once.
+    Args:
+        src: path to the spec file
+        spec_format: SpecFormat.SELIG or SpecFormat.LEDNICER
+
+    Returns:
+        AirfoilSpecs for the file
+    """
+    reader = get_reader(src, spec_format)
+    xarr, yarr, spec_name = reader.read_array()
     return AirfoilSpecs(src, spec_name, xarr, yarr)
+
+def parse_specfiles(sources: Iterable[tuple[str, SpecFormat]], max_workers: int | None = None)->list[AirfoilSpecs]:
+    """
+    Parse many spec files in parallel on a thread pool, without any caching (see spec_cache.load_many)
+    Args:
+        sources: (path, SpecFormat) pairs
+        max_workers: size of the thread pool; defaults to the ThreadPoolExecutor default
+
+    Returns:
+        AirfoilSpecs for each source, in order.  The first parse error is raised.
+    """
+    sources = list(sources)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda source: parse_specfile(*source), sources))
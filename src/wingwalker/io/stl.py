@@ -0,0 +1,102 @@
+"""
+Native binary STL writer, working directly from vertex and face arrays.
+"""
+from collections.abc import Iterable
+
+import numpy as np
+
+# Binary STL record: facet normal, three vertices, attribute byte count (50 bytes, little-endian, unpadded)
+STL_RECORD_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attributes', '<u2'),
+])
+
+STL_HEADER_SIZE = 80
+
+
+def facet_normals(triangles: np.ndarray)->np.ndarray:
+    """
+    Unit normals for a set of triangles, following the right-hand rule on the vertex order
+    Args:
+        triangles: float array of shape (F, 3, 3)
+
+    Returns:
+        float array of shape (F, 3).  Degenerate (zero area) triangles get a zero normal.
+    """
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    np.divide(normals, lengths, out=normals, where=lengths > 0.0)
+    return normals
+
+def stl_header(text: str)->bytes:
+    """
+    Build the 80 byte STL header.  The header must not start with 'solid', or readers may treat the
+    file as ASCII STL.
+    Args:
+        text: header text; truncated to fit
+
+    Returns:
+        80 bytes of header, padded with spaces
+    """
+    header = text.encode('ascii', errors='replace')
+    if header.lower().startswith(b'solid'):
+        header = b'_' + header
+    return header[:STL_HEADER_SIZE].ljust(STL_HEADER_SIZE, b' ')
+
+def write_binary_stl(stl_filename: str, vertices: np.ndarray, faces: np.ndarray | Iterable[np.ndarray],
+                     header: str = 'wingwalker binary STL', chunk_size: int = 65536)->int:
+    """
+    Write a triangle mesh as a binary STL file.
+
+    The facet records are built and written in fixed-size chunks, so only chunk_size records are ever held in
+    memory.  Faces can be given as one array, or as an iterable of face arrays (e.g. from
+    processing.mesh.iter_loft_mesh) so the full face list is never built either.
+    Args:
+        stl_filename: path and file name for the STL file
+        vertices: float array of shape (V, 3)
+        faces: int array of shape (F, 3) indexing into vertices, or an iterable of such arrays
+        header: text for the 80 byte STL header
+        chunk_size: number of facet records written per chunk
+
+    Returns:
+        Number of facets written
+    """
+    vertices = np.asarray(vertices)
+    if isinstance(faces, np.ndarray):
+        faces = [faces]
+    chunk_size = max(int(chunk_size), 1)
+    records = np.zeros(chunk_size, dtype=STL_RECORD_DTYPE)
+    facet_count = 0
+    with open(stl_filename, 'wb') as fout:
+        fout.write(stl_header(header))
+        # Facet count is back-filled once every chunk has been streamed
+        fout.write(np.uint32(0).tobytes())
+        for face_block in faces:
+            face_block = np.asarray(face_block)
+            for start in range(0, len(face_block), chunk_size):
+                face_chunk = face_block[start:start + chunk_size]
+                count = len(face_chunk)
+                triangles = vertices[face_chunk]
+                chunk = records[:count]
+                chunk['normal'] = facet_normals(triangles)
+                chunk['vertices'] = triangles
+                chunk.tofile(fout)
+                facet_count += count
+        fout.seek(STL_HEADER_SIZE)
+        fout.write(np.uint32(facet_count).astype('<u4').tobytes())
+    return facet_count
+
+def read_binary_stl(stl_filename: str)->np.ndarray:
+    """
+    Read the facet records back from a binary STL file
+    Args:
+        stl_filename: path and file name of the STL file
+
+    Returns:
+        Structured array of STL_RECORD_DTYPE records
+    """
+    with open(stl_filename, 'rb') as fin:
+        fin.seek(STL_HEADER_SIZE)
+        facet_count = int(np.frombuffer(fin.read(4), dtype='<u4')[0])
+        return np.fromfile(fin, dtype=STL_RECORD_DTYPE, count=facet_count)
@@ -1,7 +1,9 @@
 f"""
 Functions to parse Lednicer-formatted airfoil specs
 """
-from io import TextIOWrapper
+from io import BytesIO, TextIOWrapper
+
+import numpy as np
 
 import wingwalker.utils as utils
 import re
@@ -63,6 +65,36 @@ def parse_lednicer(stream: TextIOWrapper, x_coords: list[float], y_coords: list[
     return airfoil_desig.strip()
 
 
+def parse_lednicer_array(stream: TextIOWrapper, c_len: float = 1.0) -> (np.ndarray, np.ndarray, str):
+    """
+    Fast path for parsing Lednicer-formated airfoil specifications.
+
+    The header (airfoil name and upper/lower point counts) is read as in parse_lednicer; each coordinate block
+    is handed to numpy in a single call.  Files that do not fit that layout fall back to parse_lednicer.
+    Args:
+        stream: existing file stream
+        c_len: float value denoting the final chord length (units not required)
+    Returns:
+        The x (chord-oriented) coordinate array, the y (chord-perpendicular) coordinate array, and the name of the
+        Lednicer-formatted airfoil
+    """
+    data = stream.read()
+    lines = data.decode('utf-8').splitlines()
+    airfoil_desig = lines[0]
+    upper_len, lower_len = utils.convert_int(lines[1])
+    # Upper surface starts after the blank line following the header; lower surface after the next blank line
+    upper = utils.parse_coord_block('\n'.join(lines[3:3 + upper_len]))
+    lower = utils.parse_coord_block('\n'.join(lines[4 + upper_len:4 + upper_len + lower_len]))
+    if upper is None or lower is None or len(upper) != upper_len or len(lower) != lower_len:
+        x_coords, y_coords = [], []
+        airfoil_desig = parse_lednicer(BytesIO(data), x_coords, y_coords, c_len)
+        return np.array(x_coords, dtype=np.float64), np.array(y_coords, dtype=np.float64), airfoil_desig
+
+    # Upper surface leading edge -> trailing edge, then lower surface trailing edge -> leading edge
+    coords = np.concatenate((upper, lower[::-1])) * c_len
+    return coords[:, 0].copy(), coords[:, 1].copy(), airfoil_desig.strip()
+
+
 class Parser(base.Reader):
     """
     Parser for Lednicer-formatted airfoil specifications.
@@ -83,6 +115,10 @@ class Parser(base.Reader):
             airfoil_desig = parse_lednicer(file, xs, ys, chord_len)
             return xs, ys, airfoil_desig
 
+    def read_array(self, c_len = 1.0):
+        with open(self.filename, 'rb') as file:
+            return parse_lednicer_array(file, c_len)
+
 
 if __name__ == '__main__':
     arg_parser = argparse.ArgumentParser(description='Parse Lednicer-formatted airfoil specs')
@@ -1,16 +1,27 @@
 from collections.abc import Iterator
+from typing import TYPE_CHECKING
 
-from shapely.geometry import Point
+import numpy as np
+
+if TYPE_CHECKING:
+    from shapely.geometry import Point
 
 class AirfoilSection:
     """
     Single cross-section of a wing, holding assigned chord length, z-index, twist and coordinates of that
     particular section.
 
-    Implements the iterator functions
+    The coordinates are an (N, 3) array; for sections of a WingModel this is a view into the model's coordinate
+    array, so no point data is copied.  Iterating yields shapely Points, built on the fly; each call to iter()
+    gets its own iterator, so nested or concurrent iteration is safe.
     """
-    def __init__(self, coords: list[Point], chord: float, z_index: float, twist: float, spec_name: str = "Undefined"):
-        self.coords = coords
+    __slots__ = ('coords', 'chord', 'z_index', 'twist', 'spec_name')
+
+    def __init__(self, coords: 'np.ndarray | list[Point]', chord: float, z_index: float, twist: float,
+                 spec_name: str = "Undefined"):
+        if not isinstance(coords, np.ndarray):
+            coords = np.array([(p.x, p.y, p.z) for p in coords], dtype=float).reshape(-1, 3)
+        self.coords: np.ndarray = coords
         self.chord = chord
         self.z_index = z_index
         self.twist = twist
@@ -19,14 +30,16 @@ class AirfoilSection:
     def __str__(self)->str:
         return f'Airfoil: {self.spec_name}, chord: {self.chord}, z: {self.z_index}, twist: {self.twist}'
 
-    def __iter__(self)->Iterator[Point]:
-        self.idx = 0
-        return self
-
-    def __next__(self)->Point:
-        if self.idx < len(self.coords):
-            next_coord = self.coords[self.idx]
-            self.idx += 1
-            return next_coord
-        else:
-            raise StopIteration
\ No newline at end of file
+    def __len__(self)->int:
+        return self.coords.shape[0]
+
+    def __getitem__(self, idx: int)->'Point':
+        from shapely.geometry import Point
+
+        p = self.coords[idx]
+        return Point(p[0], p[1], p[2])
+
+    def __iter__(self)->Iterator['Point']:
+        from shapely.geometry import Point
+
+        return (Point(p[0], p[1], p[2]) for p in self.coords)
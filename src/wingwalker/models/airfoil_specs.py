@@ -1,21 +1,26 @@
-from shapely.geometry import Point, LineString, Polygon
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from shapely.geometry import Point, LineString, Polygon
 
 class AirfoilSpecs(object):
     """
     Class representing the parsed airfoil specifications.
 
+    The unit-chord coordinates are held in a single Nx2 float array.  Area, centroid and second moments of the
+    unit-chord section are calculated once (shoelace formula) and scaled for any requested chord length.
+
     Include methods to generate shapely.geometry structures for further processing and
     design.
     """
     def __init__(self, src: str, designation: str=None, x: list[float]=None, y: list[float]=None):
         self.src = src
         self.designation = designation
-        self.x = x
-        self.y = y
-        if self.x is None:
-            self.x = []
-        if self.y is None:
-            self.y = []
+        self._unit_props: dict | None = None
+        self.coords: np.ndarray = np.empty((0, 2), dtype=float)
+        self.set_coords(x if x is not None else [], y if y is not None else [])
 
     def __str__(self)->str:
         return f'Airfoil \'{self.designation}\', src={self.src}, # points={len(self.x)}'
@@ -23,6 +28,176 @@ class AirfoilSpecs(object):
     def __repr__(self)->str:
         return f'AirfoilSpecs(src={self.src})'
 
+    def set_coords(self, x, y):
+        """
+        Replace the unit-chord coordinates, clearing any cached section properties
+        Args:
+            x: x (chord-oriented) coordinates
+            y: y (chord-perpendicular) coordinates
+        """
+        self.coords = np.column_stack((np.asarray(x, dtype=float), np.asarray(y, dtype=float)))
+        self._unit_props = None
+
+    @property
+    def x(self)->np.ndarray:
+        """
+        View of the unit-chord x coordinates
+        """
+        return self.coords[:, 0]
+
+    @x.setter
+    def x(self, values):
+        self.set_coords(values, self.y)
+
+    @property
+    def y(self)->np.ndarray:
+        """
+        View of the unit-chord y coordinates
+        """
+        return self.coords[:, 1]
+
+    @y.setter
+    def y(self, values):
+        self.set_coords(self.x, values)
+
+    def _unit_properties(self)->dict:
+        """
+        Calculate (once) the area, centroid and second moments of the unit-chord section, using the shoelace formula
+        over the closed loop of coordinates, along with its perimeter and maximum thickness.
+        Returns:
+            dict with area, centroid (cx, cy), moments (Ixx, Iyy, Ixy) about the centroid, perimeter and thickness
+        """
+        if self._unit_props is not None:
+            return self._unit_props
+        x = self.coords[:, 0]
+        y = self.coords[:, 1]
+        x_next = np.roll(x, -1)
+        y_next = np.roll(y, -1)
+        cross = x * y_next - x_next * y
+        signed_area = cross.sum() / 2.0
+        perimeter = float(np.hypot(x_next - x, y_next - y).sum())
+        if len(x) < 3 or signed_area == 0.0:
+            # Degenerate trace; fall back to the mean of the points
+            cx = float(x.mean()) if len(x) > 0 else 0.0
+            cy = float(y.mean()) if len(y) > 0 else 0.0
+            self._unit_props = {'area': 0.0, 'centroid': (cx, cy), 'moments': (0.0, 0.0, 0.0),
+                                'perimeter': perimeter, 'thickness': 0.0}
+            return self._unit_props
+        cx = ((x + x_next) * cross).sum() / (6.0 * signed_area)
+        cy = ((y + y_next) * cross).sum() / (6.0 * signed_area)
+        # Second moments about the origin; the sign of the area accounts for the trace direction
+        orientation = 1.0 if signed_area > 0.0 else -1.0
+        area = abs(signed_area)
+        ixx = orientation * ((y * y + y * y_next + y_next * y_next) * cross).sum() / 12.0
+        iyy = orientation * ((x * x + x * x_next + x_next * x_next) * cross).sum() / 12.0
+        ixy = orientation * ((x * y_next + 2.0 * x * y + 2.0 * x_next * y_next + x_next * y) * cross).sum() / 24.0
+        # Parallel axis theorem to move them to the centroid
+        self._unit_props = {
+            'area': float(area),
+            'centroid': (float(cx), float(cy)),
+            'moments': (float(ixx - area * cy * cy), float(iyy - area * cx * cx), float(ixy - area * cx * cy)),
+            'perimeter': perimeter,
+            'thickness': self._max_thickness(x, y)
+        }
+        return self._unit_props
+
+    @staticmethod
+    def _max_thickness(x: np.ndarray, y: np.ndarray, samples: int = 201)->float:
+        """
+        Largest distance between the two surfaces of the trace, measured perpendicular to the chord.  The loop is
+        split at the leading (min x) and trailing (max x) edges, so this works for either trace direction.
+        """
+        start = int(np.argmin(x))
+        x = np.roll(x, -start)
+        y = np.roll(y, -start)
+        end = int(np.argmax(x))
+        x_a, y_a = x[:end + 1], y[:end + 1]
+        x_b, y_b = np.append(x[end:], x[0]), np.append(y[end:], y[0])
+        order_a = np.argsort(x_a, kind='stable')
+        order_b = np.argsort(x_b, kind='stable')
+        x_grid = np.linspace(max(x_a.min(), x_b.min()), min(x_a.max(), x_b.max()), samples)
+        y_a = np.interp(x_grid, x_a[order_a], y_a[order_a])
+        y_b = np.interp(x_grid, x_b[order_b], y_b[order_b])
+        return float(np.abs(y_a - y_b).max())
+
+    @property
+    def unit_area(self)->float:
+        """
+        Area of the airfoil section at unit chord length
+        """
+        return self._unit_properties()['area']
+
+    @property
+    def unit_centroid(self)->tuple[float, float]:
+        """
+        Centroid (x, y) of the airfoil section at unit chord length
+        """
+        return self._unit_properties()['centroid']
+
+    @property
+    def unit_moments(self)->tuple[float, float, float]:
+        """
+        Second moments of area (Ixx, Iyy, Ixy) about the centroid, at unit chord length
+        """
+        return self._unit_properties()['moments']
+
+    @property
+    def unit_perimeter(self)->float:
+        """
+        Length of the closed airfoil trace at unit chord length
+        """
+        return self._unit_properties()['perimeter']
+
+    @property
+    def unit_thickness(self)->float:
+        """
+        Maximum thickness of the airfoil section at unit chord length
+        """
+        return self._unit_properties()['thickness']
+
+    def area(self, c_len: float = 1.0)->float:
+        """
+        Area of the airfoil section
+        Args:
+            c_len: length of the chord for this section
+
+        Returns:
+            Cross-section area, scaled by c_len^2
+        """
+        return self.unit_area * c_len * c_len
+
+    def moments(self, c_len: float = 1.0, mirror: bool = False)->tuple[float, float, float]:
+        """
+        Second moments of area of the airfoil section about its centroid
+        Args:
+            c_len: length of the chord for this section
+            mirror: Generate mirror image about the X axis of the original spec
+
+        Returns:
+            Tuple of (Ixx, Iyy, Ixy), scaled by c_len^4
+        """
+        ixx, iyy, ixy = self.unit_moments
+        scale = c_len ** 4
+        mirror_val = -1.0 if mirror else 1.0
+        return ixx * scale, iyy * scale, ixy * scale * mirror_val
+
+    def trace_array(self, c_len: float = 1.0, z: float = 0.0, mirror: bool = False)->np.ndarray:
+        """
+        Coordinates of the airfoil trace as an array, scaled by c_len and placed at z
+        Args:
+            c_len: length of chord to which the points should be scaled.  Default is 1.0 (unit scaling)
+            z: Position of the points along the 3d z-axis. Default is 0.0 (equivalent to 2D points)
+            mirror: Generate mirror image about the X axis of the original spec
+        Returns:
+            float array of shape (points, 3)
+        """
+        mirror_val = -1.0 if mirror else 1.0
+        points = np.empty((self.coords.shape[0], 3), dtype=float)
+        points[:, 0] = self.coords[:, 0] * c_len
+        points[:, 1] = self.coords[:, 1] * (c_len * mirror_val)
+        points[:, 2] = z
+        return points
+
     def trace(self, c_len: float = 1.0, z: float = 0.0, mirror: bool = False):
         """
         Generator function for shapely Points.  If non-default values are given for c_len and z,  then the
@@ -36,11 +211,12 @@ class AirfoilSpecs(object):
         Returns:
             yields shapely.geometry.Points in order
         """
-        mirror_val = -1.0 if mirror else 1.0
-        for i in range(0, len(self.x)):
-            yield Point(self.x[i] * c_len, self.y[i] * c_len * mirror_val, z)
+        from shapely.geometry import Point
+
+        for p in self.trace_array(c_len, z, mirror):
+            yield Point(p[0], p[1], p[2])
 
-    def to_line(self, c_len: float = 1.0, z: float = 0.0, mirror: bool = False)->LineString:
+    def to_line(self, c_len: float = 1.0, z: float = 0.0, mirror: bool = False)->'LineString':
         """
         Function to create a shapely.geometry.LineString instance representing a path
         around the airfoil surface.
@@ -52,12 +228,11 @@ class AirfoilSpecs(object):
         Returns:
             A shapely.geometry.LineString instance containing the ordered points
         """
-        coords = []
-        for p in self.trace(c_len, z, mirror):
-            coords.append(p)
-        return LineString(coords)
+        from shapely.geometry import LineString
 
-    def to_poly(self, c_len: float = 1.0, z: float = 0.0, mirror: bool = False)->Polygon:
+        return LineString(self.trace_array(c_len, z, mirror))
+
+    def to_poly(self, c_len: float = 1.0, z: float = 0.0, mirror: bool = False)->'Polygon':
         """
         Function to create a shapely.geometry.Polygon instance representing a face
         of the airfoil cross-section.
@@ -69,14 +244,13 @@ class AirfoilSpecs(object):
         Returns:
             A shapely.geometry.Polygon instance containing the ordered points
         """
-        coords = []
-        for p in self.trace(c_len, z, mirror):
-            coords.append(p)
-        return Polygon(coords)
+        from shapely.geometry import Polygon
+
+        return Polygon(self.trace_array(c_len, z, mirror))
 
-    def centroid(self, c_len: float = 1.0, z: float = 0.0, mirror: bool = False)->Point:
+    def centroid(self, c_len: float = 1.0, z: float = 0.0, mirror: bool = False)->'Point':
         """
-        Find the centroid of the airfoil trace.
+        Find the centroid of the airfoil trace.  Scaled from the cached unit-chord centroid.
         Args:
             c_len: length of the chord for this section
             z: Position of this section along the z-axies
@@ -85,4 +259,8 @@ class AirfoilSpecs(object):
         Returns:
             shapely.geometry.Point for the centroid of the airfoil trace
         """
-        return self.to_poly(c_len=c_len, z=z, mirror=mirror).centroid
\ No newline at end of file
+        from shapely.geometry import Point
+
+        cx, cy = self.unit_centroid
+        mirror_val = -1.0 if mirror else 1.0
+        return Point(cx * c_len, cy * c_len * mirror_val)
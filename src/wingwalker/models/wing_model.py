@@ -1,5 +1,7 @@
 from typing import Iterator
 
+import numpy as np
+
 from wingwalker.build_params.wing_request import WingRequest
 from wingwalker.models.airfoil_section import AirfoilSection
 from wingwalker.models.airfoil_specs import AirfoilSpecs
@@ -9,18 +11,111 @@ class WingModel:
     """
     Class representing a full "wing" (root to tip) in one complete listing of airfoil sections.
 
+    The model owns a single contiguous (sections, points, 3) coordinate array, plus one chord, z-index and twist
+    value per section.  AirfoilSection instances are lightweight views into that array.
+
     Implements iterator functions
     """
-    def __init__(self, wing_params: WingRequest, af_specs: AirfoilSpecs, airfoil_sections: list[AirfoilSection]):
-        self.airfoil_sections = airfoil_sections
+    def __init__(self, wing_params: WingRequest, af_specs: AirfoilSpecs,
+                 coords: np.ndarray | list[AirfoilSection] = None, chords: np.ndarray = None,
+                 z_indices: np.ndarray = None, twists: np.ndarray = None):
+        """
+        Instantiates a new WingModel
+        Args:
+            wing_params: requirements for the wing
+            af_specs: airfoil specifications
+            coords: float array of shape (sections, points, 3), or a list of AirfoilSection instances
+            chords: chord length of each section (ignored when coords is a list of sections)
+            z_indices: z position of each section (ignored when coords is a list of sections)
+            twists: twist of each section (ignored when coords is a list of sections)
+        """
         self.af_specs = af_specs
         self.wing_params = wing_params
+        self.coords: np.ndarray = np.empty((0, 0, 3), dtype=float)
+        self.chords: np.ndarray = np.empty(0, dtype=float)
+        self.z_indices: np.ndarray = np.empty(0, dtype=float)
+        self.twists: np.ndarray = np.empty(0, dtype=float)
+        if isinstance(coords, list):
+            self.airfoil_sections = coords
+        elif coords is not None:
+            self._set_arrays(coords, chords, z_indices, twists)
         self.base_chord: float = 0.0
         self.end_chord: float = 0.0
         self.span: float = 0.0
         self.area: float = 0.0
         self.notes: str = ''
 
+    def _set_arrays(self, coords: np.ndarray, chords, z_indices, twists):
+        self.coords = np.ascontiguousarray(coords, dtype=float)
+        section_count = self.coords.shape[0]
+        self.chords = np.asarray(chords if chords is not None else np.zeros(section_count), dtype=float)
+        self.z_indices = np.asarray(z_indices if z_indices is not None else self.coords[:, 0, 2], dtype=float)
+        self.twists = np.asarray(twists if twists is not None else np.zeros(section_count), dtype=float)
+
+    @classmethod
+    def from_array(cls, wing_params: WingRequest, af_specs: AirfoilSpecs, coords: np.ndarray,
+                   chords: np.ndarray, z_indices: np.ndarray, twists: np.ndarray)->'WingModel':
+        """
+        Create a wing model directly from the batched coordinate array.
+        Args:
+            wing_params: requirements for the wing
+            af_specs: airfoil specifications
+            coords: float array of shape (sections, points, 3)
+            chords: chord length of each section
+            z_indices: z position of each section
+            twists: twist of each section
+
+        Returns:
+            WingModel backed by the given arrays
+        """
+        return cls(wing_params, af_specs, coords, chords, z_indices, twists)
+
+    def section(self, idx: int)->AirfoilSection:
+        """
+        View of a single airfoil section
+        Args:
+            idx: section index, from the root
+
+        Returns:
+            AirfoilSection whose coordinates are a view into this model's coordinate array
+        """
+        return AirfoilSection(
+            coords=self.coords[idx],
+            chord=float(self.chords[idx]),
+            z_index=float(self.z_indices[idx]),
+            twist=float(self.twists[idx]),
+            spec_name=self.af_specs.designation
+        )
+
+    @property
+    def airfoil_sections(self)->list[AirfoilSection]:
+        """
+        Airfoil sections of the wing, from root to tip, as views into the coordinate array
+        Returns:
+            List of AirfoilSection instances
+        """
+        return [self.section(i) for i in range(self.section_count)]
+
+    @airfoil_sections.setter
+    def airfoil_sections(self, sections: list[AirfoilSection]):
+        if len(sections) == 0:
+            self._set_arrays(np.empty((0, 0, 3), dtype=float), None, None, None)
+            return
+        self._set_arrays(
+            np.stack([s.coords for s in sections]),
+            [s.chord for s in sections],
+            [s.z_index for s in sections],
+            [s.twist for s in sections]
+        )
+
+    @property
+    def section_count(self)->int:
+        """
+        Number of airfoil sections
+        Returns:
+            Number of sections from root to tip
+        """
+        return self.coords.shape[0]
 
     @property
     def mac(self)->float:
@@ -44,10 +139,10 @@ class WingModel:
 
     @property
     def identifier(self)->str:
-        return f'wing_model_{self.wing_params.identifier}_{len(self.airfoil_sections)}'
+        return f'wing_model_{self.wing_params.identifier}_{self.section_count}'
 
     def __str__(self)->str:
-        return f'Full Wing: {self.wing_type.name}, Planform: {self.planform.name}, {len(self.airfoil_sections)} sections'
+        return f'Full Wing: {self.wing_params.wing_type.name}, Planform: {self.wing_params.planform.name}, {self.section_count} sections'
 
     def __repr__(self)->str:
         r: str = 'Wing Model\n'
@@ -66,19 +161,17 @@ class WingModel:
         r += '----------------------------\n'
         r += 'Airfoil Specifications:\n'
         r += f'Airfoil Name: {self.af_specs.designation}\n'
-        r += f'Airfoil Sections: {len(self.airfoil_sections)}\n'
+        r += f'Airfoil Sections: {self.section_count}\n'
         r += '----------------------------\n'
         r += f'Notes\n'
         r += f' {self.notes}'
         return r
 
+    def __len__(self)->int:
+        return self.section_count
+
+    def __getitem__(self, idx: int)->AirfoilSection:
+        return self.section(idx)
+
     def __iter__(self)->Iterator[AirfoilSection]:
-        self.idx = 0
-        return self
-
-    def __next__(self)->AirfoilSection:
-        if self.idx >= len(self.airfoil_sections):
-            raise StopIteration
-        next_section = self.airfoil_sections[self.idx]
-        self.idx += 1
-        return next_section
\ No newline at end of file
+        return (self.section(i) for i in range(self.section_count))
\ No newline at end of file
@@ -1,58 +1,290 @@
-import pymeshlab
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
 import numpy as np
 
 from wingwalker.generators.wing import generate_point_cloud_array
+from wingwalker.instrumentation import stage
 from wingwalker.models.wing_model import WingModel
 
+if TYPE_CHECKING:
+    import pymeshlab
+
 
-def transform_to_pml_mesh(model: WingModel)->pymeshlab.Mesh:
+def transform_to_pml_mesh(model: WingModel)->'pymeshlab.Mesh':
     """
-    Utility function to generate a pymeshlab.Mesh object from a wing model's point cloud
+    Utility function to generate a pymeshlab.Mesh object from a wing model's point cloud.
+
+    The model's coordinate buffer is handed over as a view (see generate_point_cloud_array); pymeshlab always
+    copies the vertices into its own mesh structure, which is the only copy made.
     Args:
         model: Input airfoil model
 
     Returns:
         An unprocessed pymeshlab.Mesh instance with the raw vertices from the model's point cloud
     """
+    import pymeshlab
+
     vert_array: np.ndarray = generate_point_cloud_array(model)
     mesh = pymeshlab.Mesh(vertex_matrix=vert_array)
     return mesh
 
-def generate_closed_mesh(model: WingModel)->pymeshlab.MeshSet:
+def profile_ring(section: np.ndarray, tolerance: float = 1e-9)->np.ndarray:
+    """
+    Indices of the distinct points around an airfoil trace.  Repeated points (e.g. a closing point equal to the
+    first point, or a doubled trailing edge) are dropped so every edge of the ring has a length.
+    Args:
+        section: array of shape (points, 2+) holding one section of the wing
+        tolerance: distance, relative to the section size, below which two neighbouring points are the same
+
+    Returns:
+        1D int array of the point indices that make up the ring, in trace order
+    """
+    xy = section[:, :2]
+    limit = tolerance * max(float(np.ptp(xy[:, 0])), float(np.ptp(xy[:, 1])), 1.0)
+    step = np.linalg.norm(np.roll(xy, -1, axis=0) - xy, axis=1)
+    return np.flatnonzero(step > limit)
+
+def signed_area(xy: np.ndarray)->float:
+    """
+    Signed area (shoelace formula) of a closed 2D ring.  Positive for counter-clockwise rings.
+    Args:
+        xy: array of shape (points, 2)
+
+    Returns:
+        Signed area of the ring
+    """
+    x = xy[:, 0]
+    y = xy[:, 1]
+    return float((x * np.roll(y, -1) - np.roll(x, -1) * y).sum() / 2.0)
+
+def triangulate_profile(xy: np.ndarray)->np.ndarray:
     """
-    Takes a wing model, converts it to a pymeshlab.Mesh, and then adds that to a pymeshlab.MeshSet.
+    Triangulate a simple (non-self-intersecting) 2D ring by ear clipping.
+    Args:
+        xy: array of shape (points, 2) holding the ring, without a repeated closing point
+
+    Returns:
+        int array of shape (points - 2, 3) with counter-clockwise triangles indexing into xy
+    """
+    orientation = 1.0 if signed_area(xy) >= 0.0 else -1.0
+    remaining = list(range(len(xy)))
+    triangles = []
+    i = 0
+    misses = 0
+    while len(remaining) > 3:
+        count = len(remaining)
+        prev_i, cur_i, next_i = remaining[i - 1], remaining[i], remaining[(i + 1) % count]
+        a, b, c = xy[prev_i], xy[cur_i], xy[next_i]
+        turn = orientation * ((b[0] - a[0]) * (c[1] - b[1]) - (b[1] - a[1]) * (c[0] - b[0]))
+        is_ear = False
+        if turn > 0.0:
+            others = np.array([r for r in remaining if r not in (prev_i, cur_i, next_i)], dtype=int)
+            p = xy[others]
+            d1 = orientation * ((b[0] - a[0]) * (p[:, 1] - a[1]) - (b[1] - a[1]) * (p[:, 0] - a[0]))
+            d2 = orientation * ((c[0] - b[0]) * (p[:, 1] - b[1]) - (c[1] - b[1]) * (p[:, 0] - b[0]))
+            d3 = orientation * ((a[0] - c[0]) * (p[:, 1] - c[1]) - (a[1] - c[1]) * (p[:, 0] - c[0]))
+            is_ear = not bool(np.any((d1 > 0.0) & (d2 > 0.0) & (d3 > 0.0)))
+        # A full lap without an ear only happens on degenerate (collinear) rings; clip anyway to finish
+        if is_ear or misses >= count:
+            triangles.append((prev_i, cur_i, next_i))
+            remaining.pop(i)
+            i = i % len(remaining)
+            misses = 0
+        else:
+            i = (i + 1) % count
+            misses += 1
+    triangles.append(tuple(remaining))
+    faces = np.array(triangles, dtype=np.int64)
+    if orientation < 0.0:
+        faces = faces[:, ::-1]
+    return faces
 
-    The MeshSet has a standard set of filters applied to turn the point cloud into a closed model, suitable for exporting as
-    an STL file.
+def iter_loft_mesh(model: WingModel, tolerance: float = 1e-9,
+                   chunk_sections: int = 64)->tuple[np.ndarray, Iterator[np.ndarray]]:
+    """
+    Build a closed triangle mesh directly from the ordered wing sections, yielding the faces in chunks.
+
+    Every section has the same ordered points, so the faces are known in advance: triangle strips join each pair
+    of neighbouring sections, and the root and tip sections are closed with triangulated caps.  A section that has
+    collapsed to a single point (e.g. the tip of an elliptical wing, or a zero end chord) becomes one apex vertex,
+    joined to its neighbour with a triangle fan.  Faces are wound so their normals point out of the wing.
+    Args:
+        model: The input airfoil model
+        tolerance: section size, relative to the largest section, below which a section is treated as a point
+        chunk_sections: number of section-to-section strips in each chunk of faces
+
+    Returns:
+        Tuple of (vertices, face chunks): float array of shape (V, 3), and an iterator of int arrays of shape (F, 3)
+    """
+    section_count = model.section_count
+    if section_count < 2:
+        raise ValueError('At least two sections are required to build a mesh')
+    coords = generate_point_cloud_array(model).reshape(section_count, -1, 3)
+    extents = np.ptp(coords[:, :, :2], axis=1).max(axis=1)
+    collapsed = extents <= tolerance * max(float(extents.max()), 1.0)
+    if collapsed.all():
+        raise ValueError('All of the wing sections have collapsed to a single point')
+
+    # Ring topology and orientation are shared by every section (scale and twist do not change them)
+    ref_section = coords[int(np.argmin(collapsed))]
+    ring = profile_ring(ref_section)
+    ring_size = len(ring)
+    ring_xy = ref_section[ring, :2]
+    z_increasing = coords[-1, 0, 2] >= coords[0, 0, 2]
+    outward = (signed_area(ring_xy) > 0.0) == z_increasing
+
+    # Lay out the vertices section by section: a full ring, or one apex for a collapsed section
+    sizes = np.where(collapsed, 1, ring_size)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    vertices = np.empty((int(sizes.sum()), 3), dtype=float)
+    for s in range(section_count):
+        if collapsed[s]:
+            vertices[offsets[s]] = coords[s, ring].mean(axis=0)
+        else:
+            vertices[offsets[s]:offsets[s] + ring_size] = coords[s, ring]
+
+    def strip(s: int)->list[np.ndarray]:
+        # Faces are built for a counter-clockwise ring lofted towards +z, and flipped afterwards if needed
+        i = np.arange(ring_size)
+        i_next = np.roll(i, -1)
+        lower, upper = offsets[s], offsets[s + 1]
+        if collapsed[s] and collapsed[s + 1]:
+            return []
+        if collapsed[s]:
+            return [np.column_stack((np.full(ring_size, lower), upper + i_next, upper + i))]
+        if collapsed[s + 1]:
+            return [np.column_stack((lower + i, lower + i_next, np.full(ring_size, upper)))]
+        return [np.column_stack((lower + i, lower + i_next, upper + i)),
+                np.column_stack((lower + i_next, upper + i_next, upper + i))]
+
+    def caps()->list[np.ndarray]:
+        cap = triangulate_profile(ring_xy)
+        if signed_area(ring_xy) < 0.0:
+            # Caps are triangulated counter-clockwise; wind them the same way as the ring
+            cap = cap[:, ::-1]
+        blocks = []
+        if not collapsed[0]:
+            blocks.append(cap[:, ::-1] + offsets[0])
+        if not collapsed[-1]:
+            blocks.append(cap + offsets[-1])
+        return blocks
+
+    def face_chunks()->Iterator[np.ndarray]:
+        step = max(int(chunk_sections), 1)
+        for start in range(0, section_count - 1, step):
+            blocks = [b for s in range(start, min(start + step, section_count - 1)) for b in strip(s)]
+            if start == 0:
+                blocks = caps() + blocks
+            if len(blocks) == 0:
+                continue
+            faces = np.concatenate(blocks).astype(np.int64)
+            yield np.ascontiguousarray(faces if outward else faces[:, ::-1])
+
+    return vertices, face_chunks()
+
+def generate_loft_mesh(model: WingModel, tolerance: float = 1e-9)->tuple[np.ndarray, np.ndarray]:
+    """
+    Build a closed triangle mesh directly from the ordered wing sections (see iter_loft_mesh).
+    Args:
+        model: The input airfoil model
+        tolerance: section size, relative to the largest section, below which a section is treated as a point
+
+    Returns:
+        Tuple of (vertices, faces): float array of shape (V, 3) and int array of shape (F, 3)
+    """
+    vertices, face_chunks = iter_loft_mesh(model, tolerance)
+    return vertices, np.concatenate(list(face_chunks))
+
+
+def mirror_mesh(vertices: np.ndarray,
+                faces: np.ndarray | Iterator[np.ndarray])->tuple[np.ndarray, np.ndarray | Iterator[np.ndarray]]:
+    """
+    Reflect a triangle mesh in the x-z plane (see generators.wing.mirror_wing).  Reflection turns the faces
+    inside out, so the winding of every face is reversed to keep the normals pointing out of the wing.
+    Args:
+        vertices: float array of shape (V, 3)
+        faces: int array of shape (F, 3), or an iterator of face chunks (e.g. from iter_loft_mesh)
+
+    Returns:
+        Tuple of (vertices, faces) for the mirrored mesh, in the same form as the inputs
+    """
+    mirror_vertices = vertices.copy()
+    mirror_vertices[:, 1] *= -1.0
+    if isinstance(faces, np.ndarray):
+        return mirror_vertices, np.ascontiguousarray(faces[:, ::-1])
+    return mirror_vertices, (np.ascontiguousarray(chunk[:, ::-1]) for chunk in faces)
+
+
+def generate_closed_mesh(model: WingModel)->'pymeshlab.MeshSet':
+    """
+    Takes a wing model, builds the structured loft mesh (see generate_loft_mesh), and adds that to a
+    pymeshlab.MeshSet.
+
+    The section topology is known, so the mesh is closed as built; no surface reconstruction or repair passes
+    are needed before exporting as an STL file.
+    Args:
+        model:  The input airfoil model
+
+    Returns:
+        A closed pymeshlab.MeshSet instance, containing a single Mesh.
+    """
+    import pymeshlab
+
+    with stage('generate_closed_mesh') as record:
+        vertices, faces = generate_loft_mesh(model)
+        mesh_set: pymeshlab.MeshSet = pymeshlab.MeshSet()
+        model_mesh = pymeshlab.Mesh(vertex_matrix=vertices, face_matrix=faces.astype(np.int32))
+        mesh_set.add_mesh(model_mesh, model.identifier)
+
+        nm_counts = get_non_manifold_counts(mesh_set)
+        record.points = len(vertices)
+        record.faces = len(faces)
+        record.cycles = 0
+        record.extra.update(non_manifold_vertices=nm_counts[0], non_manifold_edges=nm_counts[1], holes=nm_counts[2])
+    return mesh_set
+
+def generate_reconstructed_mesh(model: WingModel)->'pymeshlab.MeshSet':
+    """
+    Takes a wing model, converts it to a pymeshlab.Mesh point cloud, and then adds that to a pymeshlab.MeshSet.
+
+    The MeshSet has a standard set of filters applied (ball pivoting surface reconstruction and repair passes) to
+    turn the point cloud into a closed model.  Only needed for point clouds without a known section topology;
+    wing models should use generate_closed_mesh.
     Args:
         model:  The input airfoil model
 
     Returns:
         A filtered and closed pymeshlab.MeshSet instance, containing a single Mesh.
     """
-    mesh_set: pymeshlab.MeshSet = pymeshlab.MeshSet()
-    model_mesh = transform_to_pml_mesh(model)
-    mesh_set.add_mesh(model_mesh, model.identifier)
-    mesh_set.compute_normal_for_point_clouds(k=10)
-    mesh_set.generate_surface_reconstruction_ball_pivoting()
-
-    # Chant the invocation no more than 4 times...
-    nm_counts = get_non_manifold_counts(mesh_set)
-    clean_count: int = 0
-    while clean_count < 4 and (nm_counts[0] > 0 or nm_counts[1] > 0 or nm_counts[2] > 0):
-        print(f'\tnon-manifold: vertices={nm_counts[0]}, edges={nm_counts[1]}, holes={nm_counts[2]}')
-        if nm_counts[1] > 0:
-            mesh_set.meshing_repair_non_manifold_edges(method=1)
-        if nm_counts[0] > 0:
-            mesh_set.meshing_repair_non_manifold_vertices(vertdispratio=0.0)
-        mesh_set.meshing_close_holes(maxholesize=300)
-        clean_count += 1
+    import pymeshlab
+
+    with stage('generate_reconstructed_mesh') as record:
+        mesh_set: pymeshlab.MeshSet = pymeshlab.MeshSet()
+        model_mesh = transform_to_pml_mesh(model)
+        mesh_set.add_mesh(model_mesh, model.identifier)
+        mesh_set.compute_normal_for_point_clouds(k=10)
+        mesh_set.generate_surface_reconstruction_ball_pivoting()
+
+        # Chant the invocation no more than 4 times...
         nm_counts = get_non_manifold_counts(mesh_set)
+        clean_count: int = 0
+        while clean_count < 4 and (nm_counts[0] > 0 or nm_counts[1] > 0 or nm_counts[2] > 0):
+            if nm_counts[1] > 0:
+                mesh_set.meshing_repair_non_manifold_edges(method=1)
+            if nm_counts[0] > 0:
+                mesh_set.meshing_repair_non_manifold_vertices(vertdispratio=0.0)
+            mesh_set.meshing_close_holes(maxholesize=300)
+            clean_count += 1
+            nm_counts = get_non_manifold_counts(mesh_set)
 
-    print(f'Final non-manifold: vertices={nm_counts[0]}, edges={nm_counts[1]}, holes={nm_counts[2]}, cycles={clean_count}')
+        record.points = mesh_set.current_mesh().vertex_number()
+        record.faces = mesh_set.current_mesh().face_number()
+        record.cycles = clean_count
+        record.extra.update(non_manifold_vertices=nm_counts[0], non_manifold_edges=nm_counts[1], holes=nm_counts[2])
     return mesh_set
 
-def get_non_manifold_counts(mesh_set: pymeshlab.MeshSet):
+def get_non_manifold_counts(mesh_set: 'pymeshlab.MeshSet'):
     mesh_set.compute_selection_by_non_manifold_per_vertex()
     nm_vert_count = mesh_set.current_mesh().selected_vertex_number()
 
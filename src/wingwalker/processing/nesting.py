@@ -0,0 +1,151 @@
+"""
+Rectangle nesting for flat parts (e.g. rib templates) on fixed-size sheets.
+
+Parts are packed by their bounding boxes with a first-fit decreasing-height shelf algorithm: parts are sorted by
+height, and each one goes on the first shelf (on any sheet) with enough width left, opening a new shelf, or a new
+sheet, when none has room.  Every shelf is as tall as its first part, so the search only has to check widths, and a
+few thousand parts pack in well under a second.
+"""
+import numpy as np
+
+
+class Placement:
+    """
+    Position of one part on a sheet.  x and y are the lower corner of the part's bounding box (without spacing);
+    width and height are the placed (possibly rotated) size.
+    """
+    __slots__ = ('index', 'sheet', 'x', 'y', 'width', 'height', 'rotated')
+
+    def __init__(self, index: int, sheet: int, x: float, y: float, width: float, height: float, rotated: bool):
+        self.index = index
+        self.sheet = sheet
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.rotated = rotated
+
+    def __str__(self)->str:
+        turn = ', rotated' if self.rotated else ''
+        return f'Part {self.index}: sheet {self.sheet}, ({self.x:.3f}, {self.y:.3f}), {self.width:.3f} x {self.height:.3f}{turn}'
+
+
+class PackingResult:
+    """
+    Outcome of packing parts onto sheets
+    """
+    def __init__(self, sheet_width: float, sheet_height: float, placements: list[Placement], sheet_count: int,
+                 part_areas: np.ndarray):
+        """
+        Instantiates a new PackingResult
+        Args:
+            sheet_width: width of each sheet
+            sheet_height: height of each sheet
+            placements: one Placement per part, in the order the parts were given
+            sheet_count: number of sheets used
+            part_areas: material area of each part, in the order the parts were given
+        """
+        self.sheet_width = sheet_width
+        self.sheet_height = sheet_height
+        self.placements = placements
+        self.sheet_count = sheet_count
+        self.part_areas = np.asarray(part_areas, dtype=float)
+
+    def sheet_placements(self, sheet: int)->list[Placement]:
+        """
+        Placements on one sheet
+        Args:
+            sheet: sheet index
+
+        Returns:
+            List of Placement instances on that sheet
+        """
+        return [p for p in self.placements if p.sheet == sheet]
+
+    @property
+    def sheet_utilization(self)->np.ndarray:
+        """
+        Fraction of each sheet's area covered by parts
+        Returns:
+            float array with one entry per sheet
+        """
+        sheets = np.array([p.sheet for p in self.placements], dtype=int)
+        used = np.bincount(sheets, weights=self.part_areas, minlength=self.sheet_count)
+        return used / (self.sheet_width * self.sheet_height)
+
+    @property
+    def utilization(self)->float:
+        """
+        Fraction of the area of all used sheets covered by parts
+        """
+        if self.sheet_count == 0:
+            return 0.0
+        return float(self.part_areas.sum() / (self.sheet_count * self.sheet_width * self.sheet_height))
+
+    def __str__(self)->str:
+        return (f'{len(self.placements)} parts on {self.sheet_count} sheets of {self.sheet_width} x '
+                f'{self.sheet_height}, utilization {self.utilization:.1%}')
+
+
+def pack_rectangles(sizes, sheet_width: float, sheet_height: float, spacing: float = 0.0, rotate: bool = True,
+                    part_areas=None)->PackingResult:
+    """
+    Pack rectangular parts onto as few sheets as the shelf algorithm manages.
+    Args:
+        sizes: (width, height) of each part, as an Nx2 array
+        sheet_width: width of each sheet
+        sheet_height: height of each sheet
+        spacing: gap kept between parts, and between parts and the sheet edges (e.g. for the cutter kerf)
+        rotate: allow parts to be turned by 90 degrees.  Parts are laid flat (longest side along the shelf), which
+            keeps the shelves low
+        part_areas: material area of each part, for the utilization; defaults to the bounding box areas
+
+    Returns:
+        PackingResult holding the placement of every part
+    """
+    sizes = np.asarray(sizes, dtype=float).reshape(-1, 2)
+    if part_areas is None:
+        part_areas = sizes[:, 0] * sizes[:, 1]
+    usable_w = sheet_width - 2.0 * spacing
+    usable_h = sheet_height - 2.0 * spacing
+    widths = sizes[:, 0].copy()
+    heights = sizes[:, 1].copy()
+    rotated = np.zeros(len(sizes), dtype=bool)
+    if rotate:
+        # Lay parts flat when they fit that way; stand them up when only that fits
+        flat_fits = (np.maximum(widths, heights) <= usable_w) & (np.minimum(widths, heights) <= usable_h)
+        rotated = np.where(flat_fits, heights > widths, (widths > usable_w) & (heights <= usable_w))
+        widths, heights = np.where(rotated, heights, widths), np.where(rotated, widths, heights)
+    too_big = (widths > usable_w) | (heights > usable_h)
+    if np.any(too_big):
+        index = int(np.flatnonzero(too_big)[0])
+        raise ValueError(f'Part {index} ({sizes[index, 0]} x {sizes[index, 1]}) does not fit on a '
+                         f'{sheet_width} x {sheet_height} sheet')
+
+    order = np.lexsort((-widths, -heights))
+    # Open shelves: sheet, y position and width still free; and the height used on each sheet
+    shelf_sheet: list[int] = []
+    shelf_y: list[float] = []
+    shelf_free = np.empty(0, dtype=float)
+    sheet_used: list[float] = []
+    placements: list[Placement | None] = [None] * len(sizes)
+    for index in order:
+        w, h = widths[index], heights[index]
+        fits = np.flatnonzero(shelf_free >= w)
+        if len(fits) > 0:
+            shelf = int(fits[0])
+        else:
+            # New shelf on the first sheet with room for it, or on a new sheet
+            sheet = next((s for s, used in enumerate(sheet_used) if used + h <= usable_h), len(sheet_used))
+            if sheet == len(sheet_used):
+                sheet_used.append(0.0)
+            shelf_sheet.append(sheet)
+            shelf_y.append(sheet_used[sheet])
+            sheet_used[sheet] += h + spacing
+            shelf_free = np.append(shelf_free, usable_w)
+            shelf = len(shelf_sheet) - 1
+        x = spacing + usable_w - shelf_free[shelf]
+        shelf_free[shelf] -= w + spacing
+        placements[index] = Placement(int(index), shelf_sheet[shelf], float(x), float(spacing + shelf_y[shelf]),
+                                      float(w), float(h), bool(rotated[index]))
+    return PackingResult(sheet_width, sheet_height, placements, len(sheet_used), part_areas)
@@ -2,13 +2,18 @@
 Functions to parse Selig-formatted data
 """
 
+import logging
 import re
-from io import TextIOWrapper
+from io import BytesIO, TextIOWrapper
+
+import numpy as np
 
 import wingwalker.base as base
 import wingwalker.utils as utils
 import argparse
 
+logger = logging.getLogger(__name__)
+
 
 def parse_selig(stream: TextIOWrapper, x_coords: list[float], y_coords: list[float], c_len: float = 1.0) -> str:
     """
@@ -30,12 +35,51 @@ def parse_selig(stream: TextIOWrapper, x_coords: list[float], y_coords: list[flo
             x_coords.append(x0 * c_len)
             y_coords.append(y0 * c_len)
         elif (not str.isspace(linetxt)) and len(linetxt) != 0:
-            print("Found airfoil id: " + linetxt)
+            logger.debug("Found airfoil id: %s", linetxt.strip())
             airfoil_desig = linetxt
 
     return airfoil_desig.strip()
 
 
+def parse_selig_array(stream: TextIOWrapper, c_len: float = 1.0) -> (np.ndarray, np.ndarray, str):
+    """
+    Fast path for parsing Selig-formated airfoil specifications.
+
+    The header lines are read (and the airfoil name found) as in parse_selig; the coordinate block that follows
+    is handed to numpy in a single call.  Files that do not fit that layout fall back to parse_selig.
+    Args:
+        stream: existing file stream
+        c_len: float value denoting the final chord length (units not required)
+    Returns:
+        The x (chord-oriented) coordinate array, the y (chord-perpendicular) coordinate array, and the name of the
+        Selig-formatted airfoil
+    """
+    airfoil_desig = 'airfoil'
+    data = stream.read()
+    text = data.decode('utf-8')
+    # Header lines come before the first coordinate line
+    offset = 0
+    while offset < len(text):
+        line_end = text.find('\n', offset)
+        line_end = len(text) if line_end < 0 else line_end + 1
+        linetxt = text[offset:line_end]
+        if bool(re.search(utils.coord_patt, linetxt)):
+            break
+        if (not str.isspace(linetxt)) and len(linetxt) != 0:
+            logger.debug("Found airfoil id: %s", linetxt.strip())
+            airfoil_desig = linetxt
+        offset = line_end
+
+    coords = utils.parse_coord_block(text[offset:])
+    if coords is None:
+        x_coords, y_coords = [], []
+        airfoil_desig = parse_selig(BytesIO(data), x_coords, y_coords, c_len)
+        return np.array(x_coords, dtype=np.float64), np.array(y_coords, dtype=np.float64), airfoil_desig
+
+    coords *= c_len
+    return coords[:, 0].copy(), coords[:, 1].copy(), airfoil_desig.strip()
+
+
 class Parser(base.Reader):
     """
     Parser for Selig-formatted airfoil specifications.
@@ -56,6 +100,10 @@ class Parser(base.Reader):
             airfoil_desig = parse_selig(file, xs, ys, chord_len)
             return xs, ys, airfoil_desig
 
+    def read_array(self, c_len = 1.0):
+        with open(self.filename, 'rb') as file:
+            return parse_selig_array(file, c_len)
+
 
 if __name__ == '__main__':
     arg_parser = argparse.ArgumentParser(description='Parse Selig-formatted airfoil specs')
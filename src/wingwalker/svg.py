@@ -2,8 +2,15 @@
 Functions to manipulate SVG files.
 """
 
+import os
 import xml.etree.ElementTree as ET
 import argparse
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
 from wingwalker.output_templates import svg_template
 import wingwalker.utils as utils
 
@@ -44,8 +51,122 @@ def from_svg_template(width: float, height: float, units: str, str_tpl: str = sv
     return ET.fromstring(xml_str)
 
 
+def coordinate_array(xs, ys, offset=(0.0, 0.0)) -> np.ndarray:
+    """
+    Stack x and y coordinates into an Nx2 float array, shifted by the offset
+    Args:
+        xs (list): A list (or array) of x coordinates
+        ys (list): A list (or array) of y coordinates
+        offset (list): x- and y-offset from [0,0]
+    Returns:
+        Nx2 float64 array of offset coordinates
+    """
+    xy = np.column_stack((np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)))
+    xy += np.asarray(offset[:2], dtype=np.float64)
+    return xy
+
+
+def format_coords(xy: np.ndarray, precision: int | None = 6, sep: str = ' ') -> str:
+    """
+    Format coordinate pairs as "x,y" strings in a single batched pass.
+    Args:
+        xy (np.ndarray): Nx2 array of coordinates
+        precision (int): Number of decimal places; None gives the shortest round-trip form of each value
+        sep (str): Separator placed between the pairs
+    Returns:
+        The formatted pairs, joined by sep
+    """
+    if len(xy) == 0:
+        return ''
+    pair = '%r,%r' if precision is None else f'%.{precision}f,%.{precision}f'
+    return sep.join([pair] * len(xy)) % tuple(np.asarray(xy, dtype=np.float64).ravel().tolist())
+
+
+def iter_path_data(xy: np.ndarray, precision: int | None = 6, relative: bool = False, close_loop: bool = False,
+                   chunk_points: int = 4096) -> Iterator[str]:
+    """
+    Build an SVG path "d" value in pieces of at most chunk_points points (see path_data), so very long paths can
+    be written out without holding the whole string.
+    Args:
+        xy (np.ndarray): Nx2 array of coordinates
+        precision (int): Number of decimal places
+        relative (bool): Use relative (m/l) commands
+        close_loop (bool): Draw a final line back to the first point
+        chunk_points (int): Number of points formatted per piece
+    Returns:
+        Iterator of strings that join up to the path definition
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    if len(xy) == 0:
+        return
+    if close_loop:
+        xy = np.vstack((xy, xy[:1]))
+    if relative:
+        if precision is not None:
+            xy = np.round(xy, precision)
+        yield 'm ' + format_coords(xy[:1], precision)
+        rest, command, sep = np.diff(xy, axis=0), ' l ', ' '
+    else:
+        yield 'M ' + format_coords(xy[:1], precision)
+        rest, command, sep = xy[1:], ' L ', ' L '
+    chunk_points = max(int(chunk_points), 1)
+    for start in range(0, len(rest), chunk_points):
+        yield (command if start == 0 else sep) + format_coords(rest[start:start + chunk_points], precision, sep)
+
+
+def path_data(xy: np.ndarray, precision: int | None = 6, relative: bool = False, close_loop: bool = False) -> str:
+    """
+    Build an SVG path "d" value that moves to the first point and draws lines through the rest.
+    Args:
+        xy (np.ndarray): Nx2 array of coordinates
+        precision (int): Number of decimal places
+        relative (bool): Use relative (m/l) commands; the offsets are taken between rounded points, so rounding
+            errors do not accumulate along the path
+        close_loop (bool): Draw a final line back to the first point
+    Returns:
+        The path definition
+    """
+    return ''.join(iter_path_data(xy, precision, relative, close_loop))
+
+
+def fill_indices(count: int, factor: int = 7) -> np.ndarray:
+    """
+    Point indices of the zig-zag fill line, alternating between the end and the start of the trace
+    Args:
+        count (int): number of points in the trace
+        factor (int): step between the points of the zig-zag
+    Returns:
+        1D int array of point indices, after the starting point
+    """
+    x_len = count - factor
+    starts = np.arange(0, max(x_len - 2 * factor, 0), factor)
+    next_i = starts + factor
+    end_i = x_len - next_i
+    return np.column_stack((end_i, next_i)).ravel()
+
+
+def _add_path(svg_root: ET.Element, path_id: str, path_def: str, l_width: float) -> ET.Element:
+    path = ET.SubElement(svg_root, 'path', {})
+    path.set('id', path_id)
+    path.set('d', path_def)
+    path.set('fill', 'none')
+    path.set('stroke', 'black')
+    path.set('stroke-width', str(l_width))
+    return path
+
+
+def _add_polygon(svg_root: ET.Element, points: str, l_width: float) -> ET.Element:
+    poly = ET.SubElement(svg_root, 'polygon', {})
+    poly.set('points', points)
+    poly.set('fill', 'none')
+    poly.set('stroke', 'black')
+    poly.set('stroke-width', str(l_width))
+    return poly
+
+
 def trace_airfoil_path(svg_root: ET.Element, xs: list[float], ys: list[float],
-                       offset: list[float], l_width: float = 0.5):
+                       offset: list[float], l_width: float = 0.5, precision: int | None = 6,
+                       relative: bool = False):
     """
     Trace out the airfoil outline as a path, looping around and back to the starting point.
 
@@ -57,50 +178,70 @@ def trace_airfoil_path(svg_root: ET.Element, xs: list[float], ys: list[float],
         ys (list): A list of y coordinates
         offset (list): x- and y-offset from [0,0] to align the trace
         l_width (float): width of the path line. Default is 1.0
+        precision (int): number of decimal places in the path. Default is 6
+        relative (bool): use relative path commands. Default is False
     """
-    path_def = ""
-    path_def += "M %f,%f" % (xs[0] + offset[X], ys[0] + offset[Y])
-    for i in range(1, len(xs)):
-        path_def += " L %f,%f" % (xs[i] + offset[X], ys[i] + offset[Y])
-    path_def += " L %f,%f" % (xs[0] + offset[X], ys[0] + offset[Y])
-    path = ET.SubElement(svg_root, 'path', {})
-    path.set('id', 'airfoil_trace')
-    path.set('d', path_def)
-    path.set('fill', 'none')
-    path.set('stroke', 'black')
-    path.set('stroke-width', str(l_width))
+    _add_path(svg_root, 'airfoil_trace', airfoil_path_data(coordinate_array(xs, ys, offset), precision, relative),
+              l_width)
     return svg_root
 
 
+def airfoil_path_data(xy: np.ndarray, precision: int | None = 6, relative: bool = False) -> str:
+    """
+    Path definition for the closed airfoil outline (see trace_airfoil_path)
+    Args:
+        xy (np.ndarray): Nx2 array of offset coordinates
+        precision (int): number of decimal places
+        relative (bool): use relative path commands
+    Returns:
+        The path definition
+    """
+    return path_data(xy, precision, relative, close_loop=True)
+
+
+def fill_path_data(xy: np.ndarray, factor: int = 7, precision: int | None = 6, relative: bool = False) -> str:
+    """
+    Path definition for the fill of the airfoil (see trace_fill_path)
+    Args:
+        xy (np.ndarray): Nx2 array of offset coordinates
+        factor (int): step between the points of the zig-zag
+        precision (int): number of decimal places
+        relative (bool): use relative path commands
+    Returns:
+        The path definition
+    """
+    zig_zag = np.vstack((xy[:1], xy[fill_indices(len(xy), factor)]))
+    # Trace the chord, through the midpoints of opposite points of the trace
+    x_mid = int(len(xy) / 2)
+    chord = np.vstack((xy[:1], (xy[:x_mid] + xy[::-1][:x_mid]) / 2.0))
+    chord_def = path_data(chord, precision, relative)
+    if relative:
+        # Only the first moveto of a path is absolute when written as 'm'; start the chord with an absolute 'M'
+        chord_def = 'M' + chord_def[1:]
+    return path_data(zig_zag, precision, relative) + ' ' + chord_def
+
+
 def trace_fill_path(svg_root: ET.Element, xs: list[float], ys: list[float], offset: list[float],
-                    l_width: float = 0.5, factor: int = 7):
-    path_def = ""
-    path_def += "M %f,%f" % (xs[0] + offset[X], ys[0] + offset[Y])
-    i = 0
-    x_len: int = len(xs) - factor
-    x_mid: int = int(len(xs) / 2)
-    while i < (x_len - (2.0 * factor)):
-        l_offset = int(i + factor)
-        end_i = x_len - l_offset
-        path_def += " L %f,%f" % (xs[end_i] + offset[X], ys[end_i] + offset[Y])
-        next_i = i + factor
-        path_def += " L %f,%f" % (xs[next_i] + offset[X], ys[next_i] + offset[Y])
-        i = next_i
-    # Trace the chord
-    path_def += " M %f,%f" % (xs[0] + offset[X], ys[0] + offset[Y])
-    x_len = len(xs) - 1
-    for i in range(0,x_mid):
-        path_def += " L %f,%f" % ((xs[i] + xs[x_len - i])/2.0 + offset[X], (ys[i] + ys[x_len - i])/2.0 + offset[Y])
-    path = ET.SubElement(svg_root, 'path', {})
-    path.set('id', 'airfoil_fill')
-    path.set('d', path_def)
-    path.set('fill', 'none')
-    path.set('stroke', 'black')
-    path.set('stroke-width', str(l_width))
+                    l_width: float = 0.5, factor: int = 7, precision: int | None = 6, relative: bool = False):
+    """
+    Draw a zig-zag fill line across the airfoil, followed by its chord line
+    Args:
+        svg_root (ElementTree.Element): The SVG tree containing the drawing
+        xs (list): A list of x coordinates
+        ys (list): A list of y coordinates
+        offset (list): x- and y-offset from [0,0] to align the trace
+        l_width (float): width of the path line
+        factor (int): step between the points of the zig-zag
+        precision (int): number of decimal places in the path
+        relative (bool): use relative path commands
+    """
+    _add_path(svg_root, 'airfoil_fill', fill_path_data(coordinate_array(xs, ys, offset), factor, precision, relative),
+              l_width)
     return svg_root
 
 
-def draw_airfoil_poly(svg_root: ET.Element, xs, ys, offset, l_width: float = 0.5) -> ET.Element:
+def draw_airfoil_poly(svg_root: ET.Element, xs, ys, offset, l_width: float = 0.5,
+                      precision: int | None = None) -> ET.Element:
     """
     Creates the airfoil as a polygon with the given coordinates
     Args:
@@ -109,15 +250,91 @@ def draw_airfoil_poly(svg_root: ET.Element, xs, ys, offset, l_width: float = 0.5
         offset (list): x- and y-offset from [0,0] to align the polygon line
         l_width (float): width of the polygon line
         svg_root (ET.Element): SVG root element
+        precision (int): number of decimal places; None (default) writes each value in full
     """
-    poly = ET.SubElement(svg_root, 'polygon', {})
-    poly.set('points', ' '.join([f'{x + offset[X]},{y + offset[Y]}' for x, y in zip(xs, ys)]))
-    poly.set('fill', 'none')
-    poly.set('stroke', 'black')
-    poly.set('stroke-width', str(l_width))
+    _add_polygon(svg_root, format_coords(coordinate_array(xs, ys, offset), precision), l_width)
     return svg_root
 
 
+class SvgStream:
+    """
+    Streaming SVG emitter.  The template header is written when the stream is opened, and each path or polygon is
+    written to the output as soon as it is added, so no element tree is built and large multi-path documents are
+    never held in memory.  The output holds the same elements as the ElementTree functions above, inside the same
+    svg_template.
+
+    Use as a context manager, or call close() to write the closing tag.
+    """
+    def __init__(self, target: str | os.PathLike | BinaryIO, width: float, height: float, units: str,
+                 str_tpl: str = svg_template):
+        """
+        Instantiates a new SvgStream, writing the template header
+        Args:
+            target (str): File name to write, or a binary file handle / byte buffer (left open on close)
+            width (float): The width of the SVG image
+            height (float): The height of the SVG image
+            units (str): The units of the SVG image
+            str_tpl (str): The template string.  Optional, if not provided, the default svg template will be used.
+        """
+        document = substitute_placeholders(width, height, units, str_tpl)
+        close_at = document.rindex('</svg>')
+        self._footer = document[close_at:]
+        self._owns_file = isinstance(target, (str, os.PathLike))
+        self._fout: BinaryIO = open(target, 'wb') if self._owns_file else target
+        self.closed = False
+        self._write(document[:close_at])
+
+    def _write(self, text: str):
+        self._fout.write(text.encode('utf-8'))
+
+    def _element(self, tag: str, data_attr: str, data: str | Iterable[str], attrs: dict[str, str]):
+        self._write(f'<{tag}')
+        for name, value in attrs.items():
+            if name != data_attr and value is not None:
+                self._write(f' {name}={quoteattr(str(value))}')
+        self._write(f' {data_attr}="')
+        for piece in ([data] if isinstance(data, str) else data):
+            self._write(escape(piece, {'"': '&quot;'}))
+        self._write('" />\n')
+
+    def path(self, path_def: str | Iterable[str], path_id: str | None = None, l_width: float = 0.5):
+        """
+        Write a path element
+        Args:
+            path_def (str): path definition, or an iterable of pieces of it (e.g. from iter_path_data)
+            path_id (str): id of the element; optional
+            l_width (float): width of the path line
+        """
+        self._element('path', 'd', path_def,
+                      {'id': path_id, 'fill': 'none', 'stroke': 'black', 'stroke-width': l_width})
+
+    def polygon(self, points: str | Iterable[str], l_width: float = 0.5):
+        """
+        Write a polygon element
+        Args:
+            points (str): polygon points (e.g. from format_coords), or an iterable of pieces of them
+            l_width (float): width of the polygon line
+        """
+        self._element('polygon', 'points', points, {'fill': 'none', 'stroke': 'black', 'stroke-width': l_width})
+
+    def close(self):
+        """
+        Write the closing tag; closes the file if this stream opened it
+        """
+        if self.closed:
+            return
+        self._write(self._footer)
+        self.closed = True
+        if self._owns_file:
+            self._fout.close()
+
+    def __enter__(self) -> 'SvgStream':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
 def main(infile: str, outbase: str, c_len, units: str='mm', lednicer=False, trace=True, fill=False, poly=False, mirror=False) -> None:
     """
     Main function for generating SVG file from airfoil specifications and requirements.
@@ -132,11 +349,9 @@ def main(infile: str, outbase: str, c_len, units: str='mm', lednicer=False, trac
         poly: create a poly SVG
         mirror: create a mirror for any of the outputs requested
     """
-    x = []
-    y = []
     with open(infile, 'rb') as f:
         dat_format = 'lednicer' if lednicer else 'selig'
-        spec_name = utils.parse_specs(f, x, y, c_len, dat_format)
+        x, y, spec_name = utils.parse_specs_array(f, c_len, dat_format)
         print('Airfoil:  %s' % spec_name)
         print('\tFormat:  %s' % dat_format)
         print('\tChord length:  %f %s' % (c_len, units))
@@ -157,15 +372,15 @@ def main(infile: str, outbase: str, c_len, units: str='mm', lednicer=False, trac
 
 
 class SvgWriter:
-
-    x_coords: list[float] = []
-    y_coords: list[float] = []
-    c_len: float = 128.0
-    units: str = 'mm'
     """
-    Utility class to generate required sets of SVG files from specifications that have been read in
+    Utility class to generate required sets of SVG files from specifications that have been read in.
+
+    The offset coordinates are computed once, as an array; the mirror images reuse them with the y values
+    reflected about the centre line of the drawing.  Files are written with SvgStream, without building an
+    element tree.
     """
-    def __init__(self, xs: [float], ys: [float], clen: float = 128.0, unitval: str = "mm"):
+    def __init__(self, xs: [float], ys: [float], clen: float = 128.0, unitval: str = "mm",
+                 precision: int | None = 6, relative: bool = False):
         """
         Instantiates a new SvgWriter instance
         Args:
@@ -173,51 +388,69 @@ class SvgWriter:
             ys (list): A list of y coordinates
             clen (float): Length of the chord; default is 128
             unitval (str): The units of the SVG image; default is 'mm'
+            precision (int): Number of decimal places in the paths; default is 6
+            relative (bool): Use relative path commands; default is False
         """
         super().__init__()
         self.x_coords = xs
         self.y_coords = ys
         self.c_len = clen
         self.units = unitval
+        self.precision = precision
+        self.relative = relative
+
+    @property
+    def dimension(self) -> float:
+        """
+        Width and height of the (square) drawing: the chord plus a margin of a tenth of the chord on each side
+        """
+        return self.c_len + (2.0 * self.c_len / 10.0)
+
+    @property
+    def offset(self) -> list[float]:
+        """
+        Offset from [0,0] to the leading edge of the trace
+        """
+        return [self.c_len / 10.0, self.dimension / 2.0]
+
+    def offset_coords(self, mirror: bool = False) -> np.ndarray:
+        """
+        Coordinates shifted into the drawing
+        Args:
+            mirror (bool): reflect the y values about the centre line of the drawing
+        Returns:
+            Nx2 float array
+        """
+        xy = coordinate_array(self.x_coords, self.y_coords, self.offset)
+        if mirror:
+            # Flipping y about 0 before the offset is the same as reflecting about the offset line
+            xy[:, Y] = 2.0 * self.offset[Y] - xy[:, Y]
+        return xy
+
+    def _write_trace(self, target: str | BinaryIO, xy: np.ndarray, filled: bool, l_width: float):
+        dim = self.dimension
+        with SvgStream(target, dim, dim, self.units) as svg_out:
+            svg_out.path(iter_path_data(xy, self.precision, self.relative, close_loop=True), 'airfoil_trace',
+                         l_width)
+            if filled:
+                svg_out.path(fill_path_data(xy, precision=self.precision, relative=self.relative), 'airfoil_fill',
+                             l_width)
+
+    def _write_poly(self, target: str | BinaryIO, xy: np.ndarray, l_width: float):
+        dim = self.dimension
+        with SvgStream(target, dim, dim, self.units) as svg_out:
+            svg_out.polygon(format_coords(xy, None), l_width)
 
     def generate_trace(self, base_name: str = 'airfoil', mirror: bool = False, filled: bool = False, l_width: float = 0.5):
-        xoff: float = self.c_len/10.0
-        dim: float = self.c_len + (2.0 * xoff)
-        t_offset: list[float] = [xoff, dim/2.0]
-        trace_file = base_name + '.svg'
-        svg_trace = from_svg_template(dim, dim, self.units)
-        trace_airfoil_path(svg_trace, self.x_coords, self.y_coords, t_offset, l_width)
-        if filled:
-            trace_fill_path(svg_trace, self.x_coords, self.y_coords, t_offset, l_width)
-        trace_tree = ET.ElementTree(svg_trace)
-        trace_tree.write(trace_file, xml_declaration=True, encoding='utf-8')
+        self._write_trace(base_name + '.svg', self.offset_coords(), filled, l_width)
         if mirror:
             # Create mirror image using flipped y-coords
-            flip_y = [j * -1.0 for j in self.y_coords]
-            mirror_file = base_name + '_mirror.svg'
-            mirror_trace = from_svg_template(dim, dim, self.units)
-            trace_airfoil_path(mirror_trace, self.x_coords, flip_y, t_offset, l_width)
-            if filled:
-                trace_fill_path(mirror_trace, self.x_coords, flip_y, t_offset, l_width)
-            mirror_tree = ET.ElementTree(mirror_trace)
-            mirror_tree.write(mirror_file, xml_declaration=True, encoding='utf-8')
+            self._write_trace(base_name + '_mirror.svg', self.offset_coords(mirror=True), filled, l_width)
 
     def generate_poly(self, base_name: str = 'airfoil', mirror: bool = False, l_width: float = 0.5):
-        xoff: float = self.c_len/10.0
-        dim: float = self.c_len + (2.0 * xoff)
-        t_offset: list[float] = [xoff, dim/2.0]
-        svg_root = from_svg_template(dim, dim, self.units)
-        draw_airfoil_poly(svg_root, self.x_coords, self.y_coords, t_offset, 0.5)
-        tree = ET.ElementTree(svg_root)
-        poly_file = base_name + '.svg'
-        tree.write(poly_file, xml_declaration=True, encoding='utf-8')
+        self._write_poly(base_name + '.svg', self.offset_coords(), 0.5)
         if mirror:
-            flip_y = [j * -1.0 for j in self.y_coords]
-            mirror_root = from_svg_template(dim, dim, self.units)
-            draw_airfoil_poly(mirror_root, self.x_coords, flip_y, t_offset, 0.5)
-            mirror_file = base_name + '_mirror.svg'
-            mirror_tree = ET.ElementTree(mirror_root)
-            mirror_tree.write(mirror_file, xml_declaration=True, encoding='utf-8')
+            self._write_poly(base_name + '_mirror.svg', self.offset_coords(mirror=True), 0.5)
 
 if __name__ == '__main__':
     arg_parser = argparse.ArgumentParser(description='Parse airfoil spec and generate SVG files')
@@ -2,6 +2,10 @@
  Useful general functions for wingwalker
 """
 
+import warnings
+
+import numpy as np
+
 import wingwalker.selig as selig
 import wingwalker.lednicer as lednicer
 
@@ -24,6 +28,27 @@ def convert_int(inpt) -> (int, int):
     return int(floats[0]), int(floats[1])
 
 
+def parse_coord_block(block: str) -> np.ndarray | None:
+    """
+    Convert a block of coordinate lines ("x y" pairs separated by whitespace) into an Nx2 float array in one call
+    Args:
+        block (str): text holding only coordinate pairs (blank lines are allowed)
+    Returns:
+        Nx2 float64 array, or None if the block holds anything other than one pair of numbers per line
+    """
+    try:
+        with warnings.catch_warnings():
+            # Older numpy versions warn, rather than raise, on unparsable text
+            warnings.simplefilter('error', DeprecationWarning)
+            values = np.fromstring(block, dtype=np.float64, sep=' ')
+    except (ValueError, DeprecationWarning):
+        return None
+    # Every non-blank line must hold exactly one pair; otherwise extra columns would be paired across lines
+    if values.size != 2 * sum(1 for line in block.splitlines() if line.strip()):
+        return None
+    return values.reshape(-1, 2)
+
+
 def parse_specs(stream, xs, ys, c_len, dat_format: str = "selig") -> str:
     """
     Parses a given airfoil spec file, reads out and converts the shape coordinates, and attempts to return the read name
@@ -47,3 +72,25 @@ def parse_specs(stream, xs, ys, c_len, dat_format: str = "selig") -> str:
         case _:
             raise Exception("Unknown file format: " + dat_format)
     return spec_name
+
+
+
+def parse_specs_array(stream, c_len: float = 1.0, dat_format: str = "selig") -> (np.ndarray, np.ndarray, str):
+    """
+    Fast path of parse_specs, returning the shape coordinates as float arrays
+    Args:
+        stream (IO): I/O stream of file
+        c_len (float): chord length in required units
+        dat_format (str): data format.  If not supplied, defaults to 'selig'
+    Returns:
+        The x-coordinate array, y-coordinate array and the name of the airfoil from the spec file, if found
+    Raises:
+        Exception: If the spec format is unrecognized
+    """
+    match dat_format:
+        case "selig":
+            return selig.parse_selig_array(stream, c_len)
+        case "lednicer":
+            return lednicer.parse_lednicer_array(stream, c_len)
+        case _:
+            raise Exception("Unknown file format: " + dat_format)
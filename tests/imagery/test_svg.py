@@ -1,7 +1,15 @@
+import xml.etree.ElementTree as ET
+from io import BytesIO
+
+import numpy as np
 import wingwalker as ww
 import pytest
 import os
 from tests.setup.config_dirs import dir_setup
+from tests.utilities import get_standard_elliptical
+from wingwalker.generators.ribs import nest_ribs, write_rib_sheets
+from wingwalker.models.enums import WingType
+from wingwalker.processing.nesting import pack_rectangles
 
 def verify_exists(svg_path):
     assert os.path.exists(svg_path), f"{svg_path} does not exist"
@@ -134,3 +142,214 @@ def test_lednicer_svg(
         verify_exists(f"{lednicer_base}_poly.svg")
         if do_mirror:
             verify_exists(f"{lednicer_base}_poly_mirror.svg")
+
+
+def legacy_trace_path(xs, ys, offset):
+    path_def = "M %f,%f" % (xs[0] + offset[0], ys[0] + offset[1])
+    for i in range(1, len(xs)):
+        path_def += " L %f,%f" % (xs[i] + offset[0], ys[i] + offset[1])
+    path_def += " L %f,%f" % (xs[0] + offset[0], ys[0] + offset[1])
+    return path_def
+
+
+def legacy_fill_path(xs, ys, offset, factor=7):
+    path_def = "M %f,%f" % (xs[0] + offset[0], ys[0] + offset[1])
+    i = 0
+    x_len = len(xs) - factor
+    x_mid = int(len(xs) / 2)
+    while i < (x_len - (2.0 * factor)):
+        end_i = x_len - int(i + factor)
+        path_def += " L %f,%f" % (xs[end_i] + offset[0], ys[end_i] + offset[1])
+        i = i + factor
+        path_def += " L %f,%f" % (xs[i] + offset[0], ys[i] + offset[1])
+    path_def += " M %f,%f" % (xs[0] + offset[0], ys[0] + offset[1])
+    x_len = len(xs) - 1
+    for i in range(0, x_mid):
+        path_def += " L %f,%f" % ((xs[i] + xs[x_len - i]) / 2.0 + offset[0], (ys[i] + ys[x_len - i]) / 2.0 + offset[1])
+    return path_def
+
+
+@pytest.mark.svg
+@pytest.mark.parametrize('spec_file,spec_format', [
+    ('data/selig_supercritical_nasa-sc2-1010.dat', 'selig'),
+    ('data/lednicer_symmetrical_n0011sc-il.dat', 'lednicer'),
+])
+def test_svg_path_formatting(spec_file: str, spec_format: str):
+    """
+    Batched path formatting matches the point-by-point output, and relative paths land on the same points
+    """
+    with open(spec_file, 'rb') as f:
+        xs, ys, _ = ww.utils.parse_specs_array(f, 256.0, spec_format)
+    xs, ys = xs.tolist(), ys.tolist()
+    offset = [25.6, 153.6]
+    root = ww.from_svg_template(307.2, 307.2, 'mm')
+    ww.trace_airfoil_path(root, xs, ys, offset)
+    ww.svg.trace_fill_path(root, xs, ys, offset)
+    ww.draw_airfoil_poly(root, xs, ys, offset)
+    paths = {p.get('id'): p.get('d') for p in root if p.tag.endswith('path')}
+    assert paths['airfoil_trace'] == legacy_trace_path(xs, ys, offset)
+    # The chord midpoints are averaged after the offset, so allow for the last printed digit
+    fill_tokens = paths['airfoil_fill'].split(' ')
+    legacy_tokens = legacy_fill_path(xs, ys, offset).split(' ')
+    assert [t for t in fill_tokens if t in 'ML'] == [t for t in legacy_tokens if t in 'ML']
+    fill_values = [float(v) for t in fill_tokens if t not in 'ML' for v in t.split(',')]
+    legacy_values = [float(v) for t in legacy_tokens if t not in 'ML' for v in t.split(',')]
+    assert np.allclose(fill_values, legacy_values, rtol=0.0, atol=2e-6)
+    poly = [p for p in root if p.tag.endswith('polygon')][0]
+    assert poly.get('points') == ' '.join(f'{x + offset[0]},{y + offset[1]}' for x, y in zip(xs, ys))
+
+    xy = ww.svg.coordinate_array(xs, ys, offset)
+    short = ww.svg.path_data(xy, precision=2, close_loop=True)
+    assert short.split(' L ')[1] == '%.2f,%.2f' % (xs[1] + offset[0], ys[1] + offset[1])
+
+    relative = ww.svg.path_data(xy, precision=3, relative=True, close_loop=True)
+    assert relative.startswith('m ') and ' l ' in relative
+    start, deltas = relative[2:].split(' l ')
+    points = [tuple(float(v) for v in start.split(','))]
+    for delta in deltas.split(' '):
+        dx, dy = (float(v) for v in delta.split(','))
+        points.append((points[-1][0] + dx, points[-1][1] + dy))
+    assert len(points) == len(xs) + 1
+    assert np.allclose(points[:-1], xy, atol=2e-3), 'Relative path drifts from the absolute points'
+    assert np.allclose(points[-1], points[0], atol=2e-3), 'Relative path does not close'
+
+
+
+def resolve_path(path_def: str)->list[list[tuple[float, float]]]:
+    """
+    Absolute points of each subpath of an M/m/L/l path, following the SVG rules: every lowercase command,
+    including a later 'm', is relative to the current point
+    """
+    subpaths, current, command = [], (0.0, 0.0), 'M'
+    for token in path_def.split():
+        if token in ('M', 'm', 'L', 'l'):
+            command = token
+            continue
+        x, y = (float(v) for v in token.split(','))
+        if command.islower():
+            x, y = current[0] + x, current[1] + y
+        current = (x, y)
+        if command in ('M', 'm'):
+            subpaths.append([current])
+            # Coordinates following a moveto are implicit linetos
+            command = 'l' if command == 'm' else 'L'
+        else:
+            subpaths[-1].append(current)
+    return subpaths
+
+
+@pytest.mark.svg
+def test_svg_relative_fill():
+    """
+    The relative fill path lands on the same points as the absolute one, in both subpaths
+    """
+    with open('data/selig_supercritical_nasa-sc2-1010.dat', 'rb') as f:
+        xs, ys, _ = ww.utils.parse_specs_array(f, 256.0, 'selig')
+    xy = ww.svg.coordinate_array(xs, ys, [25.6, 153.6])
+    absolute = resolve_path(ww.svg.fill_path_data(xy, precision=3))
+    relative = resolve_path(ww.svg.fill_path_data(xy, precision=3, relative=True))
+    assert len(absolute) == len(relative) == 2
+    for abs_points, rel_points in zip(absolute, relative):
+        assert np.allclose(rel_points, abs_points, atol=2e-3), 'Relative fill drifts from the absolute points'
+
+
+@pytest.mark.svg
+def test_svg_writer_mirror(tmp_path):
+    """
+    Mirror images are the y-reflection of the trace about the centre line of the drawing
+    """
+    with open('data/selig_naca2412.dat', 'rb') as f:
+        xs, ys, _ = ww.utils.parse_specs_array(f, 128.0, 'selig')
+    writer = ww.svg.SvgWriter(xs, ys, 128.0, 'mm')
+    writer.generate_trace(str(tmp_path / 'naca'), mirror=True, filled=True)
+    flipped = ww.from_svg_template(writer.dimension, writer.dimension, 'mm')
+    ww.trace_airfoil_path(flipped, xs, -ys, writer.offset)
+    with open(tmp_path / 'naca_mirror.svg', 'r', encoding='utf-8') as fin:
+        mirror_svg = fin.read()
+    assert flipped[0].get('d') in mirror_svg
+
+
+@pytest.mark.svg
+@pytest.mark.parametrize('relative', [True, False])
+def test_svg_stream(tmp_path, relative: bool):
+    """
+    The streaming writer produces the same document as the ElementTree functions, to a file or a byte buffer
+    """
+    with open('data/lednicer_supercritical_nasa-sc2-1010.dat', 'rb') as f:
+        xs, ys, _ = ww.utils.parse_specs_array(f, 256.0, 'lednicer')
+    offset = [25.6, 153.6]
+    expected = ww.from_svg_template(307.2, 307.2, 'mm')
+    ww.trace_airfoil_path(expected, xs, ys, offset, 1.0, relative=relative)
+    ww.svg.trace_fill_path(expected, xs, ys, offset, 1.0, relative=relative)
+    ww.draw_airfoil_poly(expected, xs, ys, offset)
+
+    xy = ww.svg.coordinate_array(xs, ys, offset)
+    buffer = BytesIO()
+    with ww.svg.SvgStream(buffer, 307.2, 307.2, 'mm') as svg_out:
+        svg_out.path(ww.svg.iter_path_data(xy, relative=relative, close_loop=True, chunk_points=16),
+                     'airfoil_trace', 1.0)
+        svg_out.path(ww.svg.fill_path_data(xy, relative=relative), 'airfoil_fill', 1.0)
+        svg_out.polygon(ww.svg.format_coords(xy, None))
+    assert buffer.getvalue().startswith(b'<?xml')
+    streamed = ET.fromstring(buffer.getvalue())
+    assert streamed.tag == expected.tag and streamed.attrib == expected.attrib
+    # Parsed children carry the SVG namespace; those added with ET.SubElement are bare
+    def local_name(tag: str)->str:
+        return tag.rsplit('}', 1)[-1]
+    assert [(local_name(e.tag), e.attrib) for e in streamed] == [(local_name(e.tag), e.attrib) for e in expected]
+
+    # SvgWriter streams to disk; the files parse to the same elements
+    writer = ww.svg.SvgWriter(xs / 256.0 * 128.0, ys / 256.0 * 128.0, 128.0, 'mm', relative=relative)
+    writer.generate_trace(str(tmp_path / 'stream'), mirror=True, filled=True, l_width=0.75)
+    written = ET.parse(tmp_path / 'stream_mirror.svg').getroot()
+    assert [e.get('id') for e in written] == ['airfoil_trace', 'airfoil_fill']
+    assert written.get('width') == f'{writer.dimension}mm'
+
+
+@pytest.mark.svg
+def test_pack_rectangles():
+    """
+    Packed parts stay on their sheets and never overlap
+    """
+    rng = np.random.default_rng(7)
+    sizes = np.column_stack((rng.uniform(10.0, 120.0, 3000), rng.uniform(2.0, 30.0, 3000)))
+    sizes[::5] = sizes[::5, ::-1]
+    result = pack_rectangles(sizes, 300.0, 200.0, spacing=1.0)
+    assert len(result.placements) == len(sizes)
+    assert 0.0 < result.utilization <= 1.0
+    assert np.isclose(result.sheet_utilization.sum() / result.sheet_count, result.utilization)
+    for sheet in range(result.sheet_count):
+        boxes = np.array([(p.x, p.y, p.x + p.width, p.y + p.height) for p in result.sheet_placements(sheet)])
+        assert boxes[:, :2].min() >= 1.0 - 1e-9 and boxes[:, 2].max() <= 299.0 + 1e-9 and boxes[:, 3].max() <= 199.0 + 1e-9
+        overlap_x = (boxes[:, None, 0] < boxes[None, :, 2]) & (boxes[None, :, 0] < boxes[:, None, 2])
+        overlap_y = (boxes[:, None, 1] < boxes[None, :, 3]) & (boxes[None, :, 1] < boxes[:, None, 3])
+        overlaps = overlap_x & overlap_y
+        np.fill_diagonal(overlaps, False)
+        assert not overlaps.any(), f'Parts overlap on sheet {sheet}'
+    for p in result.placements:
+        expected = sizes[p.index][::-1] if p.rotated else sizes[p.index]
+        assert np.allclose((p.width, p.height), expected)
+
+    with pytest.raises(ValueError):
+        pack_rectangles([(400.0, 250.0)], 300.0, 200.0)
+
+
+@pytest.mark.svg
+def test_rib_sheets(tmp_path):
+    """
+    Every rib of a wing lands on a sheet, at its untwisted size
+    """
+    model = get_standard_elliptical(WingType.LEFT)
+    layout = nest_ribs(model, 300.0, 200.0, spacing=2.0)
+    assert len(layout.sections) < model.section_count, 'Collapsed tip sections should be left out'
+    assert np.allclose(layout.outlines[0].max(axis=0)[0], model.chords[0]), 'Root rib is not untwisted'
+    for rib in range(len(layout.sections)):
+        placed = layout.placed_outline(rib)
+        p = layout.packing.placements[rib]
+        assert placed[:, 0].min() >= p.x - 1e-9 and placed[:, 0].max() <= p.x + p.width + 1e-9
+        assert placed[:, 1].min() >= p.y - 1e-9 and placed[:, 1].max() <= p.y + p.height + 1e-9
+
+    files = write_rib_sheets(layout, str(tmp_path / 'ribs' / 'elliptical'))
+    assert len(files) == layout.sheet_count
+    ids = [e.get('id') for f in files for e in ET.parse(f).getroot()]
+    assert sorted(ids) == sorted(f'rib_{s:04d}' for s in layout.sections)
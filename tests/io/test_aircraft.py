@@ -0,0 +1,123 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from tests.utilities import call_gen_wing
+from wingwalker.generators import aircraft
+from wingwalker.generators.aircraft import AircraftManifest, BuildTask, build_aircraft, plan_build, run_tasks
+from wingwalker.io import spec_cache
+from wingwalker.io.build_cache import BuildCache
+from wingwalker.io.spec_cache import SpecCache
+from wingwalker.models.enums import Planform, SpecFormat, WingType
+
+
+def write_manifest(tmp_path)->str:
+    wing = {
+        'name': 'wing',
+        'wing_type': 'WING,LEFT',
+        'planform': 'ellipse',
+        'spec_file': os.path.abspath('data/lednicer_supercritical_nasa-sc2-1010.dat'),
+        'spec_format': 'lednicer',
+        'span': 200.0,
+        'base_chord': 96.0,
+        'end_chord': 0.0,
+        'twist': -0.0349066,
+        'iterations': 16
+    }
+    with open(tmp_path / 'wing.json', 'w', encoding='utf-8') as fout:
+        json.dump(wing, fout)
+    elevator = dict(wing, name='elevator', wing_type='STABILIZER,HORIZONTAL,LEFT', planform='geometric', span=80.0,
+                    base_chord=48.0, end_chord=32.0, twist=0.0)
+    rudder = dict(elevator, name='rudder', wing_type='STABILIZER,VERTICAL',
+                  spec_file=os.path.abspath('data/selig_symmetrical_n0011sc-il.dat'), spec_format='selig')
+    manifest = {
+        'name': 'test_aircraft',
+        'out_dir': 'build',
+        'formats': ['stl'],
+        'parts': [
+            {'request': 'wing.json', 'mirror': True},
+            {'request': elevator, 'mirror': True},
+            {'request': rudder},
+            {'request': dict(rudder, name='broken', planform='undefined')},
+        ]
+    }
+    manifest_file = str(tmp_path / 'aircraft.json')
+    with open(manifest_file, 'w', encoding='utf-8') as fout:
+        json.dump(manifest, fout)
+    return manifest_file
+
+
+@pytest.mark.io
+def test_aircraft_manifest(tmp_path):
+    """
+    Manifests expand into parts and a task graph that parses each spec file once
+    """
+    manifest = AircraftManifest.load(write_manifest(tmp_path))
+    labels = [part.label for part in manifest.parts]
+    assert labels == ['wing_left', 'wing_right', 'elevator_left', 'elevator_right', 'rudder_left', 'broken_left']
+    assert manifest.parts[1].mirror_of == 'wing_left'
+    assert manifest.parts[1].request.mirrored
+    assert manifest.parts[2].request.wing_type == WingType.ELEVATOR | WingType.LEFT
+    assert manifest.parts[0].request.planform is Planform.ELLIPSE
+    assert manifest.parts[4].request.spec_format is SpecFormat.SELIG
+    assert manifest.out_dir == str(tmp_path / 'build')
+
+    tasks = plan_build(manifest)
+    kinds = [task.kind for task in tasks.values()]
+    assert kinds.count('parse') == 2
+    assert kinds.count('generate') == 6
+    assert tasks['generate:wing_right'].deps == ('generate:wing_left',)
+
+    with pytest.raises(ValueError):
+        run_tasks({'a': BuildTask('a', 'test', None, ('b',), None), 'b': BuildTask('b', 'test', None, ('a',), None)})
+
+
+@pytest.mark.threeD
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_build_aircraft(tmp_path, monkeypatch, max_workers: int):
+    """
+    Every part is built and exported, mirrors match full builds, and a failing part only stops its own tasks
+    """
+    manifest_file = write_manifest(tmp_path)
+    loads = []
+    original_load = spec_cache.load_specs
+    def counting_load(src, spec_format, cache=None):
+        loads.append(src)
+        return original_load(src, spec_format, cache)
+    monkeypatch.setattr(aircraft.spec_cache, 'load_specs', counting_load)
+
+    report = build_aircraft(manifest_file, max_workers, specs=SpecCache())
+    assert len(loads) == 2, 'Spec files were loaded more than once'
+    assert not report.ok
+    assert [r.name for r in report.failed] == ['generate:broken_left']
+    assert report.results['export:broken_left.stl'].status == 'skipped'
+
+    for label in ('wing_left', 'wing_right', 'elevator_left', 'elevator_right', 'rudder_left'):
+        stl_file = report.exports(label)['stl']
+        assert os.path.getsize(stl_file) > 84, f'{label} STL is empty'
+    expected = call_gen_wing(report.model('wing_right').wing_params)
+    assert np.allclose(report.model('wing_right').coords, expected.coords)
+
+    report_file = str(tmp_path / 'report.json')
+    report.write_json(report_file)
+    with open(report_file, 'r', encoding='utf-8') as fin:
+        stored = json.load(fin)
+    assert stored['ok'] is False
+    assert len(stored['parts']) == 6
+    assert stored['parts'][0]['sections'] == report.model('wing_left').section_count
+
+
+@pytest.mark.threeD
+def test_build_aircraft_cache(tmp_path):
+    """
+    A second build with a build cache reuses every model and mesh
+    """
+    manifest = AircraftManifest.load(write_manifest(tmp_path))
+    manifest.parts = [part for part in manifest.parts if not part.label.startswith('broken')]
+    cache = BuildCache(str(tmp_path / 'cache'), specs=SpecCache())
+    assert build_aircraft(manifest, 2, build_cache=cache).ok
+    misses = cache.misses
+    assert build_aircraft(manifest, 2, build_cache=cache).ok
+    assert cache.misses == misses, 'Unchanged parts were rebuilt'
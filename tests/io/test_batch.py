@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pytest
+
+from tests.utilities import call_gen_wing
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.generators.batch import generate_batch, sweep_requests
+from wingwalker.io import spec_cache
+from wingwalker.models.enums import Planform, SpecFormat, WingType
+
+
+def base_request()->WingRequest:
+    wing_req: WingRequest = WingRequest()
+    wing_req.name = 'sweep'
+    wing_req.planform = Planform.GEOMETRIC
+    wing_req.wing_type = WingType.WING | WingType.LEFT
+    wing_req.span = 200.0
+    wing_req.base_chord = 96.0
+    wing_req.end_chord = 48.0
+    wing_req.twist = -0.0349066
+    wing_req.spec_file = 'data/lednicer_supercritical_nasa-sc2-1010.dat'
+    wing_req.spec_format = SpecFormat.LEDNICER
+    wing_req.iterations = 12
+    return wing_req
+
+
+@pytest.mark.threeD
+def test_sweep_requests():
+    """
+    Sweeps expand to the full grid without changing the base request
+    """
+    base = base_request()
+    variants = sweep_requests(base, span=[200.0, 256.0], twist=[0.0, -0.01, -0.02])
+    assert len(variants) == 6
+    assert [(v.span, v.twist) for v in variants[:3]] == [(200.0, 0.0), (200.0, -0.01), (200.0, -0.02)]
+    assert all(v.base_chord == base.base_chord for v in variants)
+    assert base.span == 200.0 and base.twist == -0.0349066, 'Base request was modified'
+    with pytest.raises(AttributeError):
+        sweep_requests(base, wingspan=[1.0])
+
+
+@pytest.mark.threeD
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_generate_batch(tmp_path, monkeypatch, max_workers: int):
+    """
+    Batch results match single builds, each spec is parsed once, and failures stay with their own job
+    """
+    requests = sweep_requests(base_request(), span=[150.0, 200.0], planform=[Planform.GEOMETRIC, Planform.ELLIPSE])
+    requests.append(sweep_requests(base_request(), spec_file=['data/selig_naca2412.dat'],
+                                   spec_format=[SpecFormat.SELIG])[0])
+    missing = sweep_requests(base_request(), spec_file=['data/missing_airfoil.dat'])[0]
+    bad_planform = sweep_requests(base_request(), planform=[Planform.UNDEFINED])[0]
+    requests += [missing, bad_planform]
+
+    loads = []
+    original_load = spec_cache.load_specs
+    def counting_load(src, spec_format, cache=None):
+        loads.append(src)
+        return original_load(src, spec_format, cache)
+    monkeypatch.setattr(spec_cache, 'load_specs', counting_load)
+
+    out_dir = str(tmp_path / 'batch')
+    results = list(generate_batch(requests, max_workers=max_workers, export_formats=['stl'], out_dir=out_dir,
+                                  cache=spec_cache.SpecCache()))
+    assert sorted(loads) == sorted({r.spec_file for r in requests}), 'Spec files were not parsed once each'
+    assert sorted(r.index for r in results) == list(range(len(requests)))
+
+    by_index = {r.index: r for r in results}
+    assert not by_index[len(requests) - 2].ok and 'missing_airfoil' in by_index[len(requests) - 2].error
+    assert not by_index[len(requests) - 1].ok and 'UNDEFINED' in by_index[len(requests) - 1].error
+    for index in range(len(requests) - 2):
+        result = by_index[index]
+        assert result.ok, result.error
+        expected = call_gen_wing(requests[index])
+        assert np.allclose(result.model.coords, expected.coords), f'Job {index} does not match a single build'
+        assert os.path.getsize(result.exports['stl']) > 84, f'Job {index} STL was not written'
+
+
+@pytest.mark.threeD
+def test_generate_batch_options():
+    """
+    Bad export options fail up front, before any job runs
+    """
+    with pytest.raises(ValueError):
+        generate_batch([base_request()], export_formats=['obj'], out_dir='out')
+    with pytest.raises(ValueError):
+        generate_batch([base_request()], export_formats=['stl'])
+
+    results = list(generate_batch([base_request()], max_workers=1, tolerance=0.1, keep_models=False))
+    assert len(results) == 1 and results[0].ok and results[0].model is None
@@ -0,0 +1,104 @@
+import copy
+import os
+
+import numpy as np
+import pytest
+
+from tests.utilities import call_gen_wing
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.io.build_cache import BuildCache
+from wingwalker.io.spec_cache import SpecCache
+from wingwalker.models.enums import Planform, SpecFormat, WingType
+
+
+def aircraft_requests()->list[WingRequest]:
+    wing_req: WingRequest = WingRequest()
+    wing_req.name = 'wing'
+    wing_req.planform = Planform.ELLIPSE
+    wing_req.wing_type = WingType.WING | WingType.LEFT
+    wing_req.span = 200.0
+    wing_req.base_chord = 96.0
+    wing_req.end_chord = 0.0
+    wing_req.twist = -0.0349066
+    wing_req.spec_file = 'data/lednicer_supercritical_nasa-sc2-1010.dat'
+    wing_req.spec_format = SpecFormat.LEDNICER
+    wing_req.iterations = 12
+
+    elevator = copy.deepcopy(wing_req)
+    elevator.name = 'elevator'
+    elevator.planform = Planform.GEOMETRIC
+    elevator.wing_type = WingType.ELEVATOR | WingType.LEFT
+    elevator.span = 80.0
+    elevator.base_chord = 48.0
+    elevator.end_chord = 32.0
+    elevator.spec_file = 'data/lednicer_symmetrical_n0011sc-il.dat'
+    return [wing_req, elevator]
+
+
+@pytest.mark.io
+def test_canonical_key():
+    """
+    Equal requests hash alike, whether the enums are members or plain values (as loaded from JSON)
+    """
+    wing_req = aircraft_requests()[0]
+    stored = WingRequest.from_json(wing_req.to_json())
+    assert stored.planform == 'ellipse' and not isinstance(stored.planform, Planform)
+    assert stored == wing_req
+    assert stored.canonical_key() == wing_req.canonical_key()
+    assert hash(stored) == hash(wing_req)
+    assert len({wing_req, stored}) == 1
+
+    renoted = copy.deepcopy(wing_req)
+    renoted.notes = 'notes are not part of the key'
+    assert renoted.canonical_key() == wing_req.canonical_key()
+    changed = copy.deepcopy(wing_req)
+    changed.span = 201.0
+    assert changed.canonical_key() != wing_req.canonical_key()
+    assert wing_req.canonical_key(spec_file='abc') != wing_req.canonical_key()
+
+
+@pytest.mark.io
+@pytest.mark.disk
+def test_build_cache(tmp_path):
+    """
+    Unchanged requests are served from the cache; editing one request only rebuilds that request
+    """
+    cache = BuildCache(str(tmp_path / 'builds'), specs=SpecCache())
+    requests = aircraft_requests()
+    out_dir = str(tmp_path / 'out')
+
+    for wing_req in requests:
+        cache.export(wing_req, 'stl', os.path.join(out_dir, wing_req.name))
+    assert cache.hits == 0
+    first_misses = cache.misses
+
+    # A second run of the whole aircraft is all hits
+    stl_bytes = open(os.path.join(out_dir, 'wing.stl'), 'rb').read()
+    for wing_req in requests:
+        cache.export(wing_req, 'stl', os.path.join(out_dir, wing_req.name))
+    assert cache.misses == first_misses
+    assert cache.hits == len(requests)
+    assert open(os.path.join(out_dir, 'wing.stl'), 'rb').read() == stl_bytes
+
+    # Cached models match a fresh build
+    expected = call_gen_wing(requests[0])
+    cached = cache.model(requests[0])
+    assert np.array_equal(cached.coords, expected.coords)
+    assert cached.identifier == expected.identifier
+
+    # Editing the elevator only rebuilds the elevator
+    requests[1].twist = 0.0
+    hits, misses = cache.hits, cache.misses
+    for wing_req in requests:
+        cache.export(wing_req, 'stl', os.path.join(out_dir, wing_req.name))
+    assert cache.hits == hits + 1
+    assert cache.misses > misses
+    assert len(os.listdir(cache.cache_dir)) == 3
+
+    # Size-bounded eviction keeps the most recently used entries
+    cache.max_bytes = cache.size() // 2
+    cache.evict()
+    assert cache.size() <= cache.max_bytes
+    assert len(os.listdir(cache.cache_dir)) < 3
+    cache.clear()
+    assert cache.size() == 0
@@ -0,0 +1,130 @@
+import json
+import os
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from wingwalker.io.build_server import BuildService, ServiceBusy, make_server
+from wingwalker.io.spec_cache import SpecCache
+from wingwalker.io.stl import STL_HEADER_SIZE
+from wingwalker.models.enums import SpecFormat
+
+WING_REQUEST = {
+    'name': 'served',
+    'wing_type': 'WING,LEFT',
+    'planform': 'geometric',
+    'spec_file': 'lednicer_supercritical_nasa-sc2-1010.dat',
+    'spec_format': 'lednicer',
+    'span': 120.0,
+    'base_chord': 64.0,
+    'end_chord': 48.0,
+    'twist': 0.0,
+    'iterations': 8
+}
+
+
+@pytest.fixture
+def served(tmp_path):
+    service = BuildService(max_workers=2, max_queue=2, out_dir=str(tmp_path / 'out'), spec_dir='data',
+                           specs=SpecCache())
+    service.preload([('lednicer_supercritical_nasa-sc2-1010.dat', SpecFormat.LEDNICER)])
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield service, f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def post(url: str, body: dict):
+    request = urllib.request.Request(url, data=json.dumps(body).encode('utf-8'), method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    return urllib.request.urlopen(request, timeout=60)
+
+
+@pytest.mark.threeD
+def test_build_server(served):
+    """
+    The service returns STL and SVG artifacts, writes files under its output directory, and rejects bad requests
+    """
+    service, base_url = served
+    with urllib.request.urlopen(f'{base_url}/health', timeout=10) as response:
+        health = json.load(response)
+    assert health['status'] == 'ok' and health['specs_cached'] == 1
+
+    with post(f'{base_url}/build?format=stl', WING_REQUEST) as response:
+        assert response.headers['Content-Type'] == 'model/stl'
+        stl_data = response.read()
+    facet_count = int(np.frombuffer(stl_data[STL_HEADER_SIZE:STL_HEADER_SIZE + 4], dtype='<u4')[0])
+    assert facet_count > 0
+    assert len(stl_data) == STL_HEADER_SIZE + 4 + 50 * facet_count
+
+    with post(f'{base_url}/build?format=svg', WING_REQUEST) as response:
+        svg_data = response.read().decode('utf-8')
+    assert '<svg' in svg_data and 'airfoil_trace' in svg_data
+
+    with post(f'{base_url}/build?format=stl&out=parts/wing', WING_REQUEST) as response:
+        written = json.load(response)
+    assert written['file'].endswith(os.path.join('parts', 'wing.stl'))
+    assert open(written['file'], 'rb').read()[STL_HEADER_SIZE:] == stl_data[STL_HEADER_SIZE:]
+
+    for query, body in [('format=obj', WING_REQUEST), ('out=../escape', WING_REQUEST),
+                        ('format=stl', dict(WING_REQUEST, spec_file='missing.dat')),
+                        ('format=stl', dict(WING_REQUEST, planform='wavy'))]:
+        with pytest.raises(urllib.error.HTTPError) as err:
+            post(f'{base_url}/build?{query}', body)
+        assert err.value.code == 400, query
+    assert service.status()['completed'] == 3
+
+
+@pytest.mark.io
+def test_build_service_queue(tmp_path, monkeypatch):
+    """
+    Requests past the worker and queue limits are turned away
+    """
+    service = BuildService(max_workers=1, max_queue=1, specs=SpecCache())
+    release = threading.Event()
+    monkeypatch.setattr(service, '_write_artifact', lambda *args: release.wait(10))
+    wing_req = service.parse_request(WING_REQUEST)
+    running = service.submit(wing_req, 'svg')
+    waiting = service.submit(wing_req, 'svg')
+    with pytest.raises(ServiceBusy):
+        service.submit(wing_req, 'svg')
+    assert service.status()['queued'] + service.status()['running'] == 2
+    release.set()
+    running.result(10)
+    waiting.result(10)
+    service.submit(wing_req, 'svg').result(10)
+    service.close()
+
+
+@pytest.mark.io
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='Unix sockets are not available')
+def test_build_server_unix_socket(tmp_path):
+    """
+    The service answers over a Unix socket
+    """
+    service = BuildService(specs=SpecCache())
+    socket_path = str(tmp_path / 'build.sock')
+    server = make_server(service, unix_socket=socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(b'GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n')
+            response = b''
+            while chunk := client.recv(65536):
+                response += chunk
+        head, body = response.split(b'\r\n\r\n', 1)
+        assert head.startswith(b'HTTP/1.1 200')
+        assert json.loads(body)['status'] == 'ok'
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
@@ -1,11 +1,20 @@
+import json
+import logging
 import os
+import tracemalloc
 
+import numpy as np
 import pytest
+import pyvista as pv
 
 from tests.utilities import get_standard_elliptical, get_standard_rectangular, get_standard_geometric
-from wingwalker.io.exports import export_stl, export_ply
+from wingwalker.generators.wing import generate_wing_model, mirror_wing
+from wingwalker.instrumentation import JsonTraceSink, LogSink, MemoryProfiler, RecordingSink, instrument, stage
+from wingwalker.io.exports import export_stl, export_ply, export_stl_pair
+from wingwalker.io.stl import write_binary_stl, read_binary_stl, STL_HEADER_SIZE, STL_RECORD_DTYPE
 from wingwalker.models.enums import WingType
 from wingwalker.models.wing_model import WingModel
+from wingwalker.processing.mesh import generate_loft_mesh, mirror_mesh
 
 stl_dir = 'out/io/stl/'
 ply_dir = 'out/io/ply/'
@@ -146,4 +155,154 @@ def test_geometric_wing_ply(wing_side: WingType):
         os.remove(f_name)
 
     export_ply(model, f_name)
-    assert os.path.exists(f_name)
\ No newline at end of file
+    assert os.path.exists(f_name)
+
+
+@pytest.mark.threeD
+@pytest.mark.parametrize('chunk_size', [1, 1000, 65536])
+def test_binary_stl_writer(chunk_size: int):
+    """
+    Write the loft mesh with the native writer and read it back, with several chunk sizes
+    Args:
+        chunk_size: facet records per chunk
+    Returns:
+        None
+    """
+    model: WingModel = get_standard_geometric(WingType.LEFT)
+    vertices, faces = generate_loft_mesh(model)
+
+    f_name = os.path.join(stl_dir, f'geometric_wing_chunked_{chunk_size}.stl')
+    count = write_binary_stl(f_name, vertices, faces, header=model.identifier, chunk_size=chunk_size)
+    assert count == len(faces), 'Facet count does not match the faces written'
+    assert os.path.getsize(f_name) == STL_HEADER_SIZE + 4 + count * STL_RECORD_DTYPE.itemsize
+
+    records = read_binary_stl(f_name)
+    assert np.allclose(records['vertices'], vertices[faces].astype(np.float32)), 'Facet vertices do not match'
+    assert np.allclose(np.linalg.norm(records['normal'], axis=1), 1.0, atol=1e-5), 'Facet normals are not unit length'
+
+    stl_mesh = pv.read(f_name)
+    assert stl_mesh.n_cells == len(faces), 'STL file does not load with the expected facet count'
+
+
+@pytest.mark.threeD
+def test_stl_pair():
+    """
+    The reflected mesh of a pair matches the mesh of the opposite wing, with outward normals
+    Returns:
+        None
+    """
+    model: WingModel = get_standard_elliptical(WingType.LEFT)
+    mirror_model: WingModel = mirror_wing(model)
+    vertices, faces = generate_loft_mesh(model)
+    mirror_vertices, mirror_faces = mirror_mesh(vertices, faces)
+    expected_vertices, expected_faces = generate_loft_mesh(mirror_model)
+    assert np.allclose(mirror_vertices, expected_vertices), 'Reflected vertices do not match'
+    assert {tuple(sorted(f)) for f in mirror_faces} == {tuple(sorted(f)) for f in expected_faces}
+
+    def signed_volume(verts, tris):
+        v = verts[tris]
+        return np.einsum('ij,ij->i', v[:, 0], np.cross(v[:, 1], v[:, 2])).sum() / 6.0
+    assert signed_volume(vertices, faces) > 0.0
+    assert np.isclose(signed_volume(mirror_vertices, mirror_faces), signed_volume(vertices, faces))
+
+    f_name = os.path.join(stl_dir, 'elliptical_pair_LEFT.stl')
+    mirror_name = os.path.join(stl_dir, 'elliptical_pair_RIGHT.stl')
+    export_stl_pair(model, mirror_model, f_name, mirror_name)
+    records = read_binary_stl(mirror_name)
+    assert len(records) == len(faces)
+    assert np.allclose(records['vertices'], mirror_vertices[mirror_faces].astype(np.float32))
+
+
+@pytest.mark.threeD
+def test_stage_instrumentation(tmp_path, caplog, capsys):
+    """
+    Generation and export stages report timings and counts to the installed sinks, and print nothing
+    """
+    trace_file = str(tmp_path / 'trace.json')
+    recording = RecordingSink()
+    seen = []
+    with caplog.at_level(logging.INFO, logger='wingwalker.stages'):
+        with instrument(recording, JsonTraceSink(trace_file), LogSink(), seen.append):
+            model: WingModel = get_standard_geometric(WingType.LEFT)
+            capsys.readouterr()
+            export_stl(model, str(tmp_path / 'traced'))
+            export_ply(model, str(tmp_path / 'traced'))
+    assert capsys.readouterr().out == '', 'Exports should not print'
+
+    specs_record = recording.by_stage('get_airfoil_specs')[0]
+    assert specs_record.points == len(model.af_specs.coords)
+    wing_record = recording.by_stage('generate_wing')[0]
+    assert wing_record.points == model.coords.shape[0] * model.coords.shape[1]
+    assert wing_record.extra['sections'] == model.section_count
+    stl_record = recording.by_stage('export_stl')[0]
+    vertices, faces = generate_loft_mesh(model)
+    assert stl_record.faces == len(faces) and stl_record.points == len(vertices)
+    assert stl_record.extra['bytes'] == os.path.getsize(str(tmp_path / 'traced.stl'))
+    assert recording.by_stage('export_ply')[0].points == model.coords.shape[0] * model.coords.shape[1]
+    assert all(r.wall >= 0.0 and r.cpu >= 0.0 for r in recording.records)
+    assert len(seen) == len(recording.records)
+
+    with open(trace_file, 'r', encoding='utf-8') as fin:
+        events = json.load(fin)['traceEvents']
+    assert [e['name'] for e in events] == [r.stage for r in recording.records]
+    assert events[0]['ph'] == 'X'
+    logged = [r for r in caplog.records if r.name == 'wingwalker.stages']
+    assert len(logged) == len(recording.records)
+    assert logged[-1].stage['stage'] == 'export_ply'
+
+    # Nested stages name their parent; failures are recorded and raised
+    with instrument(recording):
+        with pytest.raises(ValueError):
+            with stage('outer'):
+                with stage('inner') as inner:
+                    inner.cycles = 2
+                    raise ValueError('failed stage')
+    inner_record = recording.by_stage('inner')[0]
+    assert inner_record.parent == 'outer' and inner_record.cycles == 2
+    assert inner_record.error.startswith('ValueError')
+    assert recording.by_stage('outer')[0].error is not None
+
+    # Without sinks, stages are not recorded
+    export_stl(model, str(tmp_path / 'untraced'))
+    assert len(recording.by_stage('export_stl')) == 1
+
+
+@pytest.mark.threeD
+def test_memory_profiler(tmp_path):
+    """
+    The memory profiler adds peaks and top allocations to every stage, before the other sinks see the records
+    """
+    wing_params = get_standard_geometric(WingType.LEFT).wing_params
+    recording = RecordingSink()
+    assert not tracemalloc.is_tracing()
+    with instrument(MemoryProfiler(top=5), recording) as (profiler, _):
+        model = generate_wing_model(wing_params, tolerance=0.05)
+        export_stl(model, str(tmp_path / 'profiled'))
+    assert not tracemalloc.is_tracing(), 'The profiler should stop the tracing it started'
+
+    assert [r.stage for r in recording.records] == [r.stage for r in profiler.records]
+    for record in recording.records:
+        assert record.extra['traced_peak'] > 0
+        assert 'traced_growth' in record.extra and 'rss_peak' in record.extra
+        assert len(record.extra['top_allocations']) <= 5
+    model_record = recording.by_stage('generate_wing_model')[0]
+    assert recording.by_stage('generate_wing')[0].parent == 'generate_wing_model'
+    assert recording.by_stage('plan_stations')[0].extra['sections'] == model.section_count
+    # A stage's peak covers its children, and the wing's coordinates are allocated within it
+    assert model_record.extra['traced_peak'] >= max(profiler.peaks('generate_wing'))
+    assert model_record.extra['traced_peak'] >= model.coords.nbytes
+    assert profiler.peaks('export_stl')[0] > 0
+
+
+@pytest.mark.threeD
+def test_memory_profiler_overhead():
+    """
+    The profiler's snapshots are taken outside the stage clock: an empty stage takes next to no time
+    """
+    live = [str(i) for i in range(200000)]
+    with instrument(MemoryProfiler(top=10)) as (profiler,):
+        live.extend(str(i) for i in range(200000))
+        with stage('empty'):
+            pass
+    record = profiler.by_stage('empty')[0]
+    assert record.wall < 0.05 and record.cpu < 0.05, f'Profiler overhead counted in the stage: {record}'
@@ -1,15 +1,23 @@
 import json
+import math
 from datetime import datetime
 
 import pytest
 import os
 
+import numpy as np
 from numpy import long
 
 from tests.utilities import call_gen_wing
 from wingwalker.build_params.wing_request import WingRequest
-from wingwalker.generators.wing import get_airfoil_specs
+from wingwalker.generators.iterators import ParamFunctor
+from wingwalker.generators.metrics import METRIC_NAMES, planform_metrics, request_metrics, wing_metrics
+from wingwalker.generators.wing import get_airfoil_specs, get_lambdas, generate_wing_array, transform_matrix_z, \
+    get_functor, generate_wing_model, generate_wing_pair, mirror_request
+from wingwalker.generators.stations import plan_stations, profile_radius
+from wingwalker.io.model_store import load_model, read_header, save_model
 from wingwalker.io.specs import parse_specfile
+from wingwalker.models.airfoil_specs import AirfoilSpecs
 from wingwalker.models.enums import SpecFormat, Planform, WingType
 from wingwalker.models.wing_model import WingModel
 
@@ -44,6 +52,46 @@ def test_parse_specfile(spec_file, spec_format):
     assert len(trace_pts) > 0, "Failed to read trace points from spec"
 
 
+@pytest.mark.io
+@pytest.mark.parametrize('mirror', [True, False])
+@pytest.mark.parametrize('c_len', [1.0, 64.0])
+@pytest.mark.parametrize('spec_file,spec_format', [
+    ('data/lednicer_supercritical_nasa-sc2-1010.dat', SpecFormat.LEDNICER),
+    ('data/selig_naca2412.dat', SpecFormat.SELIG),
+    ('data/selig_symmetrical_n0011sc-il.dat', SpecFormat.SELIG),
+])
+def test_spec_section_properties(spec_file, spec_format, c_len: float, mirror: bool):
+    """
+    Compare the cached, scaled section properties against the shapely polygon
+    """
+    airfoil_data = parse_specfile(spec_file, spec_format)
+    assert airfoil_data.coords.shape == (len(airfoil_data.x), 2), 'Coordinates are not an Nx2 array'
+
+    poly = airfoil_data.to_poly(c_len, 0.0, mirror)
+    centroid = airfoil_data.centroid(c_len, 0.0, mirror)
+    assert np.isclose(centroid.x, poly.centroid.x), 'Centroid x does not match'
+    assert np.isclose(centroid.y, poly.centroid.y), 'Centroid y does not match'
+    assert np.isclose(airfoil_data.area(c_len), poly.area), 'Area does not match'
+
+
+@pytest.mark.analytics
+def test_spec_moments():
+    """
+    Check the second moments against a rectangle with known values
+    """
+    width, height = 2.0, 0.5
+    rect = AirfoilSpecs('rectangle', 'rectangle', [0.0, width, width, 0.0], [0.0, 0.0, height, height])
+    ixx, iyy, ixy = rect.unit_moments
+    assert np.isclose(rect.unit_area, width * height)
+    assert np.allclose(rect.unit_centroid, (width / 2.0, height / 2.0))
+    assert np.isclose(ixx, width * height ** 3 / 12.0)
+    assert np.isclose(iyy, height * width ** 3 / 12.0)
+    assert np.isclose(ixy, 0.0)
+    # Reversing the trace direction must not change the results
+    rev = AirfoilSpecs('rectangle', 'rectangle', [0.0, 0.0, width, width], [0.0, height, height, 0.0])
+    assert np.allclose(rev.unit_moments, rect.unit_moments)
+
+
 @pytest.mark.io
 @pytest.mark.parametrize('spec_file,spec_format', [
     ('data/lednicer_supercritical_nasa-sc2-1010.dat', SpecFormat.LEDNICER),
@@ -345,4 +393,363 @@ def test_wing_request_io(
 
     assert wing_req == stored_req, 'Stored wing request is not the same as the original request'
     # cleanup
-    os.remove(outfile)
\ No newline at end of file
+    os.remove(outfile)
+
+@pytest.mark.threeD
+@pytest.mark.parametrize('is_left', [True, False])
+@pytest.mark.parametrize('planform', [Planform.RECTANGULAR, Planform.ELLIPSE, Planform.GEOMETRIC])
+@pytest.mark.parametrize('spec_file,spec_format', [
+    ('data/lednicer_supercritical_nasa-sc2-1010.dat', SpecFormat.LEDNICER),
+    ('data/selig_symmetrical_n0011sc-il.dat', SpecFormat.SELIG),
+])
+def test_wing_array(spec_file: str, spec_format: SpecFormat, planform: Planform, is_left: bool):
+    """
+    Compare the batched wing generation against the per-point transformation of each section
+    Args:
+        spec_file: input file
+        spec_format: airfoil format
+        planform: shape of wing
+        is_left: left or right structure
+
+    """
+    wing_req: WingRequest = WingRequest()
+    wing_req.planform = planform
+    wing_req.wing_type = WingType.WING | (WingType.LEFT if is_left else WingType.RIGHT)
+    wing_req.span = 256.0
+    wing_req.base_chord = 128.0
+    wing_req.end_chord = 50.0
+    wing_req.twist = -0.0349066
+    wing_req.spec_file = spec_file
+    wing_req.spec_format = spec_format
+    wing_req.iterations = 20
+
+    af_specs = get_airfoil_specs(wing_req)
+    c_func, t_func, z_func, area_func = get_lambdas(wing_req)
+    coords = generate_wing_array(wing_req, af_specs, c_func, t_func, z_func)
+
+    assert coords.shape == (wing_req.iterations, len(af_specs.x), 3), 'Unexpected wing array shape'
+    assert coords.flags['C_CONTIGUOUS'], 'Wing array is not contiguous'
+
+    for t in range(wing_req.iterations):
+        c = c_func(t)
+        centroid = af_specs.centroid(c, z_func(t), wing_req.mirrored)
+        tform = transform_matrix_z(t_func(t), centroid)
+        for i, p in enumerate(af_specs.trace(c, z_func(t), wing_req.mirrored)):
+            expected = tform @ np.array([p.x, p.y, p.z, 1.0])
+            assert np.allclose(coords[t, i], expected[:3]), f'Section {t}, point {i} does not match'
+
+    wing_model: WingModel = call_gen_wing(wing_req)
+    assert wing_model.section_count == wing_req.iterations, 'Wrong number of sections'
+    assert np.array_equal(wing_model.coords, coords), 'Wing model does not hold the generated array'
+
+
+@pytest.mark.threeD
+def test_wing_model_sections():
+    """
+    Sections are views into the model's coordinate array, and iteration is re-entrant
+    """
+    wing_req: WingRequest = WingRequest()
+    wing_req.planform = Planform.GEOMETRIC
+    wing_req.wing_type = WingType.WING | WingType.LEFT
+    wing_req.span = 256.0
+    wing_req.base_chord = 128.0
+    wing_req.end_chord = 64.0
+    wing_req.twist = -0.0349066
+    wing_req.spec_file = 'data/selig_symmetrical_n0011sc-il.dat'
+    wing_req.spec_format = SpecFormat.SELIG
+    wing_req.iterations = 8
+
+    wing_model: WingModel = call_gen_wing(wing_req)
+    assert len(wing_model) == wing_req.iterations
+    assert wing_model.chords.shape == (wing_req.iterations,)
+    assert wing_model.z_indices.shape == (wing_req.iterations,)
+    assert wing_model.twists.shape == (wing_req.iterations,)
+
+    section = wing_model[3]
+    assert not hasattr(section, '__dict__'), 'AirfoilSection should use __slots__'
+    assert np.shares_memory(section.coords, wing_model.coords), 'Section is not a view of the model array'
+    assert section.chord == wing_model.chords[3]
+
+    # Nested iteration over the same model and section
+    pairs = [(s.z_index, t.z_index) for s in wing_model for t in wing_model]
+    assert len(pairs) == wing_req.iterations ** 2, 'Nested model iteration was cut short'
+    points = [(p.x, q.x) for p in section for q in section]
+    assert len(points) == len(section) ** 2, 'Nested section iteration was cut short'
+
+    # Rebuilding a model from its sections gives back the same arrays
+    rebuilt = WingModel(wing_req, wing_model.af_specs, wing_model.airfoil_sections)
+    assert np.array_equal(rebuilt.coords, wing_model.coords)
+    assert np.array_equal(rebuilt.twists, wing_model.twists)
+
+
+class ScalarOnlyFunctor(ParamFunctor):
+    """
+    Custom functor whose lambdas only accept scalar values of t
+    """
+    def __init__(self, build_params: WingRequest):
+        super().__init__(build_params)
+
+    def chord_func(self):
+        return lambda t: self.base_chord * math.cos(t / (self.iterations - 1))
+
+    def twist_func(self):
+        return lambda t: 0.0 if t < 2 else self.twist
+
+    def z_func(self):
+        return super().z_func()
+
+    def area_func(self):
+        return super().area_func()
+
+
+@pytest.mark.analytics
+@pytest.mark.parametrize('is_left', [True, False])
+@pytest.mark.parametrize('planform', [Planform.RECTANGULAR, Planform.ELLIPSE, Planform.GEOMETRIC])
+def test_functor_arrays(planform: Planform, is_left: bool):
+    """
+    Array evaluation of the planform functors matches evaluating one t at a time
+    """
+    wing_req: WingRequest = WingRequest()
+    wing_req.planform = planform
+    wing_req.wing_type = WingType.WING | (WingType.LEFT if is_left else WingType.RIGHT)
+    wing_req.span = 256.0
+    wing_req.base_chord = 128.0
+    wing_req.end_chord = 50.0
+    wing_req.twist = -0.0349066
+    wing_req.iterations = 30
+
+    functor = get_functor(wing_req)
+    c_func, t_func, z_func, area_func = get_lambdas(wing_req)
+    t_values = np.linspace(0.0, wing_req.iterations - 1, 1000)
+    chords, twists, zs = functor.evaluate(t_values)
+    assert chords.shape == twists.shape == zs.shape == t_values.shape
+    assert np.allclose(chords, [c_func(t) for t in t_values])
+    assert np.allclose(twists, [t_func(t) for t in t_values])
+    assert np.allclose(zs, [z_func(t) for t in t_values])
+
+    s_chords, s_twists, s_zs = functor.evaluate_stations(np.array([0.0, 1.0]))
+    assert np.isclose(s_chords[0], wing_req.base_chord)
+    assert np.isclose(s_zs[-1], wing_req.span)
+    assert np.isclose(abs(s_twists[-1]), abs(wing_req.twist))
+
+
+@pytest.mark.analytics
+def test_functor_scalar_fallback():
+    """
+    Custom functors with scalar-only lambdas are vectorized by the default fallback
+    """
+    wing_req: WingRequest = WingRequest()
+    wing_req.base_chord = 100.0
+    wing_req.span = 200.0
+    wing_req.twist = -0.05
+    wing_req.iterations = 10
+
+    functor = ScalarOnlyFunctor(wing_req)
+    t_values = np.arange(wing_req.iterations, dtype=float).reshape(2, 5)
+    chords, twists, zs = functor.evaluate(t_values)
+    assert chords.shape == t_values.shape
+    assert np.allclose(chords, [[functor.chord_func()(t) for t in row] for row in t_values])
+    assert np.allclose(twists, [[functor.twist_func()(t) for t in row] for row in t_values])
+    assert np.allclose(zs, t_values * wing_req.span / (wing_req.iterations - 1))
+
+
+@pytest.mark.threeD
+@pytest.mark.parametrize('tolerance', [0.5, 0.05])
+@pytest.mark.parametrize('planform,twist', [
+    (Planform.RECTANGULAR, 0.0),
+    (Planform.ELLIPSE, -0.0349066),
+    (Planform.ELLIPSE, 0.0),
+    (Planform.GEOMETRIC, -0.0349066),
+])
+def test_plan_stations(planform: Planform, twist: float, tolerance: float):
+    """
+    Adaptive stations keep the straight loft between sections within tolerance of the densely sampled planform
+    """
+    wing_req: WingRequest = WingRequest()
+    wing_req.planform = planform
+    wing_req.wing_type = WingType.WING | WingType.RIGHT
+    wing_req.span = 200.0
+    wing_req.base_chord = 96.0
+    wing_req.end_chord = 48.0 if planform == Planform.GEOMETRIC else 0.0
+    wing_req.twist = twist
+    wing_req.spec_file = 'data/lednicer_supercritical_nasa-sc2-1010.dat'
+    wing_req.spec_format = SpecFormat.LEDNICER
+    wing_req.iterations = 300
+
+    af_specs = get_airfoil_specs(wing_req)
+    functor = get_functor(wing_req)
+    t_values = plan_stations(wing_req, functor, tolerance, af_specs)
+    assert t_values[0] == 0.0 and t_values[-1] == wing_req.iterations - 1, 'Base or end section missing'
+    assert np.all(np.diff(t_values) > 0.0), 'Stations are not strictly increasing'
+    if planform == Planform.RECTANGULAR:
+        assert len(t_values) == 2, 'Rectangular wing without twist needs only two sections'
+    assert len(t_values) < wing_req.iterations / 4, 'Adaptive planning did not reduce the section count'
+
+    # Check the loft against the planform, between the planned stations
+    radius = profile_radius(af_specs)
+    dense_t = np.linspace(0.0, wing_req.iterations - 1, 20001)
+    chords, twists, zs = functor.evaluate(dense_t)
+    s_chords, s_twists, s_zs = functor.evaluate(t_values)
+    loft_chords = np.interp(zs, s_zs, s_chords)
+    loft_twists = np.interp(zs, s_zs, s_twists)
+    error = radius * (np.abs(chords - loft_chords) + chords * np.abs(twists - loft_twists))
+    assert error.max() <= tolerance * 1.05, f'Loft deviates by {error.max()} (tolerance {tolerance})'
+
+    capped = plan_stations(wing_req, functor, tolerance, af_specs, max_sections=4)
+    assert len(capped) <= 4, 'max_sections was not respected'
+
+    with pytest.raises(ValueError):
+        plan_stations(wing_req, functor, 0.0, af_specs)
+
+    wing_model: WingModel = generate_wing_model(wing_req, tolerance=tolerance)
+    assert wing_model.section_count == len(t_values), 'Wing model does not use the planned stations'
+    assert np.allclose(wing_model.z_indices, s_zs)
+    assert np.allclose(wing_model.chords, s_chords)
+
+
+@pytest.mark.analytics
+@pytest.mark.parametrize('planform', [Planform.RECTANGULAR, Planform.ELLIPSE, Planform.GEOMETRIC])
+def test_wing_metrics(planform: Planform):
+    """
+    Metrics-only evaluation matches the generated model, and the span integrals match the sampled sections
+    """
+    wing_req: WingRequest = WingRequest()
+    wing_req.planform = planform
+    wing_req.wing_type = WingType.WING | WingType.LEFT
+    wing_req.span = 256.0
+    wing_req.base_chord = 100.0
+    wing_req.end_chord = 40.0 if planform == Planform.GEOMETRIC else 0.0
+    wing_req.twist = -0.0349066
+    wing_req.spec_file = 'data/lednicer_supercritical_nasa-sc2-1010.dat'
+    wing_req.spec_format = SpecFormat.LEDNICER
+    wing_req.iterations = 2001
+
+    af_specs = get_airfoil_specs(wing_req)
+    metrics = wing_metrics(wing_req, af_specs)
+    assert set(metrics) == set(METRIC_NAMES)
+
+    wing_model: WingModel = call_gen_wing(wing_req)
+    assert np.isclose(metrics['area'], wing_model.area)
+    assert np.isclose(metrics['mac'], wing_model.mac)
+    assert np.isclose(metrics['aspect_ratio'], wing_model.aspect_ratio)
+
+    # Integrate over the generated sections
+    chords, zs = wing_model.chords, wing_model.z_indices
+    assert np.isclose(metrics['planform_area'], np.trapezoid(chords, zs), rtol=1e-3)
+    assert np.isclose(metrics['volume'], np.trapezoid(af_specs.area(chords), zs), rtol=1e-3)
+    assert np.isclose(metrics['root_thickness'], af_specs.unit_thickness * chords[0])
+    assert np.isclose(metrics['tip_thickness'], af_specs.unit_thickness * chords[-1], atol=1e-9)
+
+    # Columnar evaluation gives the same values as one request at a time
+    columns = request_metrics([wing_req] * 3, af_specs)
+    for name in METRIC_NAMES:
+        assert np.allclose(columns[name], metrics[name])
+
+
+@pytest.mark.analytics
+def test_planform_metrics_columns():
+    """
+    Columns broadcast against each other, and unknown planforms are rejected
+    """
+    spans = np.linspace(100.0, 500.0, 1000)
+    metrics = planform_metrics(Planform.GEOMETRIC, 120.0, 60.0, spans, unit_area=0.1, unit_perimeter=2.0,
+                               unit_thickness=0.12)
+    assert metrics['area'].shape == spans.shape
+    assert np.allclose(metrics['area'], 90.0 * spans)
+    assert np.allclose(metrics['wetted_area'], 2.0 * 90.0 * spans)
+    assert np.allclose(metrics['tip_thickness'], 0.12 * 60.0)
+
+    mixed = planform_metrics(['rectangular', 'ellipse'], [100.0, 100.0], 0.0, [200.0, 200.0])
+    assert np.allclose(mixed['area'], [20000.0, math.pi * 100.0 * 200.0 / 2.0])
+    assert np.allclose(mixed['volume'], 0.0), 'Airfoil-dependent metrics should default to zero'
+
+    with pytest.raises(ValueError):
+        planform_metrics([Planform.UNDEFINED], [100.0], [0.0], [200.0])
+
+    # Perimeter and thickness of a diamond-shaped section
+    diamond = AirfoilSpecs('diamond', 'diamond', [0.0, 0.5, 1.0, 0.5], [0.0, -0.5, 0.0, 0.5])
+    assert np.isclose(diamond.unit_perimeter, 4.0 * math.sqrt(0.5))
+    assert np.isclose(diamond.unit_thickness, 1.0)
+
+
+@pytest.mark.threeD
+@pytest.mark.parametrize('side', [WingType.LEFT, WingType.RIGHT])
+@pytest.mark.parametrize('planform', [Planform.RECTANGULAR, Planform.ELLIPSE, Planform.GEOMETRIC])
+def test_wing_pair(planform: Planform, side: WingType):
+    """
+    The reflected wing of a pair matches a full build of the opposite side
+    """
+    wing_req: WingRequest = WingRequest()
+    wing_req.name = 'pair'
+    wing_req.planform = planform
+    wing_req.wing_type = WingType.WING | side
+    wing_req.span = 256.0
+    wing_req.base_chord = 128.0
+    wing_req.end_chord = 50.0
+    wing_req.twist = -0.0349066
+    wing_req.spec_file = 'data/lednicer_supercritical_nasa-sc2-1010.dat'
+    wing_req.spec_format = SpecFormat.LEDNICER
+    wing_req.iterations = 20
+
+    mirror_req = mirror_request(wing_req)
+    assert mirror_req.mirrored != wing_req.mirrored
+    assert mirror_req.wing_type & WingType.WING == WingType.WING
+    assert mirror_request(mirror_req) == wing_req
+
+    wing_model, mirror_model = generate_wing_pair(wing_req)
+    expected: WingModel = call_gen_wing(mirror_req)
+    assert mirror_model.wing_params == mirror_req
+    assert np.allclose(mirror_model.coords, expected.coords), 'Reflected wing does not match a full build'
+    assert np.allclose(mirror_model.twists, expected.twists)
+    assert np.allclose(mirror_model.chords, expected.chords)
+    assert mirror_model.area == expected.area
+    assert not np.shares_memory(mirror_model.coords, wing_model.coords)
+
+
+@pytest.mark.io
+@pytest.mark.parametrize('mmap_mode', ['r', None])
+@pytest.mark.parametrize('planform', [Planform.RECTANGULAR, Planform.ELLIPSE])
+def test_model_store(tmp_path, planform: Planform, mmap_mode):
+    """
+    Saved wing models reload with the same request, specs and arrays, backed by the file when memory mapped
+    """
+    wing_req: WingRequest = WingRequest()
+    wing_req.name = 'stored'
+    wing_req.planform = planform
+    wing_req.wing_type = WingType.WING | WingType.RIGHT
+    wing_req.span = 256.0
+    wing_req.base_chord = 128.0
+    wing_req.end_chord = 50.0
+    wing_req.twist = -0.0349066
+    wing_req.spec_file = 'data/lednicer_supercritical_nasa-sc2-1010.dat'
+    wing_req.spec_format = SpecFormat.LEDNICER
+    wing_req.iterations = 20
+    wing_model: WingModel = call_gen_wing(wing_req)
+
+    model_file = save_model(wing_model, str(tmp_path / 'wing'))
+    assert model_file.endswith('.wwm')
+    header = read_header(model_file)
+    assert header['designation'] == wing_model.af_specs.designation
+    assert header['arrays']['coords']['shape'] == list(wing_model.coords.shape)
+
+    stored: WingModel = load_model(model_file, mmap_mode=mmap_mode)
+    assert stored.wing_params == wing_req
+    assert stored.wing_params.planform is planform
+    assert stored.wing_params.mirrored
+    assert stored.af_specs.designation == wing_model.af_specs.designation
+    assert np.array_equal(stored.af_specs.coords, wing_model.af_specs.coords)
+    assert np.array_equal(stored.coords, wing_model.coords)
+    assert np.array_equal(stored.chords, wing_model.chords)
+    assert np.array_equal(stored.z_indices, wing_model.z_indices)
+    assert np.array_equal(stored.twists, wing_model.twists)
+    assert stored.area == wing_model.area
+    assert stored.span == wing_model.span
+    assert np.allclose(stored.section(5).coords, wing_model.section(5).coords)
+
+    coords_base = stored.coords if stored.coords.base is None else stored.coords.base
+    assert isinstance(coords_base, np.memmap) == (mmap_mode is not None)
+
+    with open(model_file, 'r+b') as fout:
+        fout.write(b'NOTAMODL')
+    with pytest.raises(ValueError):
+        load_model(model_file)
@@ -1,10 +1,14 @@
+import numpy as np
 import pytest
+import pyvista as pv
 from pyvista import PolyData
 
-from tests.utilities import get_standard_elliptical, get_standard_rectangular, get_standard_geometric
-from wingwalker.generators.wing import generate_point_cloud_polydata
-from wingwalker.models.enums import WingType
+from tests.utilities import get_standard_elliptical, get_standard_rectangular, get_standard_geometric, call_gen_wing
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.generators.wing import generate_point_cloud_polydata, generate_point_cloud_array
+from wingwalker.models.enums import WingType, Planform, SpecFormat
 from wingwalker.models.wing_model import WingModel
+from wingwalker.processing.mesh import generate_loft_mesh
 
 
 @pytest.mark.threeD
@@ -107,3 +111,83 @@ def test_geometric_mesh(wing_side: WingType):
     """
     model: WingModel = get_standard_geometric(wing_side)
     assert model is not None
+
+
+def verify_closed_mesh(vertices: np.ndarray, faces: np.ndarray):
+    """
+    Check that a vertex/face mesh is manifold, has no open edges, and has outward-facing normals
+    Args:
+        vertices: (V, 3) vertex array
+        faces: (F, 3) triangle array
+    """
+    poly = pv.PolyData(vertices, np.hstack((np.full((len(faces), 1), 3), faces)).ravel())
+    assert poly.is_manifold, 'Mesh is not manifold'
+    assert poly.n_open_edges == 0, 'Mesh has open edges'
+    tri = vertices[faces]
+    signed_volume = np.einsum('ij,ij->i', tri[:, 0], np.cross(tri[:, 1], tri[:, 2])).sum() / 6.0
+    assert signed_volume > 0.0, 'Mesh faces are not wound outward'
+
+
+@pytest.mark.threeD
+@pytest.mark.parametrize('wing_side', [WingType.LEFT, WingType.RIGHT])
+@pytest.mark.parametrize('generator', [get_standard_elliptical, get_standard_rectangular, get_standard_geometric])
+def test_loft_mesh(generator, wing_side: WingType):
+    """
+    Build the structured loft mesh from the standard models and check it is closed
+    Args:
+        generator: standard model generation function
+        wing_side:
+            Left or right
+    Returns:
+        None
+    """
+    model: WingModel = generator(wing_side)
+    vertices, faces = generate_loft_mesh(model)
+    assert faces.shape[1] == 3
+    verify_closed_mesh(vertices, faces)
+
+
+@pytest.mark.threeD
+@pytest.mark.parametrize('end', [0.0, 32.0])
+@pytest.mark.parametrize('planform', [Planform.RECTANGULAR, Planform.ELLIPSE, Planform.GEOMETRIC])
+@pytest.mark.parametrize('spec_file,spec_format', [
+    ('data/lednicer_symmetrical_n0011sc-il.dat', SpecFormat.LEDNICER),
+    ('data/selig_supercritical_nasa-sc2-1010.dat', SpecFormat.SELIG),
+    ('data/selig_naca2412.dat', SpecFormat.SELIG),
+])
+def test_loft_mesh_specs(spec_file: str, spec_format: SpecFormat, planform: Planform, end: float):
+    """
+    Closed loft meshes for specs with repeated points, open trailing edges and collapsed tips
+    """
+    wing_req: WingRequest = WingRequest()
+    wing_req.planform = planform
+    wing_req.wing_type = WingType.WING | WingType.LEFT
+    wing_req.span = 128.0
+    wing_req.base_chord = 64.0
+    wing_req.end_chord = end
+    wing_req.twist = -0.0349066
+    wing_req.spec_file = spec_file
+    wing_req.spec_format = spec_format
+    wing_req.iterations = 12
+
+    model: WingModel = call_gen_wing(wing_req)
+    vertices, faces = generate_loft_mesh(model)
+    verify_closed_mesh(vertices, faces)
+
+
+@pytest.mark.threeD
+def test_point_cloud_views():
+    """
+    The point cloud array and PolyData share the model's coordinate buffer unless a copy is asked for
+    """
+    model: WingModel = get_standard_rectangular(WingType.LEFT)
+    points = generate_point_cloud_array(model)
+    assert points.shape == (model.coords.shape[0] * model.coords.shape[1], 3)
+    assert np.shares_memory(points, model.coords), 'Point cloud array is not a view'
+    assert not np.shares_memory(generate_point_cloud_array(model, copy_points=True), model.coords), 'Copy shares memory'
+
+    p_cloud: PolyData = generate_point_cloud_polydata(model)
+    assert np.shares_memory(p_cloud.points, model.coords), 'PolyData points are not a view'
+    deep_cloud: PolyData = generate_point_cloud_polydata(model, deep=True)
+    assert not np.shares_memory(deep_cloud.points, model.coords), 'Deep PolyData shares memory'
+    assert np.array_equal(deep_cloud.points, points)
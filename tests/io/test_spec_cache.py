@@ -0,0 +1,104 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import wingwalker.utils as utils
+from wingwalker.io.spec_cache import SpecCache, load_many
+from wingwalker.io.specs import parse_specfile, parse_specfiles
+from wingwalker.models.enums import SpecFormat
+
+
+@pytest.mark.io
+@pytest.mark.disk
+@pytest.mark.parametrize('spec_file,spec_format', [
+    ('data/lednicer_supercritical_nasa-sc2-1010.dat', SpecFormat.LEDNICER),
+    ('data/selig_symmetrical_n0011sc-il.dat', SpecFormat.SELIG),
+])
+def test_spec_cache_layers(tmp_path, monkeypatch, spec_file: str, spec_format: SpecFormat):
+    """
+    Specs are parsed once, then served from memory, then from disk for a new cache on the same directory
+    """
+    cache_dir = str(tmp_path / 'specs')
+    cache = SpecCache(cache_dir)
+    first = cache.load(spec_file, spec_format)
+    expected = parse_specfile(spec_file, spec_format)
+    assert first.designation == expected.designation, 'Cached designation does not match'
+    assert np.array_equal(first.coords, expected.coords), 'Cached coordinates do not match'
+    assert cache.load(spec_file, spec_format) is first, 'Second load was not served from memory'
+    assert len(os.listdir(cache_dir)) == 1, 'Parsed specs were not written to disk'
+
+    # A fresh cache on the same directory must not need to parse again
+    def no_parse(*args, **kwargs):
+        raise AssertionError('spec file was parsed again')
+    monkeypatch.setattr(utils, 'parse_specs_array', no_parse)
+    stored = SpecCache(cache_dir).load(spec_file, spec_format)
+    assert stored.designation == expected.designation, 'Stored designation does not match'
+    assert np.array_equal(stored.coords, expected.coords), 'Stored coordinates do not match'
+
+
+@pytest.mark.io
+@pytest.mark.disk
+def test_spec_cache_invalidation(tmp_path):
+    """
+    Changing the source file is picked up, while touching it without changes reuses the parsed specs
+    """
+    spec_file = str(tmp_path / 'airfoil.dat')
+    shutil.copy('data/selig_naca2412.dat', spec_file)
+    cache = SpecCache(str(tmp_path / 'specs'), max_entries=4)
+    first = cache.load(spec_file, SpecFormat.SELIG)
+
+    stats = os.stat(spec_file)
+    os.utime(spec_file, ns=(stats.st_atime_ns, stats.st_mtime_ns + 1_000_000_000))
+    assert cache.load(spec_file, SpecFormat.SELIG) is first, 'Unchanged content was parsed again'
+
+    with open(spec_file, 'rb') as fin:
+        lines = fin.readlines()
+    with open(spec_file, 'wb') as fout:
+        fout.writelines([b'CHANGED AIRFOIL\n'] + lines[1:-1])
+    os.utime(spec_file, ns=(stats.st_atime_ns, stats.st_mtime_ns + 2_000_000_000))
+    changed = cache.load(spec_file, SpecFormat.SELIG)
+    assert changed is not first, 'Changed content was served from the cache'
+    assert changed.designation == 'CHANGED AIRFOIL'
+    assert len(changed.x) == len(first.x) - 1
+
+
+@pytest.mark.io
+def test_concurrent_loading(monkeypatch):
+    """
+    Threads share one parse per file, and parallel parsing gives the same results as serial parsing
+    """
+    sources = [
+        ('data/lednicer_supercritical_nasa-sc2-1010.dat', SpecFormat.LEDNICER),
+        ('data/selig_symmetrical_n0011sc-il.dat', SpecFormat.SELIG),
+        ('data/selig_naca2412.dat', SpecFormat.SELIG),
+        ('data/lednicer_nasasc2-0714-il.dat', SpecFormat.LEDNICER),
+    ]
+    expected = [parse_specfile(src, spec_format) for src, spec_format in sources]
+    parsed = parse_specfiles(sources * 8, max_workers=8)
+    for specs, exp in zip(parsed, expected * 8):
+        assert specs.designation == exp.designation
+        assert np.array_equal(specs.coords, exp.coords), 'Parallel parse does not match'
+
+    parses = []
+    original_parse = utils.parse_specs_array
+    def counting_parse(*args, **kwargs):
+        parses.append(args[2])
+        return original_parse(*args, **kwargs)
+    monkeypatch.setattr(utils, 'parse_specs_array', counting_parse)
+
+    cache = SpecCache()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        loaded = list(executor.map(lambda source: cache.load(*source), sources * 8))
+    assert len(parses) == len(sources), 'Concurrent loads of the same file were parsed more than once'
+    for i, specs in enumerate(loaded):
+        assert specs is loaded[i % len(sources)], 'Threads did not share the cached specs'
+        assert np.array_equal(specs.coords, expected[i % len(sources)].coords)
+
+    many = load_many(sources * 2, max_workers=4, cache=cache)
+    assert [id(s) for s in many] == [id(s) for s in loaded[:len(sources) * 2]]
+    assert len(parses) == len(sources)
+    with pytest.raises(FileNotFoundError):
+        load_many([('data/missing_airfoil.dat', SpecFormat.SELIG)], cache=cache)
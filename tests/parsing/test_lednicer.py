@@ -1,3 +1,6 @@
+import numpy as np
+import pytest
+
 import wingwalker.lednicer as lednicer
 
 
@@ -7,3 +10,20 @@ def test_lednicer_parsing():
     assert found_airfoil == 'NASA SC(2)-1010 AIRFOIL'
     assert len(xs) == 206
     assert len(ys) == 206
+
+
+@pytest.mark.parametrize('lednicer_file', [
+    'data/lednicerdatfile.txt',
+    'data/lednicer_nasasc2-0714-il.dat',
+    'data/lednicer_supercritical_nasa-sc2-1010.dat',
+    'data/lednicer_symmetrical_n0011sc-il.dat'
+])
+@pytest.mark.parametrize('c_len', [1.0, 128.0])
+def test_lednicer_array_parsing(lednicer_file, c_len):
+    parser = lednicer.Parser(lednicer_file)
+    xs, ys, found_airfoil = parser.read(c_len)
+    x_arr, y_arr, array_airfoil = parser.read_array(c_len)
+    assert array_airfoil == found_airfoil
+    assert x_arr.dtype == np.float64 and y_arr.dtype == np.float64
+    assert np.array_equal(x_arr, np.array(xs))
+    assert np.array_equal(y_arr, np.array(ys))
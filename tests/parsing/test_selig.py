@@ -1,3 +1,8 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+
 import wingwalker.selig as selig
 
 
@@ -7,3 +12,40 @@ def test_selig_parsing():
     assert found_airfoil == 'NASA SC(2)-1010 AIRFOIL'
     assert len(xs) == 205
     assert len(xs) == 205
+
+
+@pytest.mark.parametrize('selig_file', [
+    'data/seligdatfile.txt',
+    'data/selig_naca2412.dat',
+    'data/selig_nasasc2-0714-il.dat',
+    'data/selig_supercritical_nasa-sc2-1010.dat',
+    'data/selig_symmetrical_n0011sc-il.dat'
+])
+@pytest.mark.parametrize('c_len', [1.0, 128.0])
+def test_selig_array_parsing(selig_file, c_len):
+    parser = selig.Parser(selig_file)
+    xs, ys, found_airfoil = parser.read(c_len)
+    x_arr, y_arr, array_airfoil = parser.read_array(c_len)
+    assert array_airfoil == found_airfoil
+    assert x_arr.dtype == np.float64 and y_arr.dtype == np.float64
+    assert np.array_equal(x_arr, np.array(xs))
+    assert np.array_equal(y_arr, np.array(ys))
+
+
+def test_selig_array_fallback():
+    # A trailing non-coordinate line is picked up as the designation, as parse_selig does
+    spec = b'FIRST NAME\n  1.000000  0.000000\n  0.500000  0.050000\n  0.000000  0.000000\nSECOND NAME\n'
+    x_arr, y_arr, found_airfoil = selig.parse_selig_array(BytesIO(spec))
+    assert found_airfoil == 'SECOND NAME'
+    assert len(x_arr) == 3
+    assert len(y_arr) == 3
+
+
+def test_selig_array_extra_columns():
+    # Lines with a third column fall back to the line-by-line parser, which keeps the first two values
+    spec = b'THREE COLUMNS\n  1.000000  0.000000  5.000000\n  0.500000  0.100000  6.000000\n'
+    x_arr, y_arr, found_airfoil = selig.parse_selig_array(BytesIO(spec))
+    xs, ys = [], []
+    assert selig.parse_selig(BytesIO(spec), xs, ys) == found_airfoil == 'THREE COLUMNS'
+    assert np.array_equal(x_arr, [1.0, 0.5]) and np.array_equal(y_arr, [0.0, 0.1])
+    assert np.array_equal(x_arr, xs) and np.array_equal(y_arr, ys)
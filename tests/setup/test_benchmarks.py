@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PIPELINE = os.path.join(ROOT_DIR, 'benchmarks', 'pipeline.py')
+MEMORY = os.path.join(ROOT_DIR, 'benchmarks', 'memory.py')
+
+
+def run_pipeline(*args: str, script: str = PIPELINE)->subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, script, *args], capture_output=True, text=True, cwd=ROOT_DIR)
+
+
+@pytest.mark.testing
+def test_pipeline_benchmark(tmp_path):
+    """
+    The pipeline benchmark writes one result per case, and flags regressions against a baseline
+    """
+    output = str(tmp_path / 'bench.json')
+    common = ['--stages', 'parse_specfile,generate_section,generate_wing', '--specs', 'data/selig_naca2412.dat',
+              '--iterations', '5,10', '--points', '0,64', '--repeat', '1', '--min-time', '0']
+    result = run_pipeline(*common, '--output', output)
+    assert result.returncode == 0, result.stderr
+    with open(output, 'r', encoding='utf-8') as fin:
+        stored = json.load(fin)
+    cases = stored['results']
+    assert len(cases) == 1 + 2 + 2 * 2
+    assert cases['generate_wing|selig_naca2412.dat|64|10']['points'] == 64
+    assert 'python' in stored['meta']
+
+    # A baseline ten times faster than this run must be reported as a regression
+    for case in cases.values():
+        case['median'] /= 10.0
+    baseline = str(tmp_path / 'baseline.json')
+    with open(baseline, 'w', encoding='utf-8') as fout:
+        json.dump(stored, fout)
+    result = run_pipeline(*common, '--baseline', baseline, '--threshold', '1.0')
+    assert result.returncode == 1
+    assert 'REGRESSION' in result.stdout
+
+
+@pytest.mark.testing
+def test_memory_benchmark(tmp_path):
+    """
+    The memory benchmark profiles every stage of each iteration count, and plots the peaks against iterations
+    """
+    output = str(tmp_path / 'memory.json')
+    plot = str(tmp_path / 'memory.svg')
+    result = run_pipeline('--specs', 'data/selig_naca2412.dat', '--iterations', '10,40', '--top', '3',
+                          '--output', output, '--plot', plot, script=MEMORY)
+    assert result.returncode == 0, result.stderr
+    with open(output, 'r', encoding='utf-8') as fin:
+        cases = json.load(fin)['results']
+    assert sorted(cases, key=int) == ['10', '40']
+    for stage in ('generate_wing_model', 'generate_wing', 'export_stl'):
+        assert cases['40'][stage]['traced_peak'] > 0
+    assert cases['40']['generate_wing']['traced_peak'] > cases['10']['generate_wing']['traced_peak']
+    with open(plot, 'r', encoding='utf-8') as fin:
+        svg = fin.read()
+    assert svg.startswith('<svg') and svg.count('<polyline') >= 3
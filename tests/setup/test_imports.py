@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src')
+
+PROBE = """
+import sys
+import wingwalker
+from wingwalker.build_params.wing_request import WingRequest
+from wingwalker.generators.metrics import wing_metrics
+from wingwalker.io.specs import parse_specfile
+from wingwalker.models.enums import Planform, SpecFormat
+import wingwalker.svg as svg
+
+specs = parse_specfile('data/selig_naca2412.dat', SpecFormat.SELIG)
+req = WingRequest()
+req.planform = Planform.GEOMETRIC
+req.base_chord, req.end_chord, req.span = 100.0, 50.0, 200.0
+wing_metrics(req, specs)
+svg.trace_airfoil_path(svg.from_svg_template(100, 20, 'mm'), list(specs.x * 100.0), list(specs.y * 100.0), [0.0, 10.0])
+wingwalker.parse_specs
+print('HEAVY:' + ','.join(m for m in ('pyvista', 'pymeshlab', 'shapely') if m in sys.modules))
+"""
+
+
+def run_probe(code: str)->subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in (SRC_DIR, env.get('PYTHONPATH')) if p)
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+
+
+@pytest.mark.testing
+def test_light_imports():
+    """
+    Parsing, metrics and SVG paths must not import the 3D stack
+    """
+    result = run_probe(PROBE)
+    # Other output of the probe (e.g. parser messages) is ignored; only the sentinel line is read
+    reports = [line for line in result.stdout.splitlines() if line.startswith('HEAVY:')]
+    assert len(reports) == 1, result.stdout
+    loaded = reports[0][len('HEAVY:'):]
+    assert loaded == '', f'Heavy dependencies were imported: {loaded}'
+
+
+@pytest.mark.testing
+def test_lazy_package_attributes():
+    """
+    Package attributes are loaded on first use, and unknown names still raise AttributeError
+    """
+    result = run_probe(
+        "import sys, wingwalker\n"
+        "assert 'wingwalker.svg' not in sys.modules\n"
+        "assert wingwalker.templates.svg_template.startswith('<?xml')\n"
+        "assert callable(wingwalker.trace_airfoil_path) and 'wingwalker.svg' in sys.modules\n"
+        "assert 'SeligParser' in dir(wingwalker)\n"
+        "assert callable(wingwalker.svg.main) and callable(wingwalker.utils.parse_specs)\n"
+        "try:\n"
+        "    wingwalker.no_such_name\n"
+        "    raise SystemExit('no AttributeError')\n"
+        "except AttributeError:\n"
+        "    print('ok')\n"
+    )
+    assert result.stdout.strip().endswith('ok')